@@ -0,0 +1,74 @@
+import os
+import sys
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config, pool
+from alembic import context
+
+# ⭐ اضافه کردن مسیر سرویس به sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# ⭐ Import کردن EntityBase و همه‌ی مدل‌ها (برای autogenerate)
+from app.core.base import EntityBase
+from app.core.config import get_settings
+import app.domain.models  # noqa: F401
+
+# this is the Alembic Config object
+config = context.config
+settings = get_settings()
+
+# ⭐ همان تنظیمات دیتابیس سرویس (primary) — Alembic با psycopg2 (sync) اجرا می‌شود
+database_url = (
+    f"postgresql://"
+    f"{settings.DATABASE_USERNAME}:"
+    f"{settings.DATABASE_PASSWORD}@"
+    f"{settings.DATABASE_HOSTNAME}:"
+    f"{settings.DATABASE_PORT}/"
+    f"{settings.DATABASE_NAME}"
+)
+
+config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+
+# Interpret the config file for Python logging
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = EntityBase.metadata
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode."""
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,67 @@
+"""survey content_version and keyset indexes
+
+Revision ID: 3c1f0a9d7b21
+Revises:
+Create Date: 2026-10-18 09:30:00.000000
+
+اولین revision سرویس core: جدول‌های موجود قبلاً با create_all ساخته شده‌اند،
+این revision فقط تغییرات بعد از آن را روی دیتابیس‌های موجود اعمال می‌کند
+(همه idempotent؛ دیتابیس تازه‌ی create_all → فقط alembic_version ثبت می‌شود).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0a9d7b21'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres 11+: ستون با DEFAULT ثابت فقط metadata است (بدون بازنویسی جدول)
+    op.execute(
+        "ALTER TABLE surveys "
+        "ADD COLUMN IF NOT EXISTS content_version INTEGER NOT NULL DEFAULT 1"
+    )
+
+    # CONCURRENTLY بیرون از transaction؛ جدول حین ساخت index قفل نوشتن ندارد
+    with op.get_context().autocommit_block():
+        # keyset pagination برای /forms/my
+        op.create_index(
+            "ix_surveys_creator_created_active",
+            "surveys",
+            ["creator_id", "created_at", "survey_id"],
+            postgresql_where=sa.text("NOT is_deleted"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # لیست مرتب سوال‌ها + MAX(order_index) هنگام append
+        op.create_index(
+            "ix_questions_survey_order",
+            "questions",
+            ["survey_id", "order_index"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_questions_survey_order",
+            table_name="questions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_surveys_creator_created_active",
+            table_name="surveys",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("surveys", "content_version")
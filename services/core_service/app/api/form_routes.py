@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from uuid import UUID
 from loguru import logger
 from fastapi import Header
@@ -10,8 +10,13 @@ from app.domain.schemas.form_schema import (
     SoftDeleteFormActionResponse,
     SeeFormsResponseSchema,
     UpdateFormNameSchema)
-from app.services.form_service import FormService, get_form_service
-from app.repository.form_repository import get_form_repository, FormRepository
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.form_service import FormService, get_form_service, get_read_form_service
+from app.repository.form_repository import (
+    FormRepository,
+    get_form_repository,
+    get_read_form_repository,
+)
 
 router = APIRouter(prefix="/forms", tags=["Form Builder"])
 
@@ -42,7 +47,7 @@ async def create_form(
             detail="Invalid user ID format"
         )
     
-    logger.info(f"📝 Creating form for user {creator_id}")
+    logger.info("📝 Creating form for user {}", creator_id)
     
     # 3️⃣ راه‌اندازی سرویس
     service = FormService(repository=form_repository)
@@ -55,7 +60,7 @@ async def create_form(
 
     )
     
-    logger.info(f"✅ Form created: {new_survey.survey_id}")
+    logger.info("✅ Form created: {}", new_survey.survey_id)
     
     # 5️⃣ بازگشت پاسخ
     return CreateFormResponse(
@@ -72,7 +77,10 @@ async def create_form(
 )
 async def get_my_forms(
     request: Request,
-    form_repository: FormRepository = Depends(get_form_repository)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="X-Next-Cursor صفحه‌ی قبل"),
+    form_repository: FormRepository = Depends(get_read_form_repository)
 ):
     # ✅ 1. گرفتن user_id از JWT middleware
     user_id_str = request.state.user_id
@@ -87,7 +95,12 @@ async def get_my_forms(
 
     # ✅ 2. صدا زدن سرویس
     service = FormService(repository=form_repository)
-    return await service.get_my_forms(user_id)
+    forms, next_cursor = await service.get_my_forms(user_id, limit, cursor)
+
+    # ✅ 3. cursor صفحه‌ی بعد در header (بدنه همان لیست قبلی می‌ماند)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return forms
 
 # ======================================================
 # 🗑️ Trash Bin – Deleted Forms
@@ -99,7 +112,9 @@ async def get_my_forms(
 )
 async def list_deleted_forms(
     request: Request,
-    form_repository: FormRepository = Depends(get_form_repository),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    form_repository: FormRepository = Depends(get_read_form_repository),
 ):
     user_id_str = request.state.user_id
 
@@ -113,8 +128,8 @@ async def list_deleted_forms(
 
     service = FormService(repository=form_repository)
 
-    forms = await service.list_deleted_forms(user_id)
-    return DeletedFormListResponse(items=forms)
+    forms, next_cursor = await service.list_deleted_forms(user_id, limit, cursor)
+    return DeletedFormListResponse(items=forms, next_cursor=next_cursor)
 
 # ======================================================
 # 🔄 Restore Form
@@ -229,6 +244,6 @@ async def update_form_name(
 @router.get("/{survey_id}")
 async def get_form(
     survey_id: UUID,
-    service: FormService = Depends(get_form_service),
+    service: FormService = Depends(get_read_form_service),
 ):
     return await service.get_form(survey_id)
@@ -5,12 +5,18 @@ from fastapi.params import Depends
 from app.domain.schemas.question_schema import (
     CreateTextQuestionRequest,
     DeleteQuestionResponse,
+    MoveQuestionRequest,
+    QuestionBatchRequest,
     QuestionDetailResponse,
     QuestionListResponse,
     QuestionResponse,
     QuestionUpdateSchema
 )
-from app.services.question_service import QuestionService, get_question_service
+from app.services.question_service import (
+    QuestionService,
+    get_question_service,
+    get_read_question_service,
+)
 
 router = APIRouter(prefix="/forms", tags=["Questions"])
 
@@ -62,7 +68,7 @@ async def delete_question(
 async def list_questions(
     survey_id: UUID,
     request: Request,
-    service: QuestionService = Depends(get_question_service),
+    service: QuestionService = Depends(get_read_question_service),
 ):
     user_id: UUID = request.state.user_id
 
@@ -101,7 +107,7 @@ async def get_question_for_edit(
     survey_id: UUID,
     question_id: UUID,
     request: Request,
-    service: QuestionService = Depends(get_question_service),
+    service: QuestionService = Depends(get_read_question_service),
 ):
     user_id: UUID = request.state.user_id
 
@@ -110,4 +116,45 @@ async def get_question_for_edit(
         question_id=question_id,
         user_id=user_id,
     )
-    
+
+
+@router.post(
+    "/{survey_id}/questions/{question_id}/move",
+    response_model=QuestionResponse,
+    summary="Move a question to a new position",
+)
+async def move_question(
+    survey_id: UUID,
+    question_id: UUID,
+    payload: MoveQuestionRequest,
+    request: Request,
+    service: QuestionService = Depends(get_question_service),
+):
+    user_id: UUID = request.state.user_id
+
+    return await service.move_question(
+        survey_id=survey_id,
+        question_id=question_id,
+        user_id=user_id,
+        payload=payload,
+    )
+
+
+@router.patch(
+    "/{survey_id}/questions:batch",
+    response_model=QuestionListResponse,
+    summary="Create, update, move and delete questions in one request",
+)
+async def batch_questions(
+    survey_id: UUID,
+    payload: QuestionBatchRequest,
+    request: Request,
+    service: QuestionService = Depends(get_question_service),
+):
+    user_id: UUID = request.state.user_id
+
+    return await service.apply_batch(
+        survey_id=survey_id,
+        user_id=user_id,
+        payload=payload,
+    )
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi import APIRouter, Header, Request, Depends, HTTPException
 from uuid import UUID
 
-from app.services.URL_service import SurveyPublicLinkService, get_survey_public_link_service
+from app.services.URL_service import (
+    SurveyPublicLinkService,
+    get_public_survey_service,
+    get_survey_public_link_service,
+)
 
 
 
@@ -55,6 +59,7 @@ async def regenerate_public_link(
 @router.get("/s/{code}")
 async def open_public_survey(
     code: str,
-    service: SurveyPublicLinkService = Depends(get_survey_public_link_service),
+    if_none_match: str | None = Header(default=None),
+    service: SurveyPublicLinkService = Depends(get_public_survey_service),
 ):
-    return await service.open(code)
+    return await service.open(code, if_none_match)
@@ -6,7 +6,7 @@ from app.domain.schemas.setting_schema import (
     SettingUpdateSchema
 )
 from app.services.setting_service import SettingService
-from app.services.setting_service import get_setting_service
+from app.services.setting_service import get_read_setting_service, get_setting_service
 
 router = APIRouter(
     prefix="/forms",
@@ -21,7 +21,7 @@ router = APIRouter(
 async def get_survey_settings(
     survey_id: UUID,
     request: Request,
-    service: SettingService = Depends(get_setting_service),
+    service: SettingService = Depends(get_read_setting_service),
 ):
     user_id: UUID = request.state.user_id
 
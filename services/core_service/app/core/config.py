@@ -1,6 +1,7 @@
 from functools import lru_cache
 from loguru import logger
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings ,SettingsConfigDict
 
@@ -15,17 +16,78 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str
     DATABASE_PORT: int
     DATABASE_USERNAME: str
+
+    # Database pool / timeouts
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float = 30.0
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 30000
+    DB_PGBOUNCER_MODE: bool = False
+    # درخواستی که اتصال را بیشتر از این نگه دارد warning لاگ می‌شود
+    DB_HOLD_WARN_MS: int = 1000
+    # دیباگ: > 0 → N کندترین statement هر route نگه داشته می‌شود (/debug/slow-sql)
+    PERF_SLOW_SQL_TOP: int = 0
+    # Schema در startup: create (create_all، توسعه) | check (فقط revision Alembic) | skip
+    DB_SCHEMA_MODE: Literal["create", "check", "skip"] = "create"
+    # در حالت check اگر تنظیم شود، revision دیتابیس باید دقیقاً همین باشد
+    DB_SCHEMA_REVISION: Optional[str] = None
+
+    # Read replica (اختیاری — بدون آن خواندن‌ها هم از primary)
+    DATABASE_REPLICA_HOSTNAME: Optional[str] = None
+    DATABASE_REPLICA_PORT: Optional[int] = None
+    REPLICA_PIN_SECONDS: int = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_INTERVAL: int = 10
+    REPLICA_RETRY_SECONDS: int = 30
+    REPLICA_SNAPSHOT_TTL: int = 30
     
     PROJECT_NAME: str = "QForm Core Service"
     PROJECT_VERSION: str = "1.0.0"
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
+    JWT_CACHE_MAX_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL: int = 300
 
     IAM_URL: str
 
     DEBUG_MODE: bool
 
+    # Logging (صف محدود + نمونه‌برداری پیام‌های پرتکرار)
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_FILE_MAX_MB: int = 10
+    LOG_FILE_BACKUPS: int = 10
+    # logger (نام ماژول) → نسبت پیام‌های زیر WARNING که ثبت می‌شوند
+    LOG_SAMPLE_RATES: dict[str, float] = {
+        "app.services.jwt_middleware": 0.01,
+        "app.core.middleware": 0.01,
+    }
+
+    # /health/ready: timeout هر check، مدت cache نتیجه، آستانه‌ی اشباع pool (0..1)
+    HEALTH_CHECK_TIMEOUT: float = 2.0
+    HEALTH_CACHE_TTL: float = 2.0
+    HEALTH_POOL_SATURATION: float = 0.9
+
+    # Prometheus: poolها / صف‌ها / cacheها هر چند ثانیه یک بار نمونه‌برداری می‌شوند
+    METRICS_SAMPLE_INTERVAL: float = 5.0
+
+    # Redis (اختیاری — بدون آن فقط cache داخل پروسه)
+    REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+
+    # Public survey snapshot cache
+    SURVEY_CACHE_LOCAL_SIZE: int = 1024
+    SURVEY_CACHE_LOCAL_TTL: int = 5
+    SURVEY_CACHE_REDIS_TTL: int = 3600
+    PUBLIC_SURVEY_MAX_AGE: int = 60
+
 
     model_config = SettingsConfigDict(
         env_file=str(PROJECT_ROOT / ".env"),
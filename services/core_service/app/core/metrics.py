@@ -0,0 +1,186 @@
+"""
+Prometheus metrics (/metrics)
+
+- چند worker uvicorn: PROMETHEUS_MULTIPROC_DIR باید قبل از اجرای uvicorn
+  تنظیم شود (هر worker در فایل mmap خودش می‌نویسد، /metrics همه را جمع می‌کند)
+- مسیر درخواست فقط latency و in-flight را ثبت می‌کند؛ poolها، صف‌ها و
+  شمارنده‌های cache (intهای ساده‌ی هر worker) هر METRICS_SAMPLE_INTERVAL
+  ثانیه یک بار منتشر می‌شوند
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from loguru import logger
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import get_settings
+
+config = get_settings()
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# route بدون match (404) → یک label ثابت، نه path خام (cardinality)
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Connections checked out of the pool",
+    ["pool"],
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts",
+    "Checkouts that timed out waiting for a connection",
+    ["pool"],
+)
+
+REDIS_POOL_CONNECTIONS = Gauge(
+    "redis_pool_connections",
+    "Redis pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+
+QUEUE_DEPTH = Gauge(
+    "background_queue_depth",
+    "Pending items in in-process background queues",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+
+# labels() هر بار lock و lookup دارد → child هر ترکیب یک بار ساخته می‌شود
+_latency_children: dict[tuple, Histogram] = {}
+
+
+def observe_request(method: str, route: Optional[str], status: int, seconds: float) -> None:
+    key = (method, route or UNMATCHED_ROUTE, status)
+    child = _latency_children.get(key)
+    if child is None:
+        child = _latency_children[key] = REQUEST_LATENCY.labels(*key)
+    child.observe(seconds)
+
+
+class MetricsSampler:
+    """
+    شمارنده‌ها و وضعیت poolهای این worker را در metricهای Prometheus می‌نویسد
+    (شمارنده‌های تجمعی → فقط delta از نمونه‌ی قبلی)
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last: dict[tuple, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _add(self, counter: Counter, labels: tuple, total: int) -> None:
+        key = (counter._name, labels)
+        delta = total - self._last.get(key, 0)
+        if delta > 0:
+            counter.labels(*labels).inc(delta)
+        self._last[key] = total
+
+    def _pool(self, name: str, stats: dict) -> None:
+        DB_POOL_CONNECTIONS.labels(name, "size").set(stats["size"])
+        DB_POOL_CONNECTIONS.labels(name, "checked_out").set(stats["checked_out"])
+        DB_POOL_CONNECTIONS.labels(name, "overflow").set(max(stats["overflow"], 0))
+        self._add(DB_POOL_CHECKOUTS, (name,), stats["checkouts"])
+        self._add(DB_POOL_TIMEOUTS, (name,), stats["timeouts"])
+
+    def sample(self) -> None:
+        # import محلی: این ماژول از middleware هم import می‌شود
+        from app.core.database import db_pool_stats
+        from app.core.redis import redis_pool_stats
+        from app.core.replica import replica_router
+        from app.services.question_order import question_rebalancer
+        from app.services.survey_cache import survey_cache
+        from app.services.token_cache import token_cache
+
+        self._pool("primary", db_pool_stats())
+        replica = replica_router.stats()
+        if replica["enabled"]:
+            self._pool("replica", replica["pool"])
+
+        redis = redis_pool_stats()
+        if redis["initialized"]:
+            REDIS_POOL_CONNECTIONS.labels("max").set(redis["max_connections"])
+            REDIS_POOL_CONNECTIONS.labels("in_use").set(redis["in_use_connections"])
+            REDIS_POOL_CONNECTIONS.labels("available").set(redis["available_connections"])
+
+        for name, cache in (("survey_snapshot", survey_cache), ("jwt", token_cache)):
+            self._add(CACHE_REQUESTS, (name, "hit"), cache.hits)
+            self._add(CACHE_REQUESTS, (name, "miss"), cache.misses)
+
+        QUEUE_DEPTH.labels("question_rebalance").set(question_rebalancer.pending)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"[Metrics] Sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if MULTIPROCESS:
+            # gaugeهای livesum این worker دیگر شمرده نشوند
+            multiprocess.mark_process_dead(os.getpid())
+
+
+metrics_sampler = MetricsSampler(interval=config.METRICS_SAMPLE_INTERVAL)
+
+
+def render_metrics() -> bytes:
+    """خروجی /metrics (در حالت multiprocess: همه‌ی workerها)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
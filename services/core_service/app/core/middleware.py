@@ -0,0 +1,109 @@
+from typing import Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REQUESTS_IN_FLIGHT, observe_request
+from app.core.request_metrics import SlowStatementLog, start_request_metrics
+
+JSON_CONTENT_TYPE = b"application/json"
+JSON_UTF8_CONTENT_TYPE = b"application/json; charset=utf-8"
+
+
+class UTF8CharsetMiddleware:
+    """
+    Pure ASGI middleware: adds charset=utf-8 to JSON responses.
+
+    Only the http.response.start message is touched, the body is streamed
+    through untouched (no BaseHTTPMiddleware re-wrapping).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_charset(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                for index, (name, value) in enumerate(headers):
+                    if name == b"content-type" and value == JSON_CONTENT_TYPE:
+                        headers = list(headers)
+                        headers[index] = (name, JSON_UTF8_CONTENT_TYPE)
+                        message["headers"] = headers
+                        break
+            await send(message)
+
+        await self.app(scope, receive, send_with_charset)
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware: per-request cost breakdown (wall time, DB time /
+    statements / rows, pooled connection hold time, Redis, password hashing).
+
+    The numbers are sent as a Server-Timing header and logged as structured
+    fields; latency per route template also goes to the Prometheus histogram;
+    requests holding DB connections longer than warn_ms are logged as
+    warnings. With slow_sql set, the slowest statements are kept per route.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        warn_ms: float,
+        slow_sql: Optional[SlowStatementLog] = None,
+    ) -> None:
+        self.app = app
+        self.warn_ms = warn_ms
+        self.slow_sql = slow_sql
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = start_request_metrics()
+        scope.setdefault("state", {})["metrics"] = metrics
+        status = 500
+        REQUESTS_IN_FLIGHT.inc()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None)
+            observe_request(scope["method"], route, status, metrics.elapsed)
+
+            route_path = route or scope["path"]
+            if self.slow_sql is not None and metrics.slow_statements:
+                self.slow_sql.add(f"{scope['method']} {route_path}", metrics.slow_statements)
+
+            slow = metrics.connection_held * 1000 >= self.warn_ms
+            logger.bind(
+                method=scope["method"],
+                route=route_path,
+                status=status,
+                **metrics.fields(),
+            ).log(
+                "WARNING" if slow else "INFO",
+                "[Request] {} {} {} {:.1f}ms db={}x/{:.1f}ms",
+                scope["method"],
+                route_path,
+                status,
+                metrics.elapsed * 1000,
+                metrics.db_statements,
+                metrics.db_time * 1000,
+            )
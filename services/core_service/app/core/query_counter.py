@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """
+    شمارنده‌ی statementهای ارسال‌شده به دیتابیس (برای harness و دیباگ)
+
+        with QueryCounter(engine) as counter:
+            ...
+        counter.count, counter.statements
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def assert_num_queries(engine: AsyncEngine, expected: int) -> Iterator[QueryCounter]:
+    with QueryCounter(engine) as counter:
+        yield counter
+
+    if counter.count != expected:
+        listing = "\n".join(
+            f"  {i}. {sql.strip()}" for i, sql in enumerate(counter.statements, 1)
+        )
+        raise AssertionError(
+            f"expected {expected} statements, got {counter.count}:\n{listing}"
+        )
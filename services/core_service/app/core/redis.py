@@ -0,0 +1,93 @@
+from redis.asyncio import ConnectionPool, Redis
+from loguru import logger
+from typing import Optional
+
+from app.core.config import get_settings
+
+config = get_settings()
+
+redis_pool: Optional[ConnectionPool] = None  # یک ConnectionPool برای کل worker
+redis_client: Optional[Redis] = None  # فقط یک Redis client ساخته شود
+
+
+async def init_redis() -> Optional[Redis]:
+    """
+    Create the pool and the client once per worker (called from lifespan).
+    Returns None when REDIS_URL is not configured (in-process cache only).
+    """
+    global redis_pool, redis_client
+    if redis_client is None and config.REDIS_URL:
+        try:
+            redis_pool = ConnectionPool.from_url(
+                config.REDIS_URL,      # مثل redis://localhost:6379/0
+                encoding="utf-8",
+                decode_responses=True,
+                max_connections=config.REDIS_MAX_CONNECTIONS,
+                socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=config.REDIS_SOCKET_TIMEOUT,
+            )
+            redis_client = Redis(connection_pool=redis_pool)
+            logger.info("[Redis] Pool initialized")
+        except Exception as e:
+            logger.error(f"[Redis] Initialization failed: {e}")
+            raise
+
+    return redis_client
+
+
+async def close_redis() -> None:
+    global redis_pool, redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+    redis_client = None
+    redis_pool = None
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    The shared client, or None if Redis is disabled / not initialized.
+    """
+    return redis_client
+
+
+def redis_pool_stats() -> dict:
+    """
+    Snapshot of the shared pool, for the health / metrics endpoints.
+    """
+    if redis_pool is None:
+        return {"initialized": False}
+
+    in_use = len(redis_pool._in_use_connections)
+    available = len(redis_pool._available_connections)
+    return {
+        "initialized": True,
+        "max_connections": redis_pool.max_connections,
+        "created_connections": in_use + available,
+        "in_use_connections": in_use,
+        "available_connections": available,
+    }
+
+
+def redis_pool_saturation() -> Optional[float]:
+    """
+    In-use share of max_connections (None when the pool is not initialized).
+    """
+    if redis_pool is None:
+        return None
+    return len(redis_pool._in_use_connections) / redis_pool.max_connections
+
+
+async def redis_health_check() -> bool:
+    """
+    Tests Redis connection (PING).
+    """
+    if redis_client is None:
+        return False
+    try:
+        pong = await redis_client.ping()
+        return pong is True
+    except Exception as e:
+        logger.error(f"[Redis Health] Connection failed: {e}")
+        return False
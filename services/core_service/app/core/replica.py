@@ -0,0 +1,349 @@
+# app/core/replica.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional
+
+from fastapi import Depends, HTTPException, Request
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import PrimarySession, build_engine, database_url, get_db
+from app.core.redis import get_redis
+
+config = get_settings()
+
+PIN_KEY = "primary_pin:{user_id}"
+
+# None → روی standby نیستیم (یا همان دیتابیس اصلی) → lag صفر
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Session روی replica، مثل session اصلی lazy: pin در Redis و اتصال هر دو
+    در اولین execute بررسی/گرفته می‌شوند (cache hit و 304 نه round-trip
+    Redis دارند نه اتصالی از pool replica).
+    کاربر pin شده، یا اتصال اول ناموفق (replica تا retry_seconds کنار گذاشته
+    می‌شود) → همین درخواست با session اصلی (fallback) ادامه می‌دهد.
+    """
+
+    router: "ReplicaRouter"
+    fallback: AsyncSession
+    user_id: Optional[str] = None
+    _state: Optional[str] = None  # None | "replica" | "primary"
+
+    async def _target(self) -> Optional[AsyncSession]:
+        """None → خود replica؛ وگرنه session اصلی"""
+        if self._state is None and await self.router.is_pinned_remote(self.user_id):
+            self.router.reads_primary += 1
+            self._state = "primary"
+        if self._state is None:
+            try:
+                await self.connection()
+            except Exception as e:
+                await super().close()
+                self.router.mark_down(str(e))
+                self.router.reads_primary += 1
+                self._state = "primary"
+            else:
+                self.router.reads_replica += 1
+                self._state = "replica"
+        return self.fallback if self._state == "primary" else None
+
+    async def execute(self, *args, **kwargs):
+        target = await self._target()
+        if target is not None:
+            return await target.execute(*args, **kwargs)
+        return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        target = await self._target()
+        if target is not None:
+            return await target.scalar(*args, **kwargs)
+        return await super().scalar(*args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        target = await self._target()
+        if target is not None:
+            return await target.scalars(*args, **kwargs)
+        return await super().scalars(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        target = await self._target()
+        if target is not None:
+            return await target.get(*args, **kwargs)
+        return await super().get(*args, **kwargs)
+
+
+class ReplicaRouter:
+    """
+    مسیریابی خواندن‌ها به replica
+
+    - کاربری که تازه commit کرده تا pin_seconds ثانیه روی primary می‌ماند
+      (محلی + Redis اگر تنظیم شده باشد، تا workerهای دیگر هم بدانند)
+    - replica خراب یا عقب‌تر از max_lag → primary، تا retry_seconds بعد
+    """
+
+    def __init__(
+        self,
+        pin_seconds: int,
+        max_lag: float,
+        check_interval: int,
+        retry_seconds: int,
+        max_pins: int = 10000,
+    ):
+        self.pin_seconds = pin_seconds
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_seconds = retry_seconds
+        self.max_pins = max_pins
+
+        self.engine = None
+        self.session_factory: Optional[async_sessionmaker] = None
+
+        self._pins: "OrderedDict[str, float]" = OrderedDict()
+        self._down_until = 0.0
+        self._next_probe = 0.0
+        self._probe: Optional[asyncio.Task] = None
+        self._pin_tasks: set[asyncio.Task] = set()
+        self.lag: Optional[float] = None
+
+        self.reads_replica = 0
+        self.reads_primary = 0
+
+    # -----------------------------------
+    # LIFECYCLE
+    # -----------------------------------
+    def configure(self, url: str) -> None:
+        self.engine = build_engine(url)
+        self.session_factory = async_sessionmaker(
+            bind=self.engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+            class_=ReplicaSession,
+        )
+
+    async def close(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+        if self._pin_tasks:
+            await asyncio.gather(*self._pin_tasks, return_exceptions=True)
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    @property
+    def enabled(self) -> bool:
+        return self.session_factory is not None
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    # -----------------------------------
+    # READ-AFTER-WRITE PINNING
+    # -----------------------------------
+    def pin(self, user_id: str) -> None:
+        self._pins[user_id] = time.monotonic() + self.pin_seconds
+        self._pins.move_to_end(user_id)
+        while len(self._pins) > self.max_pins:
+            self._pins.popitem(last=False)
+
+        redis = get_redis()
+        if redis is not None:
+            # ارجاع نگه داشته می‌شود تا task قبل از تمام شدن GC نشود
+            task = asyncio.get_running_loop().create_task(self._pin_redis(redis, user_id))
+            self._pin_tasks.add(task)
+            task.add_done_callback(self._pin_tasks.discard)
+
+    async def _pin_redis(self, redis, user_id: str) -> None:
+        try:
+            await redis.set(PIN_KEY.format(user_id=user_id), 1, ex=self.pin_seconds)
+        except Exception as e:
+            logger.warning("[Replica] Redis pin failed: {}", e)
+
+    def is_pinned(self, user_id: Optional[str]) -> bool:
+        """فقط pin محلی همین worker (بدون I/O)"""
+        if not user_id:
+            return False
+
+        expires_at = self._pins.get(user_id)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                return True
+            del self._pins[user_id]
+        return False
+
+    async def is_pinned_remote(self, user_id: Optional[str]) -> bool:
+        """pin ثبت‌شده توسط workerهای دیگر؛ در اولین execute روی replica"""
+        if not user_id:
+            return False
+
+        redis = get_redis()
+        if redis is None:
+            return False
+        try:
+            return bool(await redis.exists(PIN_KEY.format(user_id=user_id)))
+        except Exception:
+            # بدون Redis مطمئن نیستیم → primary امن‌تر است
+            return True
+
+    # -----------------------------------
+    # HEALTH
+    # -----------------------------------
+    def mark_down(self, reason: str) -> None:
+        self._down_until = time.monotonic() + self.retry_seconds
+        logger.warning("[Replica] Falling back to primary for {}s: {}", self.retry_seconds, reason)
+
+    def _maybe_probe(self) -> None:
+        now = time.monotonic()
+        if now < self._next_probe or (self._probe and not self._probe.done()):
+            return
+        self._next_probe = now + self.check_interval
+        self._probe = asyncio.get_running_loop().create_task(self._check_lag())
+
+    async def _check_lag(self) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                lag = (await conn.execute(LAG_QUERY)).scalar()
+        except Exception as e:
+            self.mark_down(f"health check failed: {e}")
+            return
+
+        self.lag = float(lag or 0)
+        if self.lag > self.max_lag:
+            self.mark_down(f"replication lag {self.lag:.1f}s")
+
+    # -----------------------------------
+    # ROUTING
+    # -----------------------------------
+    async def open_session(
+        self,
+        user_id: Optional[str],
+        fallback: AsyncSession,
+    ) -> Optional[ReplicaSession]:
+        """
+        session روی replica یا None (یعنی از primary بخوان)؛ اینجا نه اتصالی
+        گرفته می‌شود نه Redis خوانده می‌شود — pin سایر workerها و خرابی replica
+        در اولین execute به fallback برمی‌گردند
+        """
+        if not self.enabled:
+            return None
+
+        self._maybe_probe()
+        if not self.healthy or self.is_pinned(user_id):
+            self.reads_primary += 1
+            return None
+
+        session = self.session_factory()
+        session.info["replica"] = True
+        session.router = self
+        session.fallback = fallback
+        session.user_id = user_id
+        return session
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "pinned_users": len(self._pins),
+            "reads_replica": self.reads_replica,
+            "reads_primary": self.reads_primary,
+            "pool": self.engine.pool.stats(),
+        }
+
+
+replica_router = ReplicaRouter(
+    pin_seconds=config.REPLICA_PIN_SECONDS,
+    max_lag=config.REPLICA_MAX_LAG_SECONDS,
+    check_interval=config.REPLICA_HEALTH_CHECK_INTERVAL,
+    retry_seconds=config.REPLICA_RETRY_SECONDS,
+)
+
+
+def init_replica() -> None:
+    if not config.DATABASE_REPLICA_HOSTNAME:
+        logger.info("[Replica] Not configured, reads use the primary")
+        return
+    replica_router.configure(
+        database_url(
+            config.DATABASE_REPLICA_HOSTNAME,
+            config.DATABASE_REPLICA_PORT or config.DATABASE_PORT,
+        )
+    )
+    logger.info("[Replica] Read engine -> {}", config.DATABASE_REPLICA_HOSTNAME)
+
+
+async def close_replica() -> None:
+    await replica_router.close()
+
+
+# ---------------------------------------
+# Primary write tracking → pin
+# ---------------------------------------
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _pin_after_commit(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        replica_router.pin(str(session.info["user_id"]))
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop("wrote", None)
+
+
+# ---------------------------------------
+# DEPENDENCY (برای FastAPI)
+# ---------------------------------------
+async def get_read_db(
+    request: Request,
+    primary: AsyncSession = Depends(get_db, scope="function"),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session فقط-خواندنی: replica اگر سالم باشد و کاربر pin نشده باشد،
+    وگرنه همان session اصلی همین درخواست (بدون اتصال اضافه)
+    """
+    session = await replica_router.open_session(
+        getattr(request.state, "user_id", None),
+        fallback=primary,
+    )
+    if session is None:
+        yield primary
+        return
+
+    try:
+        yield session
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as ex:
+        logger.error("Replica DB error: {}", ex)
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
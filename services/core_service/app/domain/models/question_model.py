@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, Text, TIMESTAMP, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, Integer, Text, TIMESTAMP, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.base import EntityBase
 import uuid
@@ -25,7 +25,8 @@ class Question(EntityBase):
 
     survey = relationship(
         "Survey",
-        back_populates="questions"  # ← همنام با relationship در Survey
+        back_populates="questions",  # ← همنام با relationship در Survey
+        lazy="raise"
     )
 
 
@@ -35,4 +36,10 @@ class Question(EntityBase):
             "question_text",
             name="uq_survey_text_question"
         ),
+        # لیست مرتب سوال‌ها + MAX(order_index) هنگام append
+        Index(
+            "ix_questions_survey_order",
+            "survey_id",
+            "order_index",
+        ),
     )
\ No newline at end of file
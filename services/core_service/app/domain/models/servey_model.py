@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, TIMESTAMP, UniqueConstraint, func, text
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, Index, TIMESTAMP, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.base import EntityBase
 from sqlalchemy.orm import relationship
@@ -45,11 +45,22 @@ class Survey(EntityBase):
     TIMESTAMP(timezone=True),
     nullable=True)
 
+    # نسخه‌ی محتوای عمومی (ETag) — با هر تغییر سوال/تنظیمات/عنوان/لینک یکی زیاد می‌شود
+    content_version = Column(
+        Integer,
+        nullable=False,
+        server_default=text("1")
+    )
+
+    # روابط lazy="raise" هستند → بارگذاری فقط با پروفایل‌های SurveyLoad
+    # passive_deletes: حذف فرزندها با ON DELETE CASCADE دیتابیس (بدون load)
     settings = relationship(
     "Setting",
     back_populates="survey",
     uselist=False,
-    cascade="all, delete-orphan"
+    cascade="all, delete-orphan",
+    passive_deletes=True,
+    lazy="raise"
 )
     
     __table_args__ = (
@@ -58,13 +69,24 @@ class Survey(EntityBase):
         "title",
         name="uq_user_form_title"
     ),
+      # keyset pagination برای /forms/my (فقط فرم‌های حذف‌نشده)
+      Index(
+        "ix_surveys_creator_created_active",
+        "creator_id",
+        "created_at",
+        "survey_id",
+        postgresql_where=text("NOT is_deleted"),
+    ),
 )
     questions = relationship(
         "Question",  # ← نام کلاس مدل (نه نام جدول!)
         back_populates="survey",
         cascade="all, delete-orphan",
         order_by="Question.order_index",  # ← اسم مدل رو اینجا هم اصلاح کن
-        lazy="selectin"
+        passive_deletes=True,
+        lazy="raise"
     )
 
-    
\ No newline at end of file
+    def bump_content_version(self) -> None:
+        """UPDATE ... SET content_version = content_version + 1 (در flush بعدی)"""
+        self.content_version = Survey.content_version + 1
@@ -50,7 +50,7 @@ class Setting(EntityBase):
     )
 
     # Optional: ارتباط با مدل Survey
-    survey = relationship("Survey", back_populates="settings", uselist=False)
+    survey = relationship("Survey", back_populates="settings", uselist=False, lazy="raise")
 
     def __repr__(self):
         return (
@@ -44,6 +44,7 @@ class DeletedFormItemSchema(BaseModel):
 
 class DeletedFormListResponse(BaseModel):
     items: list[DeletedFormItemSchema]
+    next_cursor: Optional[str] = None
 
 
 
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from uuid import UUID
+
+from app.domain.schemas.setting_schema import SettingBase
+
+
+# پاسخ لینک عمومی (چیزی که پاسخ‌دهنده می‌بیند)
+class PublicSurveySettingsSchema(SettingBase):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PublicQuestionSchema(BaseModel):
+    question_id: UUID
+    type: str
+    question_text: str
+    description: Optional[str] = None
+    is_required: bool
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    order_index: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PublicSurveyResponse(BaseModel):
+    survey_id: UUID
+    title: str
+    public_code: str
+    settings: Optional[PublicSurveySettingsSchema] = None
+    questions: list[PublicQuestionSchema]
+
+    model_config = ConfigDict(from_attributes=True)
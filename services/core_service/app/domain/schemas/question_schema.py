@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 from uuid import UUID
 
 class CreateTextQuestionRequest(BaseModel):
@@ -65,4 +65,55 @@ class QuestionDetailResponse(BaseModel):
     max_length: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+
+class MoveQuestionRequest(BaseModel):
+    position: int = Field(..., ge=0)   # ایندکس صفر-مبنا در لیست نهایی
+
+
+# ---------------------------------------
+# BATCH (ادیتور فرم: چند عملیات در یک تراکنش)
+# ---------------------------------------
+MAX_BATCH_OPERATIONS = 200
+
+
+class BatchCreateQuestion(CreateTextQuestionRequest):
+    op: Literal["create"]
+    position: Optional[int] = Field(None, ge=0)   # None → انتهای لیست
+
+
+class BatchUpdateQuestion(QuestionUpdateSchema):
+    op: Literal["update"]
+    question_id: UUID
+
+
+class BatchMoveQuestion(BaseModel):
+    op: Literal["move"]
+    question_id: UUID
+    position: int = Field(..., ge=0)   # ایندکس صفر-مبنا در لیست نهایی
+
+
+class BatchDeleteQuestion(BaseModel):
+    op: Literal["delete"]
+    question_id: UUID
+
+
+QuestionBatchOperation = Annotated[
+    Union[
+        BatchCreateQuestion,
+        BatchUpdateQuestion,
+        BatchMoveQuestion,
+        BatchDeleteQuestion,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class QuestionBatchRequest(BaseModel):
+    operations: list[QuestionBatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_OPERATIONS,
+    )
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, Request
+import asyncio
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
 from loguru import logger
@@ -11,9 +12,16 @@ from app.api.question_routes import router as question__router
 from app.api.setting_routes import router as setting_router
 from app.api.send_public_link_routes import router as url_router
 from app.core.config import get_settings
-from app.core.database import create_db_and_tables
-from app.logging.logging_service import configure_logger
-from app.services.jwt_middleware import jwt_middleware
+from app.core.database import db_health_check, db_pool_saturation, db_pool_stats, prepare_database
+from app.core.health import readiness_probe
+from app.core.metrics import METRICS_CONTENT_TYPE, metrics_sampler, render_metrics
+from app.core.middleware import RequestMetricsMiddleware, UTF8CharsetMiddleware
+from app.core.redis import init_redis, close_redis, redis_health_check, redis_pool_saturation
+from app.core.replica import close_replica, init_replica, replica_router
+from app.core.request_metrics import SlowStatementLog
+from app.logging.logging_service import configure_logger, log_pipeline, shutdown_logger
+from app.services.jwt_middleware import JWTAuthMiddleware
+from app.services.question_order import question_rebalancer
 
 
 # ============================================
@@ -24,13 +32,26 @@ logger.info("Logger configured.")
 
 settings = get_settings()
 
+# فقط با PERF_SLOW_SQL_TOP > 0 (دیباگ)
+slow_sql = SlowStatementLog(settings.PERF_SLOW_SQL_TOP) if settings.PERF_SLOW_SQL_TOP else None
+
 # ============================================
 # 2. Lifespan
 # ============================================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_db_and_tables()
+    await prepare_database()
+    app.state.redis = await init_redis()
+    init_replica()
+    metrics_sampler.start()
     yield
+    await metrics_sampler.stop()
+    await question_rebalancer.drain()
+    await close_replica()
+    await close_redis()
+    if slow_sql is not None:
+        logger.info("[Perf] Slowest statements per route: {}", slow_sql.dump())
+    shutdown_logger()
 
 
 # ============================================
@@ -48,7 +69,22 @@ logger.info(
 )
 
 # ============================================
-# 4. CORS (MUST be before JWT middleware)
+# 4. Middleware stack (pure ASGI)
+# ============================================
+# add_middleware هر لایه را بیرونِ لایه‌های قبلی می‌گذارد، پس ترتیب اجرا:
+# CORS → request metrics → UTF-8 → JWT → routes
+app.add_middleware(JWTAuthMiddleware)
+logger.info("JWT middleware attached.")
+
+app.add_middleware(UTF8CharsetMiddleware)
+app.add_middleware(
+    RequestMetricsMiddleware,
+    warn_ms=settings.DB_HOLD_WARN_MS,
+    slow_sql=slow_sql,
+)
+
+# ============================================
+# 5. CORS (MUST be outside JWT middleware)
 # ============================================
 app.add_middleware(
     CORSMiddleware,
@@ -61,23 +97,7 @@ app.add_middleware(
 logger.info("CORS middleware configured.")
 
 # ============================================
-# 5. JWT Middleware
-# ============================================
-app.middleware("http")(jwt_middleware)
-logger.info("JWT middleware attached.")
-
-# ============================================
-# 6. UTF‑8 Middleware
-# ============================================
-@app.middleware("http")
-async def set_utf8_encoding(request: Request, call_next):
-    response = await call_next(request)
-    if isinstance(response, JSONResponse):
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-    return response
-
-# ============================================
-# 7. OpenAPI + Swagger JWT Configuration
+# 6. OpenAPI + Swagger JWT Configuration
 # ============================================
 bearer_scheme = HTTPBearer(auto_error=True)
 
@@ -114,7 +134,7 @@ app.openapi = custom_openapi
 logger.info("Custom OpenAPI schema configured with JWT support.")
 
 # ============================================
-# 8. Routes
+# 7. Routes
 # ============================================
 app.include_router(forms_router, prefix="/api/v1")
 logger.info("Forms router mounted at /api/v1")
@@ -130,7 +150,7 @@ app.include_router(url_router, prefix="/api/v1")
 logger.info("url router mounted at /api/v1")
 # ============================================
 # ============================================
-# 9. Health Check
+# 8. Health Check
 # ============================================
 @app.get("/", tags=["Health"])
 async def root():
@@ -140,8 +160,58 @@ async def root():
         "version": settings.PROJECT_VERSION,
     }
 
+
+@app.get("/health", tags=["Health"])
+async def health():
+    db_ok = await db_health_check()
+    # Redis اختیاری است → بدون REDIS_URL وضعیت آن null
+    redis_ok = await redis_health_check() if settings.REDIS_URL else None
+    return {
+        "status": "ok" if db_ok and redis_ok is not False else "degraded",
+        "database": {
+            "ok": db_ok,
+            "pool": db_pool_stats(),
+        },
+        "redis": {"ok": redis_ok},
+        "replica": replica_router.stats(),
+        "logging": log_pipeline.stats(),
+    }
+
+
+# Readiness: DB (+ Redis اگر تنظیم شده)؛ replica اختیاری است (fallback به primary)
+readiness_probe.add_check("database", db_health_check)
+if settings.REDIS_URL:
+    readiness_probe.add_check("redis", redis_health_check)
+readiness_probe.add_saturation("database", db_pool_saturation)
+readiness_probe.add_saturation("redis", redis_pool_saturation)
+
+
+@app.get("/health/live", tags=["Health"])
+async def health_live():
+    # فقط event loop پاسخ می‌دهد؛ بدون وابستگی بیرونی
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def health_ready(response: Response):
+    result = await readiness_probe.result()
+    if result["status"] != "ok":
+        response.status_code = 503
+    return result
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # worker پاسخ‌دهنده تازه‌ترین وضعیت خودش را قبل از خروجی می‌نویسد
+    metrics_sampler.sample()
+    # multiprocess: خواندن فایل‌های همه‌ی workerها خارج از event loop
+    body = await asyncio.to_thread(render_metrics)
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
+if slow_sql is not None:
+    @app.get("/debug/slow-sql", tags=["Health"])
+    async def slow_statements():
+        return slow_sql.dump()
+
 logger.success("🚀 QForm CORE Service started successfully!")
-print("JWT_SECRET_KEY repr:", repr(settings.JWT_SECRET_KEY))
-print("JWT_SECRET_KEY len :", len(settings.JWT_SECRET_KEY))
-print("JWT_ALGORITHM     :", settings.JWT_ALGORITHM)
-print("SETTINGS OBJECT ID:", id(settings))
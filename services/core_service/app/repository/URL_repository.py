@@ -2,12 +2,11 @@ from fastapi import Depends, HTTPException, status
 import secrets
 import string
 from uuid import UUID
-from sqlalchemy.orm import selectinload
-
 from sqlalchemy import select
 
 from app.domain.models.servey_model import Survey
 from app.repository.form_repository import FormRepository, get_form_repository
+from app.repository.load_profiles import SurveyLoad, survey_load_options
 
 
 class PublicLinkRepository:
@@ -28,11 +27,11 @@ class PublicLinkRepository:
         return await self.survey_repo.get_owned_form(
             survey_id=survey_id,
             user_id=user_id,
+            load=SurveyLoad.SUMMARY,
         )
     
     async def save_public_link(self, survey: Survey) -> None:
         await self.survey_repo.session.commit()
-        await self.survey_repo.session.refresh(survey)
 
     async def get_by_public_code(self, code: str) -> Survey | None:
         stmt = (
@@ -42,10 +41,7 @@ class PublicLinkRepository:
                 Survey.is_public == True,
                 Survey.is_deleted == False,
             )
-            .options(
-                selectinload(Survey.settings),   # ✅ مهم
-                selectinload(Survey.questions)
-            )
+            .options(*survey_load_options(SurveyLoad.FULL))
         )
         result = await self.survey_repo.session.execute(stmt)
         return result.scalar_one_or_none()
@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from uuid import UUID
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +10,8 @@ from app.domain.models.servey_model import Survey
 from app.domain.models.settings_model import Setting
 from app.domain.models.question_model import Question
 from app.core.database import get_db
+from app.core.replica import get_read_db
+from app.repository.load_profiles import SurveyLoad, survey_load_options
 
 
 class FormRepository:
@@ -23,23 +26,32 @@ class FormRepository:
         creator_id: UUID, 
         title: str, 
         slug: str
-    ) -> Survey:
-        """ساخت فرم جدید با تنظیمات پیش‌فرض"""
+    ) -> Survey | None:
+        """
+        ساخت فرم جدید با تنظیمات پیش‌فرض
+
+        None → عنوان تکراری برای همین کاربر (uq_user_form_title)
+        """
         
-        # 1. ساخت آبجکت فرم
-        new_survey = Survey(
-            creator_id=creator_id,
-            title=title,
-            slug=slug,
-            is_public=False
+        # 1. INSERT ... ON CONFLICT DO NOTHING RETURNING → بدون چک جداگانه و بدون race
+        stmt = (
+            pg_insert(Survey)
+            .values(
+                creator_id=creator_id,
+                title=title,
+                slug=slug,
+                is_public=False
+            )
+            .on_conflict_do_nothing(constraint="uq_user_form_title")
+            .returning(Survey)
         )
-        self.session.add(new_survey)
-        
-        # 2. فلاش می‌کنیم تا survey_id تولید بشه (ولی هنوز کامیت نمیشه)
-        await self.session.flush() 
-        logger.info(f"Survey {new_survey.survey_id} created for creator {creator_id}")
+        result = await self.session.execute(stmt)
+        new_survey = result.scalar_one_or_none()
+        if new_survey is None:
+            return None
+        logger.info("Survey {} created for creator {}", new_survey.survey_id, creator_id)
 
-        # 3. ساخت تنظیمات پیش‌فرض برای همین فرم
+        # 2. ساخت تنظیمات پیش‌فرض برای همین فرم (در commit فلاش می‌شود)
         default_setting = Setting(
             survey_id=new_survey.survey_id
         )
@@ -47,17 +59,49 @@ class FormRepository:
         
         return new_survey
     
-    async def get_forms_by_creator(self, creator_id: UUID):
-        stmt = select(Survey).where(
+    async def get_forms_by_creator(
+        self,
+        creator_id: UUID,
+        *,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ):
+        """
+        Keyset page of (survey_id, title, created_at) rows — no ORM entities,
+        no relationship loading. Fetches limit + 1 rows to detect a next page.
+        """
+        stmt = select(
+            Survey.survey_id,
+            Survey.title,
+            Survey.created_at,
+        ).where(
             Survey.creator_id == creator_id,
             Survey.is_deleted == False
         )
+
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(Survey.created_at, Survey.survey_id) < tuple_(*after)
+            )
+
+        stmt = stmt.order_by(
+            Survey.created_at.desc(),
+            Survey.survey_id.desc(),
+        ).limit(limit + 1)
+
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
     
 
 
-    async def get_owned_form(self, survey_id, user_id):
+    async def get_owned_form(
+        self,
+        survey_id,
+        user_id,
+        *,
+        load: SurveyLoad = SurveyLoad.OWNERSHIP,
+        for_update: bool = False,
+    ):
         stmt = (
             select(Survey)
             .where(
@@ -65,28 +109,16 @@ class FormRepository:
                 Survey.creator_id == user_id,
                 Survey.is_deleted == False
             )
+            .options(*survey_load_options(load))
         )
+        if for_update:
+            # قفل ردیف فرم → ویرایش‌های هم‌زمان روی یک فرم سریال می‌شوند
+            stmt = stmt.with_for_update()
 
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
     
     
-    async def get_by_creator_and_title(
-       self,
-       creator_id: UUID,
-       title: str
-     ) -> Survey | None:
-        stmt = select(Survey).where(
-        Survey.creator_id == creator_id,
-        Survey.title == title,
-        Survey.is_deleted == False
-    )
-
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
-    
-
-
     async def soft_delete(self, form: Survey):
         form.is_deleted = True
         form.deleted_at = datetime.utcnow()
@@ -102,32 +134,77 @@ class FormRepository:
 
 
 
-    async def get_by_id(self, survey_id):
-        stmt = select(Survey).where(Survey.survey_id == survey_id)
+    async def get_by_id(
+        self,
+        survey_id,
+        *,
+        load: SurveyLoad = SurveyLoad.SUMMARY,
+    ):
+        stmt = (
+            select(Survey)
+            .where(Survey.survey_id == survey_id)
+            .options(*survey_load_options(load))
+        )
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
 
 
+    async def bump_version(self, survey_id: UUID) -> str | None:
+        """
+        UPDATE surveys SET content_version = content_version + 1 RETURNING public_code
+        (ردیف فرم تا پایان تراکنش قفل می‌ماند)
+        """
+        result = await self.session.execute(
+            update(Survey)
+            .where(Survey.survey_id == survey_id)
+            .values(content_version=Survey.content_version + 1)
+            .returning(Survey.public_code)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
     async def save(self, form):
         self.session.add(form)
         await self.session.commit()
-        await self.session.refresh(form)
         return form    
     
 
-    async def get_deleted_forms(self, user_id: UUID):
+    async def get_deleted_forms(
+        self,
+        user_id: UUID,
+        *,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ):
+        # ردیف‌های قدیمی با is_deleted ولی بدون deleted_at → created_at
+        # (کلید keyset هیچ‌وقت NULL نیست)
+        trashed_at = func.coalesce(Survey.deleted_at, Survey.created_at)
         stmt = (
-            select(Survey)
+            select(
+                Survey.survey_id,
+                Survey.title,
+                Survey.deleted_at,
+                trashed_at.label("trashed_at"),
+            )
             .where(
                 Survey.creator_id == user_id,
                 Survey.is_deleted == True
             )
-            .order_by(Survey.deleted_at.desc())
         )
 
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(trashed_at, Survey.survey_id) < tuple_(*after)
+            )
+
+        stmt = stmt.order_by(
+            trashed_at.desc(),
+            Survey.survey_id.desc(),
+        ).limit(limit + 1)
+
         result = await self.session.execute(stmt)
-        return result.scalars().all() 
+        return result.all()
     
     async def get_deleted_owned_form(
        self,
@@ -139,7 +216,7 @@ class FormRepository:
                Survey.survey_id == survey_id,
                Survey.creator_id == user_id,
                Survey.is_deleted.is_(True),
-           )
+           ).options(*survey_load_options(SurveyLoad.OWNERSHIP))
        )
        return result.scalar_one_or_none()
        
@@ -153,6 +230,13 @@ class FormRepository:
 # DEPENDENCY (برای FastAPI)
 # ---------------------------------------
 async def get_form_repository(
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_db, scope="function")
+) -> FormRepository:
+    return FormRepository(session)
+
+
+async def get_read_form_repository(
+    session: AsyncSession = Depends(get_read_db, scope="function")
 ) -> FormRepository:
+    """فقط برای متدهای خواندنی (replica در صورت امکان)"""
     return FormRepository(session)
@@ -0,0 +1,36 @@
+from enum import Enum
+
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.domain.models.servey_model import Survey
+
+
+class SurveyLoad(str, Enum):
+    """
+    پروفایل‌های بارگذاری Survey
+
+    روابط Survey به صورت پیش‌فرض lazy="raise" هستند؛ هر query باید
+    صراحتاً بگوید چه چیزی لازم دارد.
+    """
+    # فقط PK + public_code (برای چک مالکیت، bump و invalidate)
+    OWNERSHIP = "ownership"
+    # همه‌ی ستون‌های Survey، بدون روابط
+    SUMMARY = "summary"
+    # Survey + settings + questions (لینک عمومی)
+    FULL = "full"
+
+
+_OPTIONS = {
+    SurveyLoad.OWNERSHIP: (
+        load_only(Survey.survey_id, Survey.public_code, raiseload=True),
+    ),
+    SurveyLoad.SUMMARY: (),
+    SurveyLoad.FULL: (
+        joinedload(Survey.settings),
+        selectinload(Survey.questions),
+    ),
+}
+
+
+def survey_load_options(load: SurveyLoad) -> tuple:
+    return _OPTIONS[load]
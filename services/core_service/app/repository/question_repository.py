@@ -1,58 +1,21 @@
 from uuid import UUID
-from sqlalchemy import select, func
+from sqlalchemy import Boolean, Integer, String, Text, cast, column, delete, func, insert, literal, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from loguru import logger
 
 from app.domain.models.question_model import Question
+from app.domain.models.servey_model import Survey
+from app.services.question_order import ORDER_GAP
 from app.core.database import get_db
+from app.core.replica import get_read_db
 
 
 class QuestionRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    # -----------------------------------
-    # GET LAST ORDER INDEX
-    # -----------------------------------
-    async def get_last_order(self, survey_id: UUID) -> int:
-        stmt = select(
-            func.coalesce(func.max(Question.order_index), 0)
-        ).where(
-            Question.survey_id == survey_id
-        )
-
-        result = await self.session.execute(stmt)
-        last_order = result.scalar_one()
-
-        logger.debug(
-            f"Last order_index for survey {survey_id}: {last_order}"
-        )
-        return last_order
-    # -----------------------------------
-    # CHECK QUESTION EXISTS (ANTI DUP)
-    # -----------------------------------
-    async def exists_question(
-        self,
-        survey_id: UUID,
-        question_text: str,
-    ) -> bool:
-        stmt = select(
-            func.count(Question.question_id)
-        ).where(
-            Question.survey_id == survey_id,
-            Question.question_text == question_text,
-        )
-
-        result = await self.session.execute(stmt)
-        count = result.scalar_one()
-
-        logger.debug(
-            f"Duplicate check for survey={survey_id}, text='{question_text}': {count}"
-        )
-
-        return count > 0
-
     # -----------------------------------
     # CREATE QUESTION
     # -----------------------------------
@@ -64,30 +27,40 @@ class QuestionRepository:
         is_required: bool,
         min_length: int,
         max_length: int,
-        order_index: int
-    ) -> Question:
-        question = Question(
-            survey_id=survey_id,
-            type="text",
-            question_text=question_text,
-            description=description,
-            is_required=is_required,
-            min_length=min_length,
-            max_length=max_length,
-            order_index=order_index,
+    ) -> Question | None:
+        # ✅ append: order_index داخل همان INSERT حساب می‌شود (بدون MAX جداگانه)
+        #    فراخوان باید ردیف فرم را قفل کرده باشد (get_owned_form(for_update=True))
+        next_order = (
+            select(func.coalesce(func.max(Question.order_index), 0) + ORDER_GAP)
+            .where(Question.survey_id == survey_id)
+            .scalar_subquery()
         )
-
-        self.session.add(question)
-
-        # flush → id ساخته میشه ولی commit هنوز نداریم
-        await self.session.flush()
-
-        logger.info(
-            f"Question {question.question_id} created "
-            f"for survey {survey_id} at order {order_index}"
+        stmt = (
+            pg_insert(Question)
+            .values(
+                survey_id=survey_id,
+                type="text",
+                question_text=question_text,
+                description=description,
+                is_required=is_required,
+                min_length=min_length,
+                max_length=max_length,
+                order_index=next_order,
+            )
+            # متن تکراری → هیچ ردیفی برنمی‌گردد (به جای COUNT قبل از INSERT)
+            .on_conflict_do_nothing(constraint="uq_survey_text_question")
+            .returning(Question)
         )
+        result = await self.session.execute(stmt)
+        question = result.scalar_one_or_none()
+
+        if question is not None:
+            logger.info(
+                "Question {} created for survey {}", question.question_id, survey_id
+            )
 
         return question
+
     async def get_by_id_and_survey(
         self,
         question_id: UUID,
@@ -126,6 +99,109 @@ class QuestionRepository:
             )
         )
         return result.scalar_one_or_none()  
+
+    # -----------------------------------
+    # OWNED QUESTIONS (مالکیت + سوال در یک statement)
+    # -----------------------------------
+    @staticmethod
+    def _owned_survey(survey_id: UUID, user_id: UUID) -> tuple:
+        return (
+            Survey.survey_id == survey_id,
+            Survey.creator_id == user_id,
+            Survey.is_deleted == False,
+        )
+
+    def _bump_owned_survey(self, survey_id: UUID, user_id: UUID):
+        """
+        CTE: content_version فرم را (فقط اگر مال کاربر باشد) یکی زیاد می‌کند
+        و survey_id/public_code را برمی‌گرداند
+        """
+        return (
+            update(Survey)
+            .where(*self._owned_survey(survey_id, user_id))
+            .values(content_version=Survey.content_version + 1)
+            .returning(Survey.survey_id, Survey.public_code)
+            .cte("owned_survey")
+        )
+
+    async def get_owned_question(
+        self,
+        question_id: UUID,
+        survey_id: UUID,
+        user_id: UUID,
+    ) -> Question | None:
+        stmt = (
+            select(Question)
+            .join(Survey, Survey.survey_id == Question.survey_id)
+            .where(
+                Question.question_id == question_id,
+                *self._owned_survey(survey_id, user_id),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def list_owned(
+        self,
+        survey_id: UUID,
+        user_id: UUID,
+    ) -> list[Question]:
+        stmt = (
+            select(Question)
+            .join(Survey, Survey.survey_id == Question.survey_id)
+            .where(*self._owned_survey(survey_id, user_id))
+            .order_by(Question.order_index.asc())
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def update_owned_question(
+        self,
+        question_id: UUID,
+        survey_id: UUID,
+        user_id: UUID,
+        values: dict,
+    ):
+        """
+        UPDATE questions ... FROM owned_survey RETURNING questions.*, public_code
+
+        None → سوال پیدا نشد یا فرم مال کاربر نیست
+        """
+        owned = self._bump_owned_survey(survey_id, user_id)
+        stmt = (
+            update(Question)
+            .where(
+                Question.question_id == question_id,
+                Question.survey_id == owned.c.survey_id,
+            )
+            .values(**values)
+            .returning(Question, owned.c.public_code)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def delete_owned_question(
+        self,
+        question_id: UUID,
+        survey_id: UUID,
+        user_id: UUID,
+    ):
+        """
+        DELETE FROM questions USING owned_survey RETURNING question_id, public_code
+        """
+        owned = self._bump_owned_survey(survey_id, user_id)
+        stmt = (
+            delete(Question)
+            .where(
+                Question.question_id == question_id,
+                Question.survey_id == owned.c.survey_id,
+            )
+            .returning(Question.question_id, owned.c.public_code)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
     
 
 
@@ -134,11 +210,186 @@ class QuestionRepository:
 
     
 
+    # -----------------------------------
+    # BATCH (هر نوع عملیات → حداکثر یک statement)
+    # -----------------------------------
+    BATCH_COLUMNS = (
+        Question.question_id,
+        Question.question_text,
+        Question.description,
+        Question.is_required,
+        Question.type,
+        Question.order_index,
+    )
+
+    async def list_rows(self, survey_id: UUID) -> list[dict]:
+        """سوال‌های فرم به صورت dict (بدون ORM entity)، به ترتیب order_index"""
+        stmt = (
+            select(*self.BATCH_COLUMNS)
+            .where(Question.survey_id == survey_id)
+            .order_by(Question.order_index.asc())
+        )
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    async def delete_many(self, survey_id: UUID, question_ids: list[UUID]) -> None:
+        if not question_ids:
+            return
+        await self.session.execute(
+            delete(Question)
+            .where(
+                Question.survey_id == survey_id,
+                Question.question_id.in_(question_ids),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def insert_many(self, survey_id: UUID, rows: list[dict]) -> None:
+        """INSERT ... VALUES (...), (...), ... (یک statement)"""
+        if not rows:
+            return
+        await self.session.execute(
+            insert(Question).values([
+                {
+                    "question_id": row["question_id"],
+                    "survey_id": survey_id,
+                    "type": row["type"],
+                    "question_text": row["question_text"],
+                    "description": row["description"],
+                    "is_required": row["is_required"],
+                    "min_length": row["min_length"],
+                    "max_length": row["max_length"],
+                    "order_index": row["order_index"],
+                }
+                for row in rows
+            ])
+        )
+
+    async def release_texts(self, survey_id: UUID, question_ids: list[UUID]) -> None:
+        """
+        متن موقت یکتا برای سوال‌هایی که در همان batch تغییر نام می‌دهند.
+        uq_survey_text_question بعد از هر ردیف چک می‌شود؛ بدون این مرحله
+        جابه‌جایی یا زنجیره‌ی تغییر نام (B→C, A→B) بسته به ترتیب ردیف‌ها در
+        update_many خطای تکراری می‌دهد.
+        """
+        if not question_ids:
+            return
+        await self.session.execute(
+            update(Question)
+            .where(
+                Question.survey_id == survey_id,
+                Question.question_id.in_(question_ids),
+            )
+            # \x01 در متن واقعی سوال نمی‌آید
+            .values(question_text=literal("\x01") + cast(Question.question_id, String))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def update_many(self, survey_id: UUID, rows: list[dict]) -> None:
+        """
+        UPDATE questions SET ... FROM (VALUES (...), (...)) AS v
+        WHERE questions.question_id = v.question_id
+        """
+        if not rows:
+            return
+        data = values(
+            column("question_id", PG_UUID(as_uuid=True)),
+            column("question_text", Text),
+            column("description", Text),
+            column("is_required", Boolean),
+            column("order_index", Integer),
+            name="v",
+        ).data([
+            (
+                row["question_id"],
+                row["question_text"],
+                row["description"],
+                row["is_required"],
+                row["order_index"],
+            )
+            for row in rows
+        ])
+        await self.session.execute(
+            update(Question)
+            .where(
+                Question.survey_id == survey_id,
+                Question.question_id == data.c.question_id,
+            )
+            .values(
+                question_text=data.c.question_text,
+                description=data.c.description,
+                is_required=data.c.is_required,
+                order_index=data.c.order_index,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    # -----------------------------------
+    # ORDER KEYS (gap-based ordering)
+    # -----------------------------------
+    async def list_order_keys(self, survey_id: UUID) -> list[tuple[UUID, int]]:
+        stmt = (
+            select(Question.question_id, Question.order_index)
+            .where(Question.survey_id == survey_id)
+            .order_by(Question.order_index.asc())
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def set_order_index(
+        self,
+        question_id: UUID,
+        survey_id: UUID,
+        order_index: int,
+    ) -> Question | None:
+        """جابه‌جایی = UPDATE یک ردیف"""
+        stmt = (
+            update(Question)
+            .where(
+                Question.question_id == question_id,
+                Question.survey_id == survey_id,
+            )
+            .values(order_index=order_index)
+            .returning(Question)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def update_order_keys(
+        self,
+        survey_id: UUID,
+        keys: list[tuple[UUID, int]],
+    ) -> None:
+        """rebalance: UPDATE ... FROM (VALUES (id, order_index), ...)"""
+        if not keys:
+            return
+        data = values(
+            column("question_id", PG_UUID(as_uuid=True)),
+            column("order_index", Integer),
+            name="v",
+        ).data(keys)
+        await self.session.execute(
+            update(Question)
+            .where(
+                Question.survey_id == survey_id,
+                Question.question_id == data.c.question_id,
+            )
+            .values(order_index=data.c.order_index)
+            .execution_options(synchronize_session=False)
+        )
+
 
 # ---------------------------------------
 # DEPENDENCY (برای FastAPI)
 # ---------------------------------------
 async def get_question_repository(
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_db, scope="function"),
+) -> QuestionRepository:
+    return QuestionRepository(session)
+
+
+async def get_read_question_repository(
+    session: AsyncSession = Depends(get_read_db, scope="function"),
 ) -> QuestionRepository:
     return QuestionRepository(session)
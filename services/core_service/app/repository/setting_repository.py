@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.domain.models.servey_model import Survey
 from app.domain.models.settings_model import Setting
+from app.repository.load_profiles import SurveyLoad, survey_load_options
 
 
 class SettingRepository:
@@ -15,11 +17,20 @@ class SettingRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_owned_survey(self, survey_id, user_id) -> Survey | None:
+        result = await self.session.execute(
+            select(Survey).where(
+                Survey.survey_id == survey_id,
+                Survey.creator_id == user_id,
+                Survey.is_deleted == False,
+            ).options(*survey_load_options(SurveyLoad.OWNERSHIP))
+        )
+        return result.scalar_one_or_none()
+
     async def create_default(self, survey_id):
         setting = Setting(survey_id=survey_id)
         self.session.add(setting)
         await self.session.commit()
-        await self.session.refresh(setting)
         return setting
 
     async def update(self, setting: Setting, data: dict):
@@ -27,5 +38,4 @@ class SettingRepository:
             setattr(setting, key, value)
 
         await self.session.commit()
-        await self.session.refresh(setting)
         return setting
@@ -1,23 +1,70 @@
 from datetime import datetime, timezone
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from uuid import UUID
 import secrets
 import string
 
+from app.core.config import get_settings
 from app.domain.models.servey_model import Survey
+from app.domain.schemas.public_survey_schema import PublicSurveyResponse
 from app.repository.form_repository import (
     FormRepository,
     get_form_repository,
+    get_read_form_repository,
 )
 from app.repository.URL_repository import PublicLinkRepository
+from app.services.survey_cache import (
+    SurveySnapshot,
+    SurveySnapshotCache,
+    survey_cache,
+)
+
+config = get_settings()
+
 
 def generate_public_code(length: int = 8) -> str:
     alphabet = string.ascii_letters + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(length))
 
+def build_snapshot(survey: Survey) -> SurveySnapshot:
+    payload = PublicSurveyResponse.model_validate(survey)
+    settings = survey.settings
+    return SurveySnapshot(
+        survey_id=str(survey.survey_id),
+        version=survey.content_version,
+        body=payload.model_dump_json().encode("utf-8"),
+        start_date=settings.start_date if settings else None,
+        end_date=settings.end_date if settings else None,
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_control_for(snapshot: SurveySnapshot, now: datetime) -> str:
+    """max-age تا end_date محدود می‌شود تا بعد از پایان نظرسنجی سرو نشود"""
+    max_age = config.PUBLIC_SURVEY_MAX_AGE
+    if snapshot.end_date:
+        remaining = int((snapshot.end_date - now).total_seconds())
+        max_age = max(0, min(max_age, remaining))
+    return f"public, max-age={max_age}"
+
+
 class SurveyPublicLinkService:
-    def __init__(self, repo: PublicLinkRepository):
+    def __init__(
+        self,
+        repo: PublicLinkRepository,
+        cache: SurveySnapshotCache = survey_cache,
+    ):
         self.repo = repo
+        self.cache = cache
 
 
     async def get_or_create_public_link(
@@ -42,6 +89,7 @@ class SurveyPublicLinkService:
 
         survey.public_code = generate_public_code()
         survey.is_public = True
+        survey.bump_content_version()
 
         await self.repo.save_public_link(survey)
 
@@ -65,37 +113,66 @@ class SurveyPublicLinkService:
                 detail="You do not have access to this survey",
             )
 
+        old_code = survey.public_code
         survey.public_code = generate_public_code()
         survey.is_public = True
+        survey.bump_content_version()
 
         await self.repo.save_public_link(survey)
 
+        # لینک قبلی دیگر نباید از cache سرو شود
+        await self.cache.invalidate(survey_id, old_code)
+
         return survey.public_code
     
     
-    async def open(self, code: str):
-        survey = await self.repo.get_by_public_code(code)
-
-        if not survey:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Survey not found or not public",
+    async def open(self, code: str, if_none_match: str | None = None) -> Response:
+        snapshot = await self.cache.get(code)
+
+        if snapshot is None:
+            # قبل از خواندن DB: write هم‌زمان بعد از این، set را بی‌اثر می‌کند
+            generation = await self.cache.generation(code)
+            survey = await self.repo.get_by_public_code(code)
+
+            if not survey:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Survey not found or not public",
+                )
+
+            snapshot = build_snapshot(survey)
+            # خوانده‌شده از replica ممکن است کمی عقب باشد → TTL کوتاه
+            from_replica = self.repo.survey_repo.session.info.get("replica", False)
+            await self.cache.set(
+                code,
+                snapshot,
+                generation,
+                ttl=config.REPLICA_SNAPSHOT_TTL if from_replica else None,
             )
 
-        # ✅ اگر settings داری
-        settings = survey.settings
-        if settings:
-            now = datetime.now(timezone.utc)
+        # ✅ بازه‌ی زمانی همیشه چک می‌شود (حتی روی cache hit)
+        now = datetime.now(timezone.utc)
 
+        if snapshot.start_date and now < snapshot.start_date:
+            raise HTTPException(403, "Survey has not started yet")
 
-           
-            if settings.start_date and now < settings.start_date:
-                raise HTTPException(403, "Survey has not started yet")
+        if snapshot.end_date and now > snapshot.end_date:
+            raise HTTPException(403, "Survey has ended")
 
-            if settings.end_date and now > settings.end_date:
-                raise HTTPException(403, "Survey has ended")
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": cache_control_for(snapshot, now),
+        }
 
-        return survey
+        # ⚡ نسخه‌ی مرورگر/CDN هنوز معتبر است
+        if etag_matches(if_none_match, snapshot.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(
+            content=snapshot.body,
+            media_type="application/json",
+            headers=headers,
+        )
     
 
 
@@ -106,3 +183,8 @@ def get_survey_public_link_service(
     return SurveyPublicLinkService(repo)
 
 
+def get_public_survey_service(
+    survey_repo: FormRepository = Depends(get_read_form_repository),
+) -> SurveyPublicLinkService:
+    """لینک عمومی فقط خواندنی است → replica در صورت امکان"""
+    return SurveyPublicLinkService(PublicLinkRepository(survey_repo))
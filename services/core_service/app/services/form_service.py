@@ -4,27 +4,37 @@ from fastapi import Depends, HTTPException, status
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import get_db
+from app.core.database import get_db
+from app.core.replica import get_read_db
+from app.core.pagination import decode_cursor, encode_cursor
 from app.repository.form_repository import FormRepository, get_form_repository
+from app.services.survey_cache import SurveySnapshotCache, survey_cache
 
 
 class FormService:
     def __init__(
         self,
-        repository: FormRepository = Depends(get_form_repository)
+        repository: FormRepository = Depends(get_form_repository),
+        cache: SurveySnapshotCache = survey_cache,
     ):
         self.repository = repository
+        self.cache = cache
 
     async def create_new_form(self, creator_id: UUID, title: str):
-        logger.info(f"Creating new form '{title}' for creator {creator_id}")
+        logger.info("Creating new form '{}' for creator {}", title, creator_id)
 
-        # ✅ 1. چک تکراری بودن فرم
-        existing = await self.repository.get_by_creator_and_title(
+        # ✅ 1. تولید اسلاگ یکتا
+        slug = self._generate_slug(title)
+        logger.debug("Generated slug: {}", slug)
+
+        # ✅ 2. ساخت فرم (عنوان تکراری → ON CONFLICT DO NOTHING → None)
+        survey = await self.repository.create_survey(
             creator_id=creator_id,
-            title=title
+            title=title,
+            slug=slug
         )
 
-        if existing:
+        if survey is None:
             logger.warning(
                 f"Duplicate form attempt by creator {creator_id} for title '{title}'"
             )
@@ -33,27 +43,14 @@ class FormService:
                 detail="You already have a form with this title"
             )
 
-        # ✅ 2. تولید اسلاگ یکتا
-        slug = self._generate_slug(title)
-        logger.debug(f"Generated slug: {slug}")
-
-        # ✅ 3. ساخت فرم
-        survey = await self.repository.create_survey(
-            creator_id=creator_id,
-            title=title,
-            slug=slug
-        )
-
-        # ✅ 4. commit نهایی
+        # ✅ 3. commit نهایی
         try:
             await self.repository.session.commit()
         except Exception:
             await self.repository.session.rollback()
             raise
 
-        await self.repository.session.refresh(survey)
-
-        logger.info(f"Form {survey.survey_id} created successfully")
+        logger.info("Form {} created successfully", survey.survey_id)
         return survey
 
     def _generate_slug(self, title: str) -> str:
@@ -61,8 +58,30 @@ class FormService:
         random_suffix = uuid.uuid4().hex[:6]
         return f"{safe_title}-{random_suffix}"
 
-    async def get_my_forms(self, creator_id: UUID):
-        return await self.repository.get_forms_by_creator(creator_id)
+    async def get_my_forms(
+        self,
+        creator_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+    ):
+        """
+        📄 یک صفحه از فرم‌ها (جدیدترین اول) + cursor صفحه‌ی بعد
+        """
+        rows = await self.repository.get_forms_by_creator(
+            creator_id,
+            limit=limit,
+            after=decode_cursor(cursor) if cursor else None,
+        )
+        return self._page(rows, limit, "created_at")
+
+    @staticmethod
+    def _page(rows, limit: int, sort_field: str):
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(getattr(last, sort_field), last.survey_id)
     
 
 
@@ -80,7 +99,9 @@ class FormService:
             )
 
         # 2️⃣ حذف
+        form.bump_content_version()
         await self.repository.soft_delete(form)
+        await self.cache.invalidate(survey_id, form.public_code)
 
         return {
             "message": "Form deleted successfully",
@@ -95,8 +116,10 @@ class FormService:
             raise HTTPException(status_code=404, detail="Form not found")
 
         form.title = data.title
+        form.bump_content_version()
 
         await self.repository.save(form)
+        await self.cache.invalidate(survey_id, form.public_code)
 
         return {
             "message": "Form name updated successfully",
@@ -134,11 +157,21 @@ class FormService:
            "survey_id": form.survey_id,
            "title": form.title,
     }
-    async def list_deleted_forms(self, user_id: UUID):
+    async def list_deleted_forms(
+        self,
+        user_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+    ):
         """
-        🗑️ Get all soft-deleted forms (Trash Bin)
+        🗑️ Get soft-deleted forms (Trash Bin), most recently deleted first
         """
-        return await self.repository.get_deleted_forms(user_id)  
+        rows = await self.repository.get_deleted_forms(
+            user_id,
+            limit=limit,
+            after=decode_cursor(cursor) if cursor else None,
+        )
+        return self._page(rows, limit, "trashed_at")
     
     async def hard_delete_form(self, survey_id: UUID, user_id: UUID):
       form = await self.repository.get_deleted_owned_form(
@@ -167,7 +200,13 @@ class FormService:
 
 
 def get_form_service(
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_db, scope="function"),
 ) -> FormService:
     form_repo = FormRepository(session)
-    return FormService(form_repo)
\ No newline at end of file
+    return FormService(form_repo)
+
+
+def get_read_form_service(
+    session: AsyncSession = Depends(get_read_db, scope="function"),
+) -> FormService:
+    return FormService(FormRepository(session))
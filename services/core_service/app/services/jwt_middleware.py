@@ -1,103 +1,131 @@
 # app/services/jwt_middleware.py
 
-from fastapi import Request, HTTPException
 import jwt
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.core.config import get_settings
+from app.services.token_cache import token_cache
 import os
 from loguru import logger
 
 settings = get_settings()
 
+# 1️⃣ مسیرهای Public (tuple → یک فراخوانی startswith)
+PUBLIC_ROUTES = (
+    "/api/v1/auth",
+    "/docs",
+    "/openapi.json",
+    "/redoc",
+    "/favicon.ico",
+    "/health",
+    "/metrics",
+)
+
+DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
+DEV_USER_ID = "00000000-0000-0000-0000-000000000000"
 
-async def jwt_middleware(request: Request, call_next):
-    """
-    Middleware برای بررسی JWT در همه مسیرهای Protected
-    """
-    path = request.url.path
-    
-    # 1️⃣ مسیرهای Public
-    public_routes = (
-        "/api/v1/auth",
-        "/docs",
-        "/openapi.json",
-        "/redoc",
-        "/favicon.ico",
-        "/health",
-    )
-
-    if any(path.startswith(p) for p in public_routes):
-        return await call_next(request)
-
-    # 2️⃣ Dev mode bypass
-    if os.getenv("DEV_MODE", "false").lower() == "true":
-        logger.warning("🚨 DEV_MODE is ON - Bypassing JWT check")
-        request.state.user_id = "00000000-0000-0000-0000-000000000000"
-        return await call_next(request)
-
-    # 3️⃣ بررسی Header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        logger.warning(f"❌ Missing token for {path}")
-        raise HTTPException(
-            status_code=401, 
-            detail="Missing or invalid Authorization header"
-        )
 
-    token = auth_header.split(" ")[1]
+class AuthError(Exception):
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
 
-    # 4️⃣ Decode و Verify
+
+def _get_authorization(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            return value.decode("latin-1")
+    return None
+
+
+def verify_access_token(token: str) -> tuple[str, float | None]:
+    """
+    Decode و Verify → (user_id, exp)
+    """
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM],
         )
-        
-        # 5️⃣ بررسی نوع توکن
-        if payload.get("type") != "access":
-            logger.warning(f"❌ Invalid token type: {payload.get('type')}")
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token type. Expected 'access' token."
-            )
-        
-        # 6️⃣ استخراج user_id
-        user_id = payload.get("sub")
-        if not user_id:
-            logger.warning("❌ Token payload missing 'sub' field")
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token payload"
-            )
-        
-        # 7️⃣ ذخیره در request.state
-        request.state.user_id = user_id
-        logger.info(f"✅ User {user_id} authenticated for {path}")
-        
-    except HTTPException:
-        # اگه خودمون HTTPException انداختیم، بدون تغییر بفرستش بیرون
-        raise
-        
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token has expired")
+    except jwt.InvalidSignatureError:
+        raise AuthError("Invalid token signature")
     except Exception as e:
-        # همه خطاهای دیگه (از جمله JWT)
-        error_msg = str(e).lower()
         logger.error(f"❌ JWT Error: {e}")
-        
-        if "expired" in error_msg:
-            raise HTTPException(
-                status_code=401,
-                detail="Token has expired"
-            )
-        elif "signature" in error_msg:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token signature"
-            )
-        else:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token"
+        raise AuthError("Invalid token")
+
+    # 5️⃣ بررسی نوع توکن
+    if payload.get("type") != "access":
+        logger.warning(f"❌ Invalid token type: {payload.get('type')}")
+        raise AuthError("Invalid token type. Expected 'access' token.")
+
+    # 6️⃣ استخراج user_id
+    user_id = payload.get("sub")
+    if not user_id:
+        logger.warning("❌ Token payload missing 'sub' field")
+        raise AuthError("Invalid token payload")
+
+    return user_id, payload.get("exp")
+
+
+class JWTAuthMiddleware:
+    """
+    Pure ASGI middleware برای بررسی JWT در همه مسیرهای Protected
+
+    خطاها مستقیماً به صورت 401 JSON برگردانده می‌شوند (به جای raise)،
+    چون exception داخل middleware به exception handlerها نمی‌رسد.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(PUBLIC_ROUTES):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        # 2️⃣ Dev mode bypass
+        if DEV_MODE:
+            logger.warning("🚨 DEV_MODE is ON - Bypassing JWT check")
+            state["user_id"] = DEV_USER_ID
+            await self.app(scope, receive, send)
+            return
+
+        # 3️⃣ بررسی Header
+        auth_header = _get_authorization(scope)
+        if not auth_header or not auth_header.startswith("Bearer "):
+            logger.warning(f"❌ Missing token for {scope['path']}")
+            await self._unauthorized(
+                "Missing or invalid Authorization header", scope, receive, send
             )
+            return
+
+        token = auth_header.split(" ")[1]
+
+        # ⚡ توکن قبلاً verify شده → بدون crypto و parse
+        user_id = token_cache.get(token)
+        if user_id is None:
+            try:
+                user_id, exp = verify_access_token(token)
+            except AuthError as e:
+                await self._unauthorized(e.detail, scope, receive, send)
+                return
+            token_cache.put(token, user_id, exp)
+
+        # 7️⃣ ذخیره در request.state
+        state["user_id"] = user_id
+        logger.debug("✅ User {} authenticated for {}", user_id, scope["path"])
+
+        # 8️⃣ ادامه درخواست
+        await self.app(scope, receive, send)
 
-    # 8️⃣ ادامه درخواست
-    return await call_next(request)
+    @staticmethod
+    async def _unauthorized(
+        detail: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        response = JSONResponse(status_code=401, content={"detail": detail})
+        await response(scope, receive, send)
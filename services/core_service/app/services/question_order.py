@@ -0,0 +1,169 @@
+# app/services/question_order.py
+
+import asyncio
+from bisect import bisect_left
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+# فاصله‌ی پیش‌فرض بین order_indexها → درج/جابه‌جایی فقط یک ردیف را تغییر می‌دهد
+ORDER_GAP = 1024
+
+# اگر بعد از جای‌گذاری فاصله‌ای کمتر از این بماند، rebalance در پس‌زمینه
+MIN_GAP = 2
+
+
+def spread(count: int) -> list[int]:
+    """کلیدهای تازه با فاصله‌ی کامل: ORDER_GAP, 2*ORDER_GAP, ..."""
+    return [ORDER_GAP * (i + 1) for i in range(count)]
+
+
+def respread(keys: list[tuple[UUID, int]]) -> list[tuple[UUID, int]]:
+    """(question_id, order_index) مرتب → فقط ردیف‌هایی که کلیدشان عوض می‌شود"""
+    return [
+        (question_id, new_key)
+        for (question_id, old_key), new_key in zip(keys, spread(len(keys)))
+        if old_key != new_key
+    ]
+
+
+def key_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """
+    یک کلید بین دو همسایه (None = ابتدا/انتهای لیست)
+    None یعنی جا تمام شده و باید rebalance شود.
+    """
+    if before is None and after is None:
+        return ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    low = 0 if before is None else before
+    if after - low < 2:
+        return None
+    return low + (after - low) // 2
+
+
+def is_crowded(before: Optional[int], key: int, after: Optional[int]) -> bool:
+    gaps = [key - before if before is not None else key]
+    if after is not None:
+        gaps.append(after - key)
+    return min(gaps) < MIN_GAP
+
+
+def assign_keys(keys: list[Optional[int]]) -> Optional[list[int]]:
+    """
+    کلیدهای فعلی به ترتیب نهایی (None برای سوال جدید) → کلیدهای نهایی
+
+    بلندترین زیردنباله‌ی صعودی دست نمی‌خورد؛ بقیه بین همسایه‌ها جا می‌گیرند.
+    None یعنی جا کافی نیست و همه باید spread شوند.
+    """
+    keep = _longest_increasing(keys)
+    result: list[Optional[int]] = list(keys)
+    for i in range(len(keys)):
+        if i not in keep:
+            result[i] = None
+
+    i = 0
+    while i < len(result):
+        if result[i] is not None:
+            i += 1
+            continue
+
+        # بازه‌ی [i, j) بدون کلید، بین result[i-1] و result[j]
+        j = i
+        while j < len(result) and result[j] is None:
+            j += 1
+
+        low = result[i - 1] if i > 0 else 0
+        count = j - i
+        if j < len(result):
+            step = (result[j] - low) // (count + 1)
+            if step < 1:
+                return None
+        else:
+            step = ORDER_GAP
+
+        for offset in range(count):
+            result[i + offset] = low + step * (offset + 1)
+        i = j
+
+    return result
+
+
+def _longest_increasing(keys: list[Optional[int]]) -> set[int]:
+    """ایندکس‌های بلندترین زیردنباله‌ی اکیداً صعودی (فقط کلیدهای مثبت)"""
+    tails: list[int] = []
+    tail_index: list[int] = []
+    parent: dict[int, Optional[int]] = {}
+
+    for i, key in enumerate(keys):
+        if key is None or key <= 0:
+            continue
+        pos = bisect_left(tails, key)
+        parent[i] = tail_index[pos - 1] if pos > 0 else None
+        if pos == len(tails):
+            tails.append(key)
+            tail_index.append(i)
+        else:
+            tails[pos] = key
+            tail_index[pos] = i
+
+    keep: set[int] = set()
+    node = tail_index[-1] if tail_index else None
+    while node is not None:
+        keep.add(node)
+        node = parent[node]
+    return keep
+
+
+class QuestionRebalancer:
+    """
+    Rebalance در پس‌زمینه: وقتی فاصله‌ها کم شد، order_indexهای یک فرم
+    دوباره با ORDER_GAP پخش می‌شوند (هر فرم حداکثر یک task هم‌زمان).
+    """
+
+    def __init__(self):
+        self._pending: set[UUID] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, survey_id: UUID) -> None:
+        if survey_id in self._pending:
+            return
+        self._pending.add(survey_id)
+        task = asyncio.create_task(self._run(survey_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, survey_id: UUID) -> None:
+        # import محلی: جلوگیری از import حلقه‌ای با repositoryها
+        from app.core.database import async_session
+        from app.repository.form_repository import FormRepository
+        from app.repository.question_repository import QuestionRepository
+        from app.services.survey_cache import survey_cache
+
+        try:
+            async with async_session() as session:
+                # bump نسخه = قفل ردیف فرم (هم‌زمان با batch/move اجرا نمی‌شود)
+                public_code = await FormRepository(session).bump_version(survey_id)
+                question_repo = QuestionRepository(session)
+                keys = await question_repo.list_order_keys(survey_id)
+                await question_repo.update_order_keys(survey_id, respread(keys))
+                await session.commit()
+            await survey_cache.invalidate(survey_id, public_code)
+            logger.info("[QuestionOrder] Rebalanced survey {}", survey_id)
+        except Exception as e:
+            logger.error("[QuestionOrder] Rebalance failed for {}: {}", survey_id, e)
+        finally:
+            self._pending.discard(survey_id)
+
+    async def drain(self) -> None:
+        """shutdown: منتظر taskهای در حال اجرا"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+question_rebalancer = QuestionRebalancer()
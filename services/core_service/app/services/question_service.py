@@ -1,22 +1,46 @@
+import uuid
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import violated_constraint
 
 from app.repository.question_repository import (
     QuestionRepository,
     get_question_repository,
+    get_read_question_repository,
 )
 from app.repository.form_repository import (
     FormRepository,
     get_form_repository,
+    get_read_form_repository,
 )
 
 from app.domain.schemas.question_schema import (
+    BatchCreateQuestion,
+    BatchDeleteQuestion,
+    BatchMoveQuestion,
+    BatchUpdateQuestion,
     CreateTextQuestionRequest,
     DeleteQuestionResponse,
+    MoveQuestionRequest,
     QuestionListItemSchema,
+    QuestionBatchRequest,
     QuestionListResponse,
     QuestionUpdateSchema,
 )
+from app.services.question_order import (
+    QuestionRebalancer,
+    assign_keys,
+    is_crowded,
+    key_between,
+    question_rebalancer,
+    respread,
+    spread,
+)
+from app.services.survey_cache import SurveySnapshotCache, survey_cache
+
+DUPLICATE_QUESTION = "Question with same text already exists in this form"
 
 
 class QuestionService:
@@ -24,9 +48,13 @@ class QuestionService:
         self,
         question_repo: QuestionRepository,
         form_repo: FormRepository,
+        cache: SurveySnapshotCache = survey_cache,
+        rebalancer: QuestionRebalancer = question_rebalancer,
     ):
         self.question_repo = question_repo
         self.form_repo = form_repo
+        self.cache = cache
+        self.rebalancer = rebalancer
 
     # =========================================================
     # CREATE — Add Text Question
@@ -38,10 +66,12 @@ class QuestionService:
         user_id: UUID,
         payload: CreateTextQuestionRequest,
     ):
-        # ✅ Ownership check
+        # ✅ Ownership check + قفل ردیف فرم (مثل move/batch): بدون قفل، دو append
+        #    هم‌زمان در READ COMMITTED یک MAX را می‌بینند و order_index تکراری می‌سازند
         form = await self.form_repo.get_owned_form(
             survey_id=survey_id,
             user_id=user_id,
+            for_update=True,
         )
         if not form:
             raise HTTPException(
@@ -49,22 +79,8 @@ class QuestionService:
                 detail="You do not have access to this form",
             )
 
-        # ✅ Duplicate check
-        exists = await self.question_repo.exists_question(
-            survey_id=survey_id,
-            question_text=payload.question_text,
-        )
-        if exists:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Question with same text already exists in this form",
-            )
-
-        # ✅ Calculate order_index
-        last_order = await self.question_repo.get_last_order(survey_id)
-        order_index = last_order + 1
-
         # ✅ Create question
+        #    order_index = MAX + ORDER_GAP و چک تکراری (ON CONFLICT) داخل همان INSERT
         question = await self.question_repo.create_question(
             survey_id=survey_id,
             question_text=payload.question_text,
@@ -72,11 +88,16 @@ class QuestionService:
             is_required=payload.is_required,
             min_length=payload.min_length,
             max_length=payload.max_length,
-            order_index=order_index,
         )
+        if question is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=DUPLICATE_QUESTION,
+            )
 
+        form.bump_content_version()
         await self.question_repo.session.commit()
-        await self.question_repo.session.refresh(question)
+        await self.cache.invalidate(survey_id, form.public_code)
 
         return question
 
@@ -89,18 +110,12 @@ class QuestionService:
         survey_id: UUID,
         user_id: UUID,
     ) -> QuestionListResponse:
-        # ✅ Ownership check
-        survey = await self.form_repo.get_owned_form(
-            survey_id=survey_id,
-            user_id=user_id,
-        )
-        if not survey:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have access to this form",
-            )
+        # ✅ Ownership + questions در یک query
+        questions = await self.question_repo.list_owned(survey_id, user_id)
 
-        questions = await self.question_repo.list_by_survey_id(survey_id)
+        # لیست خالی: فرم بدون سوال یا فرم غیرمجاز؟
+        if not questions:
+            await self._ensure_owned(survey_id, user_id)
 
         return QuestionListResponse(
             items=[
@@ -119,45 +134,115 @@ class QuestionService:
         question_id: UUID,
         user_id: UUID,
     ):
-        # ✅ Ownership check
-        survey = await self.form_repo.get_owned_form(
+        # ✅ Ownership + load question در یک query
+        question = await self.question_repo.get_owned_question(
+            question_id=question_id,
             survey_id=survey_id,
             user_id=user_id,
         )
-        if not survey:
+        if not question:
+            await self._raise_missing(survey_id, user_id)
+
+        return question
+
+    # =========================================================
+    # UPDATE — Update Question
+    # =========================================================
+    async def update_question(
+        self,
+        *,
+        survey_id: UUID,
+        question_id: UUID,
+        user_id: UUID,
+        data: QuestionUpdateSchema,
+    ):
+        # ✅ Update only provided fields
+        values = {}
+        if data.question_text is not None:
+            values["question_text"] = data.question_text
+
+        if data.description is not None:
+            values["description"] = data.description
+
+        if data.is_required is not None:
+            values["is_required"] = data.is_required
+
+        if not values:
+            return await self.get_question_for_edit(
+                survey_id=survey_id,
+                question_id=question_id,
+                user_id=user_id,
+            )
+
+        # ✅ Ownership + update + bump نسخه در یک UPDATE ... RETURNING
+        try:
+            row = await self.question_repo.update_owned_question(
+                question_id=question_id,
+                survey_id=survey_id,
+                user_id=user_id,
+                values=values,
+            )
+        except IntegrityError as e:
+            if violated_constraint(e) != "uq_survey_text_question":
+                raise
+            await self.question_repo.session.rollback()
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You do not have access to this form",
+                status_code=status.HTTP_409_CONFLICT,
+                detail=DUPLICATE_QUESTION,
             )
+        if row is None:
+            await self._raise_missing(survey_id, user_id)
 
-        # ✅ Load question
-        question = await self.question_repo.get_by_id_and_survey(
+        question, public_code = row
+        await self.question_repo.session.commit()
+        await self.cache.invalidate(survey_id, public_code)
+
+        return question
+
+    # =========================================================
+    # DELETE — Delete Question
+    # =========================================================
+    async def delete_question(
+        self,
+        *,
+        survey_id: UUID,
+        question_id: UUID,
+        user_id: UUID,
+    ) -> DeleteQuestionResponse:
+        # ✅ Ownership + delete + bump نسخه در یک DELETE ... RETURNING
+        row = await self.question_repo.delete_owned_question(
             question_id=question_id,
             survey_id=survey_id,
+            user_id=user_id,
         )
-        if not question:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Question not found",
-            )
+        if row is None:
+            await self._raise_missing(survey_id, user_id)
 
-        return question
+        await self.question_repo.session.commit()
+        await self.cache.invalidate(survey_id, row.public_code)
+
+        return DeleteQuestionResponse(
+            success=True,
+            message="Question deleted successfully",
+            question_id=question_id,
+        )
 
     # =========================================================
-    # UPDATE — Update Question
+    # MOVE — جابه‌جایی یک سوال (فقط همان ردیف UPDATE می‌شود)
     # =========================================================
-    async def update_question(
+    async def move_question(
         self,
         *,
         survey_id: UUID,
         question_id: UUID,
         user_id: UUID,
-        data: QuestionUpdateSchema,
+        payload: MoveQuestionRequest,
     ):
-        # ✅ Ownership check
+        # ✅ Ownership check (+ قفل ردیف فرم)
         survey = await self.form_repo.get_owned_form(
             survey_id=survey_id,
             user_id=user_id,
+            for_update=True,
         )
         if not survey:
             raise HTTPException(
@@ -165,46 +250,61 @@ class QuestionService:
                 detail="You do not have access to this form",
             )
 
-        # ✅ Load question
-        question = await self.question_repo.get_by_id_and_survey(
-            question_id=question_id,
-            survey_id=survey_id,
-        )
-        if not question:
+        # ✅ فقط (question_id, order_index) خوانده می‌شود
+        keys = await self.question_repo.list_order_keys(survey_id)
+        others = [key for key in keys if key[0] != question_id]
+        if len(others) == len(keys):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Question not found",
             )
 
-        # ✅ Update only provided fields
-        if data.question_text is not None:
-            question.question_text = data.question_text
+        position = min(payload.position, len(others))
+        before = others[position - 1][1] if position > 0 else None
+        after = others[position][1] if position < len(others) else None
+        new_key = key_between(before, after)
 
-        if data.description is not None:
-            question.description = data.description
+        if new_key is None:
+            # جا تمام شده → همین‌جا یک بار بقیه‌ی سوال‌ها را پخش می‌کنیم
+            await self.question_repo.update_order_keys(survey_id, respread(others))
+            others = [
+                (other_id, key)
+                for (other_id, _), key in zip(others, spread(len(others)))
+            ]
+            before = others[position - 1][1] if position > 0 else None
+            after = others[position][1] if position < len(others) else None
+            new_key = key_between(before, after)
 
-        if data.is_required is not None:
-            question.is_required = data.is_required
+        question = await self.question_repo.set_order_index(
+            question_id=question_id,
+            survey_id=survey_id,
+            order_index=new_key,
+        )
 
+        survey.bump_content_version()
         await self.question_repo.session.commit()
-        await self.question_repo.session.refresh(question)
+        await self.cache.invalidate(survey_id, survey.public_code)
+
+        if is_crowded(before, new_key, after):
+            self.rebalancer.schedule(survey_id)
 
         return question
 
     # =========================================================
-    # DELETE — Delete Question
+    # BATCH — create / update / move / delete در یک تراکنش
     # =========================================================
-    async def delete_question(
+    async def apply_batch(
         self,
         *,
         survey_id: UUID,
-        question_id: UUID,
         user_id: UUID,
-    ) -> DeleteQuestionResponse:
-        # ✅ Ownership check
+        payload: QuestionBatchRequest,
+    ) -> QuestionListResponse:
+        # ✅ Ownership check (+ قفل ردیف فرم تا پایان تراکنش)
         survey = await self.form_repo.get_owned_form(
             survey_id=survey_id,
             user_id=user_id,
+            for_update=True,
         )
         if not survey:
             raise HTTPException(
@@ -212,24 +312,162 @@ class QuestionService:
                 detail="You do not have access to this form",
             )
 
-        # ✅ Load question
-        question = await self.question_repo.get_by_id_and_survey(
-            question_id=question_id,
+        # ✅ وضعیت فعلی فقط یک بار خوانده می‌شود؛ بقیه در حافظه
+        items = await self.question_repo.list_rows(survey_id)
+        by_id = {item["question_id"]: item for item in items}
+        texts = {item["question_text"] for item in items}
+        original_order = {item["question_id"]: item["order_index"] for item in items}
+        original_text = {item["question_id"]: item["question_text"] for item in items}
+
+        created: set[UUID] = set()
+        updated: set[UUID] = set()
+        renamed: set[UUID] = set()
+        deleted: set[UUID] = set()
+
+        for op in payload.operations:
+            if isinstance(op, BatchCreateQuestion):
+                self._claim_text(texts, op.question_text)
+                item = {
+                    "question_id": uuid.uuid4(),
+                    "type": "text",
+                    "question_text": op.question_text,
+                    "description": op.description,
+                    "is_required": op.is_required,
+                    "min_length": op.min_length,
+                    "max_length": op.max_length,
+                    "order_index": None,
+                }
+                position = len(items) if op.position is None else op.position
+                items.insert(min(position, len(items)), item)
+                by_id[item["question_id"]] = item
+                created.add(item["question_id"])
+
+            elif isinstance(op, BatchUpdateQuestion):
+                item = self._batch_item(by_id, op.question_id)
+                if (
+                    op.question_text is not None
+                    and op.question_text != item["question_text"]
+                ):
+                    self._claim_text(texts, op.question_text)
+                    texts.discard(item["question_text"])
+                    item["question_text"] = op.question_text
+
+                if op.description is not None:
+                    item["description"] = op.description
+
+                if op.is_required is not None:
+                    item["is_required"] = op.is_required
+
+                if item["question_id"] not in created:
+                    updated.add(item["question_id"])
+                    if op.question_text is not None:
+                        renamed.add(item["question_id"])
+
+            elif isinstance(op, BatchMoveQuestion):
+                item = self._batch_item(by_id, op.question_id)
+                items.remove(item)
+                items.insert(min(op.position, len(items)), item)
+
+            elif isinstance(op, BatchDeleteQuestion):
+                item = self._batch_item(by_id, op.question_id)
+                items.remove(item)
+                del by_id[op.question_id]
+                texts.discard(item["question_text"])
+                if op.question_id in created:
+                    created.discard(op.question_id)
+                else:
+                    updated.discard(op.question_id)
+                    renamed.discard(op.question_id)
+                    deleted.add(op.question_id)
+
+        # ✅ ترتیب نهایی: کلیدهای فعلی تا حد امکان حفظ می‌شوند
+        #    (فقط سوال‌های جدید/جابه‌جا‌شده کلید تازه می‌گیرند)
+        keys = assign_keys([item["order_index"] for item in items])
+        if keys is None:
+            keys = spread(len(items))
+
+        for item, key in zip(items, keys):
+            question_id = item["question_id"]
+            if question_id not in created and original_order[question_id] != key:
+                updated.add(question_id)
+            item["order_index"] = key
+
+        # ✅ DELETE → UPDATE (VALUES) → INSERT (multi-row)؛ با بیش از یک تغییر نام
+        #    اول متن موقت (جابه‌جایی/زنجیره‌ی نام‌ها با unique constraint تداخل نکند)
+        renamed = {
+            question_id for question_id in renamed
+            if by_id[question_id]["question_text"] != original_text[question_id]
+        }
+        try:
+            await self.question_repo.delete_many(survey_id, list(deleted))
+            if len(renamed) > 1:
+                await self.question_repo.release_texts(survey_id, list(renamed))
+            await self.question_repo.update_many(
+                survey_id, [by_id[question_id] for question_id in updated]
+            )
+            await self.question_repo.insert_many(
+                survey_id, [item for item in items if item["question_id"] in created]
+            )
+
+            survey.bump_content_version()
+            await self.question_repo.session.commit()
+        except IntegrityError as e:
+            # متن تکراری با سوالی که در این batch نیست (درخواست هم‌زمان)
+            if violated_constraint(e) != "uq_survey_text_question":
+                raise
+            await self.question_repo.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=DUPLICATE_QUESTION,
+            )
+
+        await self.cache.invalidate(survey_id, survey.public_code)
+
+        return QuestionListResponse(
+            items=[QuestionListItemSchema(**item) for item in items]
+        )
+
+    # =========================================================
+    # Helpers
+    # =========================================================
+    async def _ensure_owned(self, survey_id: UUID, user_id: UUID) -> None:
+        survey = await self.form_repo.get_owned_form(
             survey_id=survey_id,
+            user_id=user_id,
         )
-        if not question:
+        if not survey:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Question not found",
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this form",
             )
 
-        await self.question_repo.delete(question)
-        await self.question_repo.session.commit()
+    @staticmethod
+    def _claim_text(texts: set[str], question_text: str) -> None:
+        if question_text in texts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=DUPLICATE_QUESTION,
+            )
+        texts.add(question_text)
 
-        return DeleteQuestionResponse(
-            success=True,
-            message="Question deleted successfully",
-            question_id=question_id,
+    @staticmethod
+    def _batch_item(by_id: dict, question_id: UUID) -> dict:
+        item = by_id.get(question_id)
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question {question_id} not found",
+            )
+        return item
+
+    async def _raise_missing(self, survey_id: UUID, user_id: UUID) -> None:
+        """
+        فقط در مسیر خطا: 403 (فرم مال کاربر نیست) یا 404 (سوال وجود ندارد)
+        """
+        await self._ensure_owned(survey_id, user_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found",
         )
 
 
@@ -244,3 +482,14 @@ def get_question_service(
         question_repo=question_repo,
         form_repo=form_repo,
     )
+
+
+def get_read_question_service(
+    question_repo: QuestionRepository = Depends(get_read_question_repository),
+    form_repo: FormRepository = Depends(get_read_form_repository),
+) -> QuestionService:
+    """فقط برای list / get (بدون نوشتن)"""
+    return QuestionService(
+        question_repo=question_repo,
+        form_repo=form_repo,
+    )
@@ -2,24 +2,48 @@ from fastapi import Depends, HTTPException, status
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core import get_db
+from app.core.database import get_db
+from app.core.replica import get_read_db
 from app.repository.setting_repository import SettingRepository
+from app.services.survey_cache import SurveySnapshotCache, survey_cache
 
 
 class SettingService:
 
-    def __init__(self, repository: SettingRepository):
+    def __init__(
+        self,
+        repository: SettingRepository,
+        cache: SurveySnapshotCache = survey_cache,
+        read_repository: SettingRepository | None = None,
+    ):
         self.repository = repository
+        self.cache = cache
+        # خواندن‌ها (replica در صورت امکان)؛ نوشتن همیشه روی repository
+        self.read_repository = read_repository or repository
 
-    async def get_settings(self, survey_id: UUID):
-        setting = await self.repository.get_by_survey_id(survey_id)
+    async def _get_owned_survey(self, survey_id: UUID, user_id: UUID, repository=None):
+        repository = repository or self.repository
+        survey = await repository.get_owned_survey(survey_id, user_id)
+        if not survey:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have access to this form",
+            )
+        return survey
+
+    async def get_settings(self, survey_id: UUID, user_id: UUID):
+        await self._get_owned_survey(survey_id, user_id, self.read_repository)
+
+        setting = await self.read_repository.get_by_survey_id(survey_id)
 
         if not setting:
             setting = await self.repository.create_default(survey_id)
 
         return setting
 
-    async def update_settings(self, survey_id: UUID, data: dict):
+    async def update_settings(self, survey_id: UUID, user_id: UUID, data: dict):
+        survey = await self._get_owned_survey(survey_id, user_id)
+
         setting = await self.repository.get_by_survey_id(survey_id)
 
         if not setting:
@@ -36,11 +60,25 @@ class SettingService:
                     detail="start_date must be before end_date"
                 )
 
-        return await self.repository.update(setting, data)
+        survey.bump_content_version()
+        setting = await self.repository.update(setting, data)
+        await self.cache.invalidate(survey_id, survey.public_code)
+
+        return setting
 
 
 def get_setting_service(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
 ) -> SettingService:
     repo = SettingRepository(db)
-    return SettingService(repo)
\ No newline at end of file
+    return SettingService(repo)
+
+
+def get_read_setting_service(
+    db: AsyncSession = Depends(get_db, scope="function"),
+    read_db: AsyncSession = Depends(get_read_db, scope="function"),
+) -> SettingService:
+    return SettingService(
+        SettingRepository(db),
+        read_repository=SettingRepository(read_db),
+    )
@@ -0,0 +1,249 @@
+# app/services/survey_cache.py
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+
+settings = get_settings()
+
+SNAPSHOT_KEY = "survey_snapshot:{code}"
+SURVEY_CODE_KEY = "survey_snapshot_code:{survey_id}"
+# هر invalidate یک واحد زیاد می‌کند؛ set فقط با همان generation که قبل از
+# خواندن DB دیده شده نوشته می‌شود
+GENERATION_KEY = "survey_snapshot_gen:{code}"
+
+# KEYS[1]=snapshot  KEYS[2]=survey_id → code  KEYS[3]=generation
+# ARGV[1]=generation دیده‌شده  ARGV[2]=TTL  ARGV[3]=code  ARGV[4..]=فیلدهای snapshot
+# خروجی: 1 نوشته شد | 0 در این فاصله invalidate شده (snapshot کهنه است)
+SET_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[3]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class SurveySnapshot:
+    """
+    پاسخ آماده‌ی لینک عمومی: JSON سریال‌شده + بازه‌ی زمانی برای چک start/end
+    """
+    survey_id: str
+    version: int
+    body: bytes
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+    @property
+    def etag(self) -> str:
+        # Strong ETag: هر تغییر محتوا content_version را زیاد می‌کند
+        return f'"{self.survey_id}-{self.version}"'
+
+    def to_redis(self) -> dict:
+        return {
+            "survey_id": self.survey_id,
+            "version": self.version,
+            "body": self.body.decode("utf-8"),
+            "start_date": self.start_date.isoformat() if self.start_date else "",
+            "end_date": self.end_date.isoformat() if self.end_date else "",
+        }
+
+    @classmethod
+    def from_redis(cls, data: dict) -> "SurveySnapshot":
+        return cls(
+            survey_id=data["survey_id"],
+            version=int(data["version"]),
+            body=data["body"].encode("utf-8"),
+            start_date=datetime.fromisoformat(data["start_date"]) if data.get("start_date") else None,
+            end_date=datetime.fromisoformat(data["end_date"]) if data.get("end_date") else None,
+        )
+
+
+class SurveySnapshotCache:
+    """
+    Public survey payloads keyed by public_code.
+
+    In-process LRU (short TTL) in front of Redis. Any mutation of a survey
+    calls invalidate(survey_id, ...) which clears both layers; other workers'
+    local copies expire within SURVEY_CACHE_LOCAL_TTL seconds.
+
+    A reader that misses takes generation(code) before reading the database
+    and passes it to set(); invalidate() bumps the generation, so a snapshot
+    read before a concurrent write is never written back over it.
+    """
+
+    def __init__(self, local_size: int, local_ttl: int, redis_ttl: int):
+        self.local_size = local_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._local: "OrderedDict[str, tuple[float, SurveySnapshot]]" = OrderedDict()
+        self._codes: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------------
+    # READ
+    # -----------------------------------
+    async def get(self, code: str) -> Optional[SurveySnapshot]:
+        entry = self._local.get(code)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(code)
+                self.hits += 1
+                return snapshot
+            self._drop_local(code)
+
+        snapshot = await self._get_redis(code)
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._put_local(code, snapshot)
+        return snapshot
+
+    async def generation(self, code: str) -> Optional[int]:
+        """قبل از خواندن DB صدا زده شود؛ None → Redis در دسترس نیست"""
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            return int(await redis.get(GENERATION_KEY.format(code=code)) or 0)
+        except Exception as e:
+            logger.warning(f"[SurveyCache] Redis read failed: {e}")
+            return None
+
+    # -----------------------------------
+    # WRITE
+    # -----------------------------------
+    async def set(
+        self,
+        code: str,
+        snapshot: SurveySnapshot,
+        generation: Optional[int],
+        ttl: Optional[int] = None,
+    ) -> None:
+        """compare-and-set: اگر بعد از generation(code) invalidate شده باشد نوشته نمی‌شود"""
+        ttl = ttl or self.redis_ttl
+
+        redis = get_redis()
+        if redis is None or generation is None:
+            self._put_local(code, snapshot)
+            return
+        fields = [item for pair in snapshot.to_redis().items() for item in pair]
+        try:
+            written = await redis.eval(
+                SET_SCRIPT,
+                3,
+                SNAPSHOT_KEY.format(code=code),
+                SURVEY_CODE_KEY.format(survey_id=snapshot.survey_id),
+                GENERATION_KEY.format(code=code),
+                generation,
+                ttl,
+                code,
+                *fields,
+            )
+        except Exception as e:
+            logger.warning(f"[SurveyCache] Redis write failed: {e}")
+            return
+
+        if int(written):
+            self._put_local(code, snapshot)
+        else:
+            logger.debug("[SurveyCache] Stale snapshot for {} not cached", code)
+
+    # -----------------------------------
+    # INVALIDATE
+    # -----------------------------------
+    async def invalidate(
+        self,
+        survey_id: UUID | str,
+        *public_codes: Optional[str],
+    ) -> None:
+        survey_id = str(survey_id)
+        codes = {c for c in public_codes if c}
+
+        local_code = self._codes.get(survey_id)
+        if local_code:
+            codes.add(local_code)
+        for code in codes:
+            self._drop_local(code)
+
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            code_key = SURVEY_CODE_KEY.format(survey_id=survey_id)
+            mapped = await redis.get(code_key)
+            if mapped:
+                codes.add(mapped)
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(code_key, *(SNAPSHOT_KEY.format(code=c) for c in codes))
+                for c in codes:
+                    # readerی که قبل از این write از DB خوانده، set نمی‌کند
+                    pipe.incr(GENERATION_KEY.format(code=c))
+                    pipe.expire(GENERATION_KEY.format(code=c), self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[SurveyCache] Redis invalidation failed: {e}")
+
+        logger.debug("[SurveyCache] Invalidated survey {}", survey_id)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "local_size": len(self._local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    # -----------------------------------
+    # Helpers
+    # -----------------------------------
+    async def _get_redis(self, code: str) -> Optional[SurveySnapshot]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            data = await redis.hgetall(SNAPSHOT_KEY.format(code=code))
+        except Exception as e:
+            logger.warning(f"[SurveyCache] Redis read failed: {e}")
+            return None
+        return SurveySnapshot.from_redis(data) if data else None
+
+    def _put_local(self, code: str, snapshot: SurveySnapshot) -> None:
+        if self.local_size <= 0:
+            return
+        self._local[code] = (time.monotonic() + self.local_ttl, snapshot)
+        self._local.move_to_end(code)
+        self._codes[snapshot.survey_id] = code
+
+        while len(self._local) > self.local_size:
+            old_code, (_, old_snapshot) = self._local.popitem(last=False)
+            self._codes.pop(old_snapshot.survey_id, None)
+
+    def _drop_local(self, code: str) -> None:
+        entry = self._local.pop(code, None)
+        if entry is not None:
+            self._codes.pop(entry[1].survey_id, None)
+
+
+survey_cache = SurveySnapshotCache(
+    local_size=settings.SURVEY_CACHE_LOCAL_SIZE,
+    local_ttl=settings.SURVEY_CACHE_LOCAL_TTL,
+    redis_ttl=settings.SURVEY_CACHE_REDIS_TTL,
+)
@@ -0,0 +1,83 @@
+# app/services/token_cache.py
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class VerifiedTokenCache:
+    """
+    LRU/TTL cache: sha256(token) -> (user_id, expires_at)
+
+    Only tokens that already passed signature and claim checks are stored,
+    so a hit lets the middleware skip decoding entirely.
+    """
+
+    def __init__(self, max_size: int, max_ttl: int):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        key = self._digest(token)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            # ⏰ توکن منقضی شده → حذف و دوباره verify
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_id
+
+    def put(self, token: str, user_id: str, exp: Optional[float]) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+
+        key = self._digest(token)
+        self._entries[key] = (user_id, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache(
+    max_size=settings.JWT_CACHE_MAX_SIZE,
+    max_ttl=settings.JWT_CACHE_MAX_TTL,
+)
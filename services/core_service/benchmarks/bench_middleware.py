@@ -0,0 +1,150 @@
+"""
+Micro-benchmark: @app.middleware("http") chain vs pure ASGI middleware.
+
+Both apps serve a DB-free stub of GET /api/v1/forms/my behind the same
+auth + charset concerns, so the difference is the middleware overhead only.
+
+Run from services/core_service:
+    python benchmarks/bench_middleware.py [requests] [concurrency]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+for key, value in {
+    "DATABASE_DIALECT": "postgresql",
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_NAME": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USERNAME": "bench",
+    "JWT_SECRET_KEY": "bench-secret-key-bench-secret-key",
+    "JWT_ALGORITHM": "HS256",
+    "IAM_URL": "http://localhost:8000",
+    "DEBUG_MODE": "false",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.middleware import UTF8CharsetMiddleware  # noqa: E402
+from app.services.jwt_middleware import JWTAuthMiddleware  # noqa: E402
+
+settings = get_settings()
+logger.remove()
+
+FORMS = [
+    {
+        "survey_id": str(uuid.uuid4()),
+        "title": f"Form {i}",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    for i in range(20)
+]
+
+
+def _stub_routes(app: FastAPI) -> FastAPI:
+    @app.get("/api/v1/forms/my")
+    async def get_my_forms(request: Request):
+        assert request.state.user_id
+        return FORMS
+
+    return app
+
+
+def build_legacy_app() -> FastAPI:
+    """The pre-change stack: two BaseHTTPMiddleware-style layers."""
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def jwt_middleware(request: Request, call_next):
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            raise HTTPException(401, "Missing or invalid Authorization header")
+        payload = jwt.decode(
+            auth_header.split(" ")[1],
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM],
+        )
+        request.state.user_id = payload["sub"]
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def set_utf8_encoding(request: Request, call_next):
+        response = await call_next(request)
+        if isinstance(response, JSONResponse):
+            response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    return _stub_routes(app)
+
+
+def build_asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(JWTAuthMiddleware)
+    app.add_middleware(UTF8CharsetMiddleware)
+    return _stub_routes(app)
+
+
+async def measure(app: FastAPI, token: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm-up
+        for _ in range(50):
+            response = await client.get("/api/v1/forms/my", headers=headers)
+            assert response.status_code == 200, response.text
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await client.get("/api/v1/forms/my", headers=headers)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return total / elapsed
+
+
+async def main(total: int, concurrency: int) -> None:
+    token = jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "jti": str(uuid.uuid4()),
+            "type": "access",
+            "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+        },
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+
+    before = await measure(build_legacy_app(), token, total, concurrency)
+    after = await measure(build_asgi_app(), token, total, concurrency)
+
+    print(f"requests={total} concurrency={concurrency}")
+    print(f"before (@app.middleware('http')): {before:10.1f} req/s")
+    print(f"after  (pure ASGI + token cache): {after:10.1f} req/s")
+    print(f"speed-up: x{after / before:.2f}")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    asyncio.run(main(total, concurrency))
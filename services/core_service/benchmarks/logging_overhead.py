@@ -0,0 +1,179 @@
+"""
+Micro-benchmark: logging cost per request.
+
+A DB-free stub route logs like a hot path (one INFO line, two DEBUG lines
+with arguments) and is driven through httpx's ASGI transport under:
+
+  none      no sinks (baseline; the difference to it is the logging cost)
+  legacy    the previous configure_logger: synchronous JSON file sinks with
+            rotation + console, formatted and written on the request path
+  pipeline  configure_logger: bounded queue, files/console written by the
+            log-writer thread
+  sampled   pipeline + LOG_SAMPLE_RATES = 0.01 for the stub route's logger
+
+Each is also run with a console that stalls on every write (a slow log
+pipe or busy disk), where the legacy sinks block the event loop.
+
+Logs go to a temporary directory; console output goes to /dev/null.
+
+Run from services/core_service:
+    python benchmarks/logging_overhead.py [requests] [concurrency] [repeat] [stall_seconds]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+for key, value in {
+    "DATABASE_DIALECT": "postgresql",
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_NAME": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USERNAME": "bench",
+    "JWT_SECRET_KEY": "bench-secret-key-bench-secret-key",
+    "JWT_ALGORITHM": "HS256",
+    "IAM_URL": "http://localhost:8000",
+    "DEBUG_MODE": "false",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.logging import logging_service  # noqa: E402
+
+settings = get_settings()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/forms/{survey_id}")
+    async def get_form(survey_id: uuid.UUID):
+        logger.info("User {} opened form {}", "bench-user", survey_id)
+        logger.debug("Loaded {} questions for {}", 12, survey_id)
+        logger.debug("Cache miss for {}", survey_id)
+        return {"survey_id": str(survey_id)}
+
+    return app
+
+
+def configure_legacy(stdout) -> None:
+    """configure_logger before the pipeline (sinks write on the caller)"""
+    logger.remove()
+    json_logging_format = {"rotation": "10 MB", "retention": "10 days", "serialize": True}
+    logger.add("logs/core_service_info.log", level="INFO", **json_logging_format)
+    logger.add("logs/core_service_error.log", level="ERROR", **json_logging_format)
+    log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:" \
+                 "<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+    logger.add(stdout, level="INFO", format=log_format)
+    logger.add(stdout, level="ERROR", backtrace=True, diagnose=True, format=log_format)
+
+
+def configure_pipeline(stdout, rates: dict[str, float]) -> None:
+    settings.LOG_SAMPLE_RATES = rates
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = stdout
+    try:
+        logging_service.configure_logger()
+    finally:
+        sys.stdout, sys.stderr = real_stdout, real_stderr
+
+
+class SlowStream:
+    """console behind a slow pipe / busy disk: every write stalls"""
+
+    def __init__(self, target, stall: float):
+        self.target = target
+        self.stall = stall
+
+    def write(self, text: str) -> None:
+        time.sleep(self.stall)
+        self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+
+async def measure(app: FastAPI, total: int, concurrency: int) -> float:
+    """seconds per request"""
+    transport = httpx.ASGITransport(app=app)
+    path = f"/api/v1/forms/{uuid.uuid4()}"
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            response = await client.get(path)
+            assert response.status_code == 200, response.text
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await client.get(path)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return elapsed / total
+
+
+async def main(total: int, concurrency: int, repeat: int, stall: float) -> None:
+    app = build_app()
+    pipeline = logging_service.log_pipeline
+
+    with open(os.devnull, "w") as devnull:
+        slow = SlowStream(devnull, stall)
+        configs = [
+            ("none", logger.remove),
+            ("legacy", lambda: configure_legacy(devnull)),
+            ("pipeline", lambda: configure_pipeline(devnull, {})),
+            ("sampled", lambda: configure_pipeline(devnull, {"__main__": 0.01})),
+            ("legacy/slow-console", lambda: configure_legacy(slow)),
+            ("pipeline/slow-console", lambda: configure_pipeline(slow, {})),
+        ]
+
+        results = {}
+        for name, configure in configs:
+            samples = []
+            for _ in range(repeat):
+                pipeline.dropped = pipeline.sampled_out = 0
+                configure()
+                samples.append(await measure(app, total, concurrency))
+                stats = pipeline.stats()
+                logging_service.shutdown_logger()
+                logger.remove()
+            results[name] = (min(samples), stats if name.startswith(("pipeline", "sampled")) else None)
+
+    baseline = results["none"][0]
+    print(f"requests={total} concurrency={concurrency} best of {repeat}, slow console stall={stall * 1e6:.0f} us/write")
+    for name, (per_request, stats) in results.items():
+        overhead = (per_request - baseline) * 1e6
+        line = f"{name:<22} {per_request * 1e6:8.1f} us/request   logging: {overhead:7.1f} us"
+        if stats:
+            line += f"   dropped={stats['dropped']} sampled_out={stats['sampled_out']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    stall = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0002
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(total, concurrency, repeat, stall))
@@ -0,0 +1,128 @@
+"""
+Query-count harness: walks every form/question/settings/public-link
+endpoint once and asserts how many SQL statements each one issues.
+
+A relationship that is touched without a loading profile fails loudly
+(lazy="raise"); an extra query shows up here as a count mismatch with the
+full statement listing.
+
+Needs a scratch database (DATABASE_* env / .env); tables are created if
+missing. Run from services/core_service:
+    python benchmarks/query_counts.py
+"""
+
+import asyncio
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.core import database  # noqa: E402
+from app.core.base import EntityBase  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.query_counter import assert_num_queries  # noqa: E402
+from app.main import app  # noqa: E402
+
+settings = get_settings()
+
+# (name, method, path, json body, expected statements, capture)
+SCENARIO = [
+    ("create form", "POST", "/forms/create", {"title": "{title}"}, 2,
+     lambda ctx, body: ctx.update(survey_id=body["survey_id"])),
+    ("list my forms", "GET", "/forms/my", None, 1, None),
+    ("get form", "GET", "/forms/{survey_id}", None, 1, None),
+    ("rename form", "PATCH", "/forms/{survey_id}/name", {"title": "{title} renamed"}, 2, None),
+    ("add question", "POST", "/forms/{survey_id}/questions", {"question_text": "Q1"}, 3,
+     lambda ctx, body: ctx.update(question_id=body["question_id"])),
+    ("batch questions", "PATCH", "/forms/{survey_id}/questions:batch", {"operations": [
+        {"op": "create", "question_text": "Q2"},
+        {"op": "create", "question_text": "Q3", "position": 0},
+        {"op": "update", "question_id": "{question_id}", "is_required": False},
+        {"op": "move", "question_id": "{question_id}", "position": 2},
+    ]}, 5, None),
+    ("move question", "POST", "/forms/{survey_id}/questions/{question_id}/move",
+     {"position": 0}, 4, None),
+    ("list questions", "GET", "/forms/{survey_id}/questions", None, 1, None),
+    ("get question", "GET", "/forms/{survey_id}/questions/{question_id}", None, 1, None),
+    ("update question", "PATCH", "/forms/{survey_id}/questions/{question_id}",
+     {"question_text": "Q1 edited"}, 1, None),
+    ("get settings", "GET", "/forms/{survey_id}/settings", None, 2, None),
+    ("update settings", "PATCH", "/forms/{survey_id}/settings", {"show_progress": False}, 4, None),
+    ("public link", "GET", "/forms/surveys/{survey_id}/public-link", None, 2,
+     lambda ctx, body: ctx.update(code=body["url"].rsplit("/", 1)[-1])),
+    ("open public survey", "GET", "/forms/s/{code}", None, 2, None),
+    ("delete question", "DELETE", "/forms/{survey_id}/questions/{question_id}", None, 1, None),
+    ("soft delete form", "DELETE", "/forms/{survey_id}", None, 2, None),
+    ("list trash", "GET", "/forms/trash", None, 1, None),
+    ("restore form", "PATCH", "/forms/{survey_id}/restore", None, 2, None),
+    ("soft delete again", "DELETE", "/forms/{survey_id}", None, 2, None),
+    ("hard delete form", "DELETE", "/forms/{survey_id}/hard", None, 2, None),
+]
+
+
+def _fill(value, ctx: dict):
+    if isinstance(value, str):
+        return value.format(**ctx)
+    if isinstance(value, dict):
+        return {k: _fill(v, ctx) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, ctx) for v in value]
+    return value
+
+
+def _token(user_id: str) -> str:
+    return jwt.encode(
+        {
+            "sub": user_id,
+            "jti": str(uuid.uuid4()),
+            "type": "access",
+            "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+        },
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+
+
+async def run(engine=database.engine) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(EntityBase.metadata.create_all)
+
+    ctx = {"title": f"harness-{uuid.uuid4().hex[:8]}"}
+    headers = {"Authorization": f"Bearer {_token(str(uuid.uuid4()))}"}
+    transport = httpx.ASGITransport(app=app)
+    failures = 0
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://harness/api/v1"
+    ) as client:
+        for name, method, path, body, expected, capture in SCENARIO:
+            try:
+                with assert_num_queries(engine, expected) as counter:
+                    response = await client.request(
+                        method, _fill(path, ctx), json=_fill(body, ctx), headers=headers
+                    )
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL {name}: {e}")
+            else:
+                print(f"ok   {name}: {counter.count} statements")
+
+            if not response.is_success:
+                failures += 1
+                print(f"FAIL {name}: HTTP {response.status_code} {response.text}")
+
+            if capture and response.is_success:
+                capture(ctx, response.json())
+
+    return failures
+
+
+if __name__ == "__main__":
+    logger.remove()
+    sys.exit(1 if asyncio.run(run()) else 0)
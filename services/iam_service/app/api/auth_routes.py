@@ -26,6 +26,7 @@ from app.dependencies import (
     get_user_service,
     get_jwt_service,
     get_hash_service,
+    get_rate_limit_guard,
 )
 
 
@@ -39,6 +40,7 @@ from app.services1.auth_services.otp_service import OTPService
 from app.services1.auth_services.hash_service import HashService
 from app.services1.auth_services.email_service import EmailService
 from app.services1.auth_services import jwt_service
+from app.services1.auth_services.rate_limiter import RateLimitGuard
 from app.dependencies import get_current_user
 
 bearer_scheme = HTTPBearer(auto_error=True)
@@ -62,11 +64,13 @@ auth_router = APIRouter(
 )
 async def register(
     user_data: UserCreateSchema,
-    register_service: Annotated[RegisterService, Depends(get_register_service)] 
+    register_service: Annotated[RegisterService, Depends(get_register_service)],
+    guard: Annotated[RateLimitGuard, Depends(get_rate_limit_guard)],
 ):
    
-    logger.info(f"Starting registration for email: {user_data.email}")
-    return await register_service.register_user(user_data)
+    logger.info("Starting registration for email: {}", user_data.email)
+    async with guard.limit("otp_send", user_data.email):
+        return await register_service.register_user(user_data)
 
 
 # ===================================================================
@@ -80,12 +84,15 @@ async def register(
 )
 async def verify_otp(
     verify_schema: RegisterCompleteSchema,  
-    register_service: Annotated[RegisterService, Depends(get_register_service)]
+    register_service: Annotated[RegisterService, Depends(get_register_service)],
+    guard: Annotated[RateLimitGuard, Depends(get_rate_limit_guard)],
 ):
     
     
-    logger.info(f"Verifying OTP for user with email: {verify_schema.email}")
-    return await register_service.verify_user(verify_schema)
+    logger.info("Verifying OTP for user with email: {}", verify_schema.email)
+    # 🔒 OTP چهار رقمی است → بعد از چند کد اشتباه، ایمیل قفل می‌شود
+    async with guard.limit("otp_verify", verify_schema.email, track_failures=True):
+        return await register_service.verify_user(verify_schema)
 
 # ===================================================================
 # 3. Login Endpoint
@@ -99,9 +106,12 @@ async def verify_otp(
 )
 async def login(
     login_data: UserLoginSchema,
-    login_service: Annotated[LoginService, Depends(get_login_service)]
+    login_service: Annotated[LoginService, Depends(get_login_service)],
+    guard: Annotated[RateLimitGuard, Depends(get_rate_limit_guard)],
 ):
-    return await login_service.authenticate_user(login_data)
+    # 🔒 قبل از get_by_email و Argon2 — درخواست اضافه همین‌جا 429 می‌گیرد
+    async with guard.limit("login", login_data.email, track_failures=True):
+        return await login_service.authenticate_user(login_data)
 
 # ===================================================================
 # 4. Resend OTP Endpoint
@@ -114,9 +124,11 @@ async def login(
 async def resend_otp(
     resend_schema: ResendOTPSchema,
     register_service: Annotated[RegisterService, Depends(get_register_service)],
+    guard: Annotated[RateLimitGuard, Depends(get_rate_limit_guard)],
 ):
-    logger.info(f"Resending OTP for user with email: {resend_schema.email}")
-    return await register_service.resend_otp(resend_schema)
+    logger.info("Resending OTP for user with email: {}", resend_schema.email)
+    async with guard.limit("otp_send", resend_schema.email):
+        return await register_service.resend_otp(resend_schema)
 
 
 # ===================================================================
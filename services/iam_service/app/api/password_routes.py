@@ -9,7 +9,8 @@ from app.domain.resetpass_schemas import (
     PasswordResetResponseSchema,
 )
 from app.services1.auth_services.password_reset_service import PasswordResetService
-from app.dependencies import get_password_reset_service
+from app.services1.auth_services.rate_limiter import RateLimitGuard
+from app.dependencies import get_password_reset_service, get_rate_limit_guard
 
 router = APIRouter(
     prefix="/auth/password-reset",
@@ -23,8 +24,10 @@ router = APIRouter(
 async def start_password_reset(
     data: PasswordResetStartSchema,
     service: PasswordResetService = Depends(get_password_reset_service),  # ✅
+    guard: RateLimitGuard = Depends(get_rate_limit_guard),
 ):
-    return await service.start(data.email)
+    async with guard.limit("otp_send", data.email):
+        return await service.start(data.email)
 
 
 # -----------------------------
@@ -34,8 +37,10 @@ async def start_password_reset(
 async def verify_password_reset(
     data: PasswordResetVerifySchema,
     service: PasswordResetService = Depends(get_password_reset_service),  # ✅ تصحیح شد
+    guard: RateLimitGuard = Depends(get_rate_limit_guard),
 ):
-    return await service.verify(data.email, data.otp)
+    async with guard.limit("otp_verify", data.email, track_failures=True):
+        return await service.verify(data.email, data.otp)
 
 
 # -----------------------------
@@ -45,13 +50,17 @@ async def verify_password_reset(
 async def complete_password_reset(
     data: PasswordResetCompleteSchema,
     service: PasswordResetService = Depends(get_password_reset_service),  # ✅ تصحیح شد
+    guard: RateLimitGuard = Depends(get_rate_limit_guard),
 ):
-    return await service.complete(data.email, data.new_password)
+    async with guard.limit("password_reset", data.email):
+        return await service.complete(data.email, data.new_password)
 
 
 @router.post("/resend_otp", response_model=None)
 async def resend_password_reset_otp(
     data: PasswordResetResendSchema,
 service: PasswordResetService = Depends(get_password_reset_service),
+    guard: RateLimitGuard = Depends(get_rate_limit_guard),
 ):
-    return await service.resend(data.email)
+    async with guard.limit("otp_send", data.email):
+        return await service.resend(data.email)
@@ -32,7 +32,7 @@ async def get_profile(
     current_user: Any = Depends(get_current_user),  # ✅ مهم
     service: ProfileService = Depends(get_profile_service),
 ):
-    return await service.get_profile(current_user.user_id)
+    return await service.get_profile(current_user)
 
 
 
@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from loguru import logger
 
@@ -15,6 +16,27 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: str
     DATABASE_PORT: int
     DATABASE_USERNAME: str
+
+    # Database pool / timeouts
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float = 30.0
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 30000
+    DB_PGBOUNCER_MODE: bool = False
+    # درخواستی که اتصال را بیشتر از این نگه دارد warning لاگ می‌شود
+    DB_HOLD_WARN_MS: int = 1000
+    # دیباگ: > 0 → N کندترین statement هر route نگه داشته می‌شود (/debug/slow-sql)
+    PERF_SLOW_SQL_TOP: int = 0
+    # Schema در startup: create (create_all، توسعه) | check (فقط revision Alembic) | skip
+    DB_SCHEMA_MODE: Literal["create", "check", "skip"] = "create"
+    # در حالت check اگر تنظیم شود، revision دیتابیس باید دقیقاً همین باشد
+    DB_SCHEMA_REVISION: Optional[str] = None
+
     #Email service
 
     EMAIL_FROM: str = "your@email.com"
@@ -22,6 +44,18 @@ class Settings(BaseSettings):
     EMAIL_PORT: int = 587
     EMAIL_USERNAME: str = "your@gmail.com"
     EMAIL_PASSWORD: str = "your app password"
+    # صف ایمیل (Redis) + اتصال‌های SMTP پایدار
+    EMAIL_WORKER_ENABLED: bool = True   # حلقه‌ی ارسال در همین پروسه
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_SMTP_TIMEOUT: float = 10.0
+    EMAIL_SMTP_STARTTLS: bool = True
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 2.0
+    EMAIL_RETRY_MAX_SECONDS: float = 60.0
+    # پیام برداشته‌شده و ack نشده بعد از این مدت دوباره در صف
+    EMAIL_VISIBILITY_TIMEOUT: int = 60
+    EMAIL_POLL_INTERVAL: float = 0.5
+    EMAIL_STATUS_TTL: int = 86400
     # Project
     PROJECT_NAME: str = "QForm IAM Service"
     PROJECT_VERSION: str = "1.0.0"
@@ -29,8 +63,31 @@ class Settings(BaseSettings):
     # Global settings
     DEBUG_MODE: bool
 
+    # Logging (صف محدود + نمونه‌برداری پیام‌های پرتکرار)
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_FILE_MAX_MB: int = 10
+    LOG_FILE_BACKUPS: int = 10
+    # logger (نام ماژول) → نسبت پیام‌های زیر WARNING که ثبت می‌شوند
+    LOG_SAMPLE_RATES: dict[str, float] = {
+        "app.repositories.user_repository": 0.01,
+        "app.core.middleware": 0.01,
+    }
+
+    # Health / Metrics
+    # /health/ready: timeout هر check، مدت cache نتیجه، آستانه‌ی اشباع pool (0..1)
+    HEALTH_CHECK_TIMEOUT: float = 2.0
+    HEALTH_CACHE_TTL: float = 2.0
+    HEALTH_POOL_SATURATION: float = 0.9
+    # Prometheus: poolها و صف‌ها هر چند ثانیه یک بار نمونه‌برداری می‌شوند
+    METRICS_SAMPLE_INTERVAL: float = 5.0
+
     # Redis
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
 
     # JWT
     JWT_SECRET_KEY: str
@@ -40,6 +97,39 @@ class Settings(BaseSettings):
     # OTP
     OTP_EXPIRE_TIME: int
 
+    # Password hashing (Argon2)
+    HASH_POOL_KIND: str = "thread"  # "thread" or "process"
+    HASH_POOL_WORKERS: int = 4
+    HASH_POOL_MAX_QUEUE: int = 64
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400
+    ARGON2_PARALLELISM: int = 8
+
+    # last_login با تأخیر و دسته‌ای نوشته می‌شود (write-behind)
+    LAST_LOGIN_MAX_STALENESS: float = 5.0   # حداکثر کهنگی last_login در /profile/me
+    LAST_LOGIN_FLUSH_BATCH: int = 500       # ردیف در هر UPDATE
+    LAST_LOGIN_MAX_PENDING: int = 50000
+
+    # Cache کاربر جاری (LRU همین worker → Redis)، بر اساس user_id
+    USER_CACHE_LOCAL_SIZE: int = 1024
+    USER_CACHE_LOCAL_TTL: int = 5
+    USER_CACHE_REDIS_TTL: int = 300
+
+    # Rate limit endpointهای auth (GCRA در Redis): "تعداد/second|minute|hour"
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_RATE_LIMIT_IP: str = "30/minute"
+    AUTH_RATE_LIMIT_EMAIL: str = "10/minute"
+    AUTH_RATE_LIMIT_GLOBAL: str = "100/second"
+    # قفل بعد از این تعداد تلاش ناموفق پشت سر هم (login / OTP) برای همان
+    # ایمیل از همان IP — مهاجم از IP دیگر کاربر واقعی را قفل نمی‌کند
+    AUTH_LOCKOUT_THRESHOLD: int = 5
+    AUTH_LOCKOUT_SECONDS: int = 900
+    # load balancer / reverse proxy جلوی سرویس (IP یا CIDR، JSON در env:
+    # '["10.0.0.0/8"]'). فقط از این peerها هدر AUTH_FORWARDED_HEADER قبول
+    # می‌شود؛ خالی → IP اتصال (پشت proxy همه‌ی کاربرها یک IP می‌شوند)
+    AUTH_TRUSTED_PROXIES: list[str] = []
+    AUTH_FORWARDED_HEADER: str = "X-Forwarded-For"
+
     model_config = SettingsConfigDict(
         env_file=str(PROJECT_ROOT / ".env"),
         env_file_encoding="utf-8"
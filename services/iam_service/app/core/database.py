@@ -1,8 +1,12 @@
+import time
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy import text
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from loguru import logger
 from app.core.config import get_settings
+from app.core.request_metrics import current_metrics
 from app.core.base import EntityBase
 
 
@@ -16,11 +20,141 @@ DATABASE_URL = (
     f"{config.DATABASE_NAME}"
 )
 
-engine = create_async_engine(
+if config.DB_PGBOUNCER_MODE:
+    # cache prepared statement سمت SQLAlchemy هم باید خاموش باشد
+    DATABASE_URL += "?prepared_statement_cache_size=0"
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    QueuePool + شمارنده‌ی checkout / timeout / زمان انتظار برای اتصال
+    و مدت نگه‌داشتن هر اتصال تا checkin (کل pool + درخواست جاری)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.checkins = 0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+        record.info["checked_out_at"] = time.perf_counter()
+        return record
+
+    def _do_return_conn(self, record):
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            held = time.perf_counter() - checked_out_at
+            self.checkins += 1
+            self.hold_total += held
+            self.hold_max = max(self.hold_max, held)
+
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.record_connection(held)
+
+        super()._do_return_conn(record)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3)
+            if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "hold_avg_ms": round(self.hold_total / self.checkins * 1000, 3)
+            if self.checkins else 0.0,
+            "hold_max_ms": round(self.hold_max * 1000, 3),
+        }
+
+
+def _connect_args() -> dict:
+    args = {"command_timeout": config.DB_COMMAND_TIMEOUT}
+
+    if config.DB_PGBOUNCER_MODE:
+        # PgBouncer (transaction pooling): هر تراکنش ممکن است روی اتصال سرور دیگری
+        # برود → بدون cache و با نام یکتا برای prepared statementها.
+        # startup parameterها هم پاس داده نمی‌شوند؛ timeoutها روی role تنظیم شوند:
+        #   ALTER ROLE ... SET statement_timeout = ...
+        args["statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        return args
+
+    args["statement_cache_size"] = config.DB_STATEMENT_CACHE_SIZE
+    args["server_settings"] = {
+        "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS),
+        "idle_in_transaction_session_timeout": str(
+            config.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS
+        ),
+    }
+    return args
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """
+    زمان، تعداد statement و ردیف‌های هر درخواست (RequestMetrics)
+    با PERF_SLOW_SQL_TOP > 0 متن کندترین statementها هم نگه داشته می‌شود
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.record_statement(
+                time.perf_counter() - started,
+                max(cursor.rowcount, 0),
+                statement,
+                config.PERF_SLOW_SQL_TOP,
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _failed(exception_context):
+        # statement خطا داد → after_cursor_execute صدا زده نمی‌شود
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    return engine
+
+
+engine = instrument_engine(create_async_engine(
     DATABASE_URL,
     echo=config.DEBUG_MODE,
-    future=True
-)
+    future=True,
+    poolclass=InstrumentedPool,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+))
 
 async_session = async_sessionmaker(
     bind=engine,
@@ -33,6 +167,14 @@ async_session = async_sessionmaker(
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    AsyncSession تا اولین execute اتصالی از pool نمی‌گیرد (درخواستی که از
+    cache جواب داده می‌شود یا زودتر خطا می‌دهد اتصالی مصرف نمی‌کند) و بعد از
+    commit اتصال را پس می‌دهد.
+
+    با Depends(get_db, scope="function") استفاده شود: session بعد از ساخت
+    پاسخ و قبل از ارسال آن به کلاینت بسته می‌شود، نه بعد از ارسال.
+    """
     session = async_session()
     try:
         yield session
@@ -44,7 +186,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-from sqlalchemy import text
+def db_pool_stats() -> dict:
+    return engine.pool.stats()
+
+
+def db_pool_saturation() -> float:
+    """نسبت اتصال‌های گرفته‌شده به ظرفیت کل pool (pool_size + max_overflow)"""
+    capacity = config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW
+    return engine.pool.checkedout() / capacity if capacity > 0 else 0.0
+
 
 async def db_health_check() -> bool:
     try:
@@ -56,14 +206,10 @@ async def db_health_check() -> bool:
         return False
 
 
-print("TABLES =", EntityBase.metadata.tables)
-
 async def create_db_and_tables():
     # This loads the model class so SQLAlchemy registers the table
     from app.domain.models import User
 
-    print("Registered tables:", EntityBase.metadata.tables.keys())
-
     logger.info("Creating database tables...")
     async with engine.begin() as conn:
         await conn.run_sync(EntityBase.metadata.create_all)
@@ -71,6 +217,44 @@ async def create_db_and_tables():
     logger.success("All tables created successfully!")
 
 
+async def check_schema_revision() -> None:
+    """
+    Schema با Alembic مدیریت می‌شود → فقط یک query روی alembic_version
+    (بدون introspection کاتالوگ؛ اولین اتصال pool هم همین‌جا گرم می‌شود)
+    """
+    try:
+        async with engine.connect() as conn:
+            revision = (
+                await conn.execute(text("SELECT version_num FROM alembic_version"))
+            ).scalar_one_or_none()
+    except exc.ProgrammingError:
+        raise RuntimeError(
+            "alembic_version table not found — run `alembic upgrade head` "
+            "or start with DB_SCHEMA_MODE=create"
+        )
+
+    expected = config.DB_SCHEMA_REVISION
+    if expected and revision != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {revision!r}, expected {expected!r} "
+            "— run `alembic upgrade head`"
+        )
+    logger.info(f"Database schema revision: {revision}")
+
+
+async def prepare_database() -> None:
+    """
+    startup هر worker:
+    - create → create_all (محیط توسعه؛ introspection کامل کاتالوگ)
+    - check  → فقط بررسی revision (production، migrationها با Alembic)
+    - skip   → هیچ
+    """
+    if config.DB_SCHEMA_MODE == "create":
+        await create_db_and_tables()
+    elif config.DB_SCHEMA_MODE == "check":
+        await check_schema_revision()
+
+
 if __name__ == "__main__":
     import asyncio
     asyncio.run(create_db_and_tables())
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+config = get_settings()
+
+
+class ReadinessProbe:
+    """
+    /health/ready: checkها هم‌زمان و هر کدام با timeout خودش اجرا می‌شوند
+
+    - نتیجه cache_ttl ثانیه نگه داشته می‌شود → probeهای پشت سر هم load balancer
+      اتصال pool نمی‌گیرند؛ probeهای هم‌زمان هم منتظر همان یک اجرا می‌مانند
+    - اشباع pool (نسبت استفاده ≥ threshold) → degraded، تا ترافیک قبل از صف
+      شدن درخواست‌ها به workerهای دیگر برود
+    """
+
+    def __init__(self, timeout: float, cache_ttl: float, saturation_threshold: float):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.saturation_threshold = saturation_threshold
+        self._checks: dict[str, Callable[[], Awaitable[bool]]] = {}
+        self._gauges: dict[str, Callable[[], Optional[float]]] = {}
+        self._result: Optional[dict] = None
+        self._expires_at = 0.0
+        self._running: Optional[asyncio.Task] = None
+
+    def add_check(self, name: str, check: Callable[[], Awaitable[bool]]) -> None:
+        self._checks[name] = check
+
+    def add_saturation(self, name: str, gauge: Callable[[], Optional[float]]) -> None:
+        """gauge: نسبت استفاده‌ی 0..1 (None → این منبع فعال نیست)"""
+        self._gauges[name] = gauge
+
+    async def result(self) -> dict:
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+
+        if self._running is None:
+            self._running = asyncio.create_task(self._evaluate())
+            self._running.add_done_callback(self._finished)
+        # shield: لغو شدن یک probe، اجرای مشترک را لغو نکند
+        return await asyncio.shield(self._running)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running = None
+        if not task.cancelled() and task.exception() is None:
+            self._result = task.result()
+            self._expires_at = time.monotonic() + self.cache_ttl
+
+    async def _run_check(self, name: str) -> bool:
+        try:
+            return bool(await asyncio.wait_for(self._checks[name](), self.timeout))
+        except asyncio.TimeoutError:
+            logger.warning("[Health] {} check timed out after {}s", name, self.timeout)
+            return False
+        except Exception as e:
+            logger.error(f"[Health] {name} check failed: {e}")
+            return False
+
+    async def _evaluate(self) -> dict:
+        saturation = {}
+        for name, gauge in self._gauges.items():
+            value = gauge()
+            if value is not None:
+                saturation[name] = round(value, 3)
+        saturated = sorted(
+            name for name, value in saturation.items()
+            if value >= self.saturation_threshold
+        )
+
+        # pool اشباع → check آن اجرا نمی‌شود (probe پشت درخواست‌ها در صف نمی‌ماند)
+        names = [name for name in self._checks if name not in saturated]
+        results = await asyncio.gather(*(self._run_check(name) for name in names))
+        checks = {name: None for name in self._checks}
+        checks.update(zip(names, results))
+
+        if not all(results):
+            status = "down"
+        elif saturated:
+            status = "degraded"
+        else:
+            status = "ok"
+
+        return {
+            "status": status,
+            "checks": checks,
+            "saturation": saturation,
+            "saturated": saturated,
+        }
+
+
+readiness_probe = ReadinessProbe(
+    timeout=config.HEALTH_CHECK_TIMEOUT,
+    cache_ttl=config.HEALTH_CACHE_TTL,
+    saturation_threshold=config.HEALTH_POOL_SATURATION,
+)
@@ -1,27 +1,89 @@
-from redis.asyncio import Redis
+import time
+
+from fastapi import Request
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
 from loguru import logger
 from typing import Optional
 
 from app.core.config import get_settings
+from app.core.request_metrics import current_metrics
 
 config = get_settings()
 
+redis_pool: Optional[ConnectionPool] = None  # یک ConnectionPool برای کل worker
 redis_client: Optional[Redis] = None  # فقط یک Redis client ساخته شود
 
 
-async def get_redis() -> Redis:
+class InstrumentedPipeline(Pipeline):
     """
-    Create or return the existing Redis client (singleton).
+    Pipeline که یک رفت‌وبرگشت را با تعداد دستورهایش در RequestMetrics ثبت می‌کند
+    """
+
+    async def execute(self, raise_on_error: bool = True):
+        metrics = current_metrics()
+        if metrics is None:
+            return await super().execute(raise_on_error)
+
+        commands = len(self.command_stack)
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            metrics.record_redis(time.perf_counter() - started, commands)
+
+
+class InstrumentedRedis(Redis):
+    """
+    Redis client که زمان و تعداد دستورهای هر درخواست را ثبت می‌کند (Server-Timing)
+    """
+
+    async def execute_command(self, *args, **options):
+        metrics = current_metrics()
+        if metrics is None:
+            return await super().execute_command(*args, **options)
+
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            metrics.record_redis(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def create_redis_pool() -> ConnectionPool:
+    """
+    Build the shared connection pool from settings.
+    """
+    return ConnectionPool.from_url(
+        config.REDIS_URL,      # مثل redis://localhost:6379/0
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=config.REDIS_MAX_CONNECTIONS,
+        health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+        socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
+        socket_keepalive=True,
+    )
+
+
+async def init_redis() -> Redis:
+    """
+    Create the pool and the client once per worker (called from lifespan).
     """
-    global redis_client
+    global redis_pool, redis_client
     if redis_client is None:
         try:
-            redis_client = Redis.from_url(
-                config.REDIS_URL,      # مثل redis://localhost:6379/0
-                encoding="utf-8",
-                decode_responses=True
+            redis_pool = create_redis_pool()
+            redis_client = InstrumentedRedis(connection_pool=redis_pool)
+            logger.info(
+                "[Redis] Pool initialized (max_connections={})",
+                config.REDIS_MAX_CONNECTIONS,
             )
-            logger.info("[Redis] Client initialized")
         except Exception as e:
             logger.error(f"[Redis] Initialization failed: {e}")
             raise
@@ -29,11 +91,64 @@ async def get_redis() -> Redis:
     return redis_client
 
 
-async def get_redis_client() -> Redis:
+async def close_redis() -> None:
+    """
+    Close the client and disconnect every pooled connection.
+    """
+    global redis_pool, redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+        logger.info("[Redis] Pool closed")
+    redis_client = None
+    redis_pool = None
+
+
+async def get_redis() -> Redis:
+    """
+    Create or return the existing Redis client (singleton).
+    """
+    if redis_client is None:
+        return await init_redis()
+    return redis_client
+
+
+async def get_redis_client(request: Request) -> Redis:
+    """
+    FastAPI dependency — returns the lifespan-managed client from app.state.
+    """
+    client = getattr(request.app.state, "redis", None)
+    if client is None:
+        client = await get_redis()
+    return client
+
+
+def redis_pool_stats() -> dict:
+    """
+    Snapshot of the shared pool, for the health endpoint.
+    """
+    if redis_pool is None:
+        return {"initialized": False}
+
+    in_use = len(redis_pool._in_use_connections)
+    available = len(redis_pool._available_connections)
+    return {
+        "initialized": True,
+        "max_connections": redis_pool.max_connections,
+        "created_connections": in_use + available,
+        "in_use_connections": in_use,
+        "available_connections": available,
+    }
+
+
+def redis_pool_saturation() -> Optional[float]:
     """
-    FastAPI dependency wrapper — always returns a ready Redis client.
+    In-use share of max_connections (None when the pool is not initialized).
     """
-    return await get_redis()
+    if redis_pool is None:
+        return None
+    return len(redis_pool._in_use_connections) / redis_pool.max_connections
 
 
 async def redis_health_check() -> bool:
@@ -0,0 +1,142 @@
+import heapq
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class RequestMetrics:
+    """
+    هزینه‌های یک درخواست (Server-Timing + لاگ ساخت‌یافته)
+
+    همه‌ی شمارنده‌ها از همان task درخواست پر می‌شوند؛ event hookهای
+    SQLAlchemy / Redis / hash فقط current_metrics() را می‌خوانند.
+    """
+
+    started: float = field(default_factory=time.perf_counter)
+
+    db_time: float = 0.0
+    db_statements: int = 0
+    db_rows: int = 0
+
+    connections: int = 0
+    connection_held: float = 0.0
+    connection_max_held: float = 0.0
+
+    redis_time: float = 0.0
+    redis_calls: int = 0
+    redis_commands: int = 0
+
+    hash_time: float = 0.0
+    hash_calls: int = 0
+
+    # فقط وقتی PERF_SLOW_SQL_TOP > 0 باشد پر می‌شود: (duration, statement)
+    slow_statements: Optional[list] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record_statement(self, duration: float, rows: int, statement: str, keep: int) -> None:
+        self.db_time += duration
+        self.db_statements += 1
+        self.db_rows += rows
+        if keep:
+            if self.slow_statements is None:
+                self.slow_statements = []
+            entry = (duration, statement)
+            if len(self.slow_statements) < keep:
+                heapq.heappush(self.slow_statements, entry)
+            elif duration > self.slow_statements[0][0]:
+                heapq.heapreplace(self.slow_statements, entry)
+
+    def record_connection(self, held: float) -> None:
+        self.connections += 1
+        self.connection_held += held
+        self.connection_max_held = max(self.connection_max_held, held)
+
+    def record_redis(self, duration: float, commands: int = 1) -> None:
+        self.redis_time += duration
+        self.redis_calls += 1
+        self.redis_commands += commands
+
+    def record_hash(self, duration: float) -> None:
+        self.hash_time += duration
+        self.hash_calls += 1
+
+    def server_timing(self) -> str:
+        """Server-Timing: app;dur=12.3, db;dur=4.1;desc="3 queries", ..."""
+        parts = [f"app;dur={self.elapsed * 1000:.1f}"]
+        if self.db_statements:
+            parts.append(
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.db_statements} queries, {self.db_rows} rows"'
+            )
+        if self.connections:
+            parts.append(f"db-conn;dur={self.connection_held * 1000:.1f}")
+        if self.redis_calls:
+            parts.append(
+                f'redis;dur={self.redis_time * 1000:.1f};desc="{self.redis_commands} commands"'
+            )
+        if self.hash_calls:
+            parts.append(f"hash;dur={self.hash_time * 1000:.1f}")
+        return ", ".join(parts)
+
+    def fields(self) -> dict:
+        """فیلدهای لاگ ساخت‌یافته (ms)"""
+        return {
+            "duration_ms": round(self.elapsed * 1000, 3),
+            "db_ms": round(self.db_time * 1000, 3),
+            "db_statements": self.db_statements,
+            "db_rows": self.db_rows,
+            "db_connections": self.connections,
+            "db_connection_held_ms": round(self.connection_held * 1000, 3),
+            "redis_ms": round(self.redis_time * 1000, 3),
+            "redis_calls": self.redis_calls,
+            "redis_commands": self.redis_commands,
+            "hash_ms": round(self.hash_time * 1000, 3),
+            "hash_calls": self.hash_calls,
+        }
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def start_request_metrics() -> RequestMetrics:
+    metrics = RequestMetrics()
+    _current.set(metrics)
+    return metrics
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """metrics درخواست جاری (خارج از درخواست، مثلاً taskهای پس‌زمینه → None)"""
+    return _current.get()
+
+
+class SlowStatementLog:
+    """
+    N کندترین statement هر route (برای PERF_SLOW_SQL_TOP > 0، فقط دیباگ)
+    """
+
+    def __init__(self, top: int):
+        self.top = top
+        self._routes: dict[str, list] = {}
+
+    def add(self, route: str, statements: list) -> None:
+        heap = self._routes.setdefault(route, [])
+        for entry in statements:
+            if len(heap) < self.top:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+    def dump(self) -> dict:
+        return {
+            route: [
+                {"ms": round(duration * 1000, 3), "statement": statement}
+                for duration, statement in sorted(heap, reverse=True)
+            ]
+            for route, heap in sorted(self._routes.items())
+        }
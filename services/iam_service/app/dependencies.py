@@ -1,10 +1,12 @@
 from typing import Annotated, Any
-from fastapi import Depends, HTTPException
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request
 import redis.asyncio as redis
 
 # Core
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.redis import get_redis_client
 
 # Repositories
 from app.repositories.user_repository import UserRepository
@@ -18,6 +20,8 @@ from app.services1.auth_services.signup_service import RegisterService
 from app.services1.auth_services.otp_service import OTPService
 from app.services1.auth_services.email_service import EmailService
 from app.services1.auth_services.logout_service import LogoutService
+from app.services1.auth_services.rate_limiter import RateLimitGuard
+from app.services1.user_cache import CachedUser, user_cache
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -28,22 +32,14 @@ from app.services1.profile_service import ProfileService
 
 bearer_scheme = HTTPBearer()
 async def get_refresh_token_repository(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ) -> RefreshTokenRepository:
     return RefreshTokenRepository(db)
 
 
 # -----------------------------
-# Redis + Hash + Email
+# Hash + Email
 # -----------------------------
-async def get_redis_client() -> redis.Redis:
-    return redis.Redis(
-        host='localhost',
-        port=6379,
-        db=0,
-        decode_responses=True
-    )
-
 def get_hash_service() -> HashService:
     return HashService()
 
@@ -58,11 +54,17 @@ def get_logout_service(
 ):
     return LogoutService(jwt_service,redis_client)
 
+def get_rate_limit_guard(
+    request: Request,
+    redis_client = Depends(get_redis_client),
+) -> RateLimitGuard:
+    return RateLimitGuard(request, redis_client)
+
 # -----------------------------
 # Repository Factory
 # -----------------------------
 async def get_user_repository(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ) -> UserRepository:
     return UserRepository(db)
 
@@ -82,9 +84,8 @@ async def get_user_service(
 # -----------------------------
 async def get_otp_service(
     redis_client: redis.Redis = Depends(get_redis_client),
-    email_service: EmailService = Depends(get_email_service)
 ) -> OTPService:
-    return OTPService(redis_client, email_service)
+    return OTPService(redis_client)
 
 
 # -----------------------------
@@ -138,14 +139,24 @@ async def get_current_user(
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Invalid access token")
 
-    user_id = payload.get("sub")
-    if not user_id:
+    try:
+        user_id = UUID(payload.get("sub") or "")
+    except ValueError:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    user = await user_service.get_user(user_id)
-    if not user:
+    # ⚡ cache (LRU همین worker → Redis)؛ فقط miss به DB می‌رود
+    user = await user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    # قبل از خواندن DB: تغییر هم‌زمان بعد از این، set را بی‌اثر می‌کند
+    generation = await user_cache.generation(user_id)
+    db_user = await user_service.get_user(user_id)
+    if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    user = CachedUser.from_model(db_user)
+    await user_cache.set(user, generation)
     return user
 #-----------------------------------------
 # در dependencies.py
@@ -164,7 +175,7 @@ async def get_password_reset_service(
 
 
 async def get_profile_service(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user_service: UserService = Depends(get_user_service),
     hash_service: HashService = Depends(get_hash_service)
 ) -> ProfileService:
@@ -1,32 +1,271 @@
 from loguru import logger
+from collections import deque
+import atexit
+import json
 import sys
 import os
+import threading
+
+from app.core.config import get_settings
+
+SERVICE_NAME = "iam_service"
+
+# پیام‌های زیر این سطح sample می‌شوند؛ WARNING به بالا همیشه ثبت می‌شود
+SAMPLED_BELOW = 30
+
+
+class LogPipeline:
+    """
+    صف محدود بین loguru و خروجی‌ها (فایل / کنسول)
+
+    - loguru فقط پیام را format می‌کند؛ نوشتن روی دیسک/کنسول در یک thread جدا
+      که هر flush_interval ثانیه همه‌ی پیام‌های صف را یک‌جا می‌نویسد
+    - صف پر → پیام دور ریخته می‌شود و dropped زیاد می‌شود (request منتظر I/O نمی‌ماند)
+    - ERROR به بالا هیچ‌وقت دور ریخته نمی‌شود
+    """
+
+    def __init__(self, maxsize: int, flush_interval: float = 0.05):
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        # append / popleft روی deque thread-safe است (بدون lock در مسیر request)
+        self.queue: deque = deque()
+        self.dropped = 0
+        self.sampled_out = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sink(self, target, serialize: bool = False):
+        """
+        loguru sink: پیام → صف (target در thread نویسنده می‌نویسد)
+        serialize: JSON ساختن (پرهزینه‌ترین بخش) هم در thread نویسنده انجام شود
+        """
+
+        def enqueue(message) -> None:
+            record = message.record
+            if len(self.queue) >= self.maxsize and record["level"].no < 40:
+                self.dropped += 1
+                return
+            self.queue.append((target, str(message), record if serialize else None))
+
+        return enqueue
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="log-writer", daemon=True
+            )
+            self._thread.start()
+            # خروج بدون lifespan (اسکریپت‌ها، crash) → باقی صف نوشته شود
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """shutdown: پیام‌های مانده در صف نوشته می‌شوند"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        # همه‌ی پیام‌های موجود نوشته و هر خروجی یک بار flush می‌شود
+        touched = {}
+        while self.queue:
+            target, text, record = self.queue.popleft()
+            touched[id(target)] = target
+            try:
+                target.write(text if record is None else _serialize(text, record))
+            except Exception as e:
+                sys.__stderr__.write(f"[Logging] write failed: {e}\n")
+
+        for target in touched.values():
+            try:
+                target.flush()
+            except Exception as e:
+                sys.__stderr__.write(f"[Logging] flush failed: {e}\n")
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "max_queue": self.maxsize,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+
+def _serialize(text: str, record) -> str:
+    """همان ساختار serialize=True خود loguru (text + record)"""
+    exception = record["exception"]
+    if exception is not None:
+        exception = {
+            "type": None if exception.type is None else exception.type.__name__,
+            "value": exception.value,
+            "traceback": bool(exception.traceback),
+        }
+
+    serializable = {
+        "text": text,
+        "record": {
+            "elapsed": {
+                "repr": record["elapsed"],
+                "seconds": record["elapsed"].total_seconds(),
+            },
+            "exception": exception,
+            "extra": record["extra"],
+            "file": {"name": record["file"].name, "path": record["file"].path},
+            "function": record["function"],
+            "level": {
+                "icon": record["level"].icon,
+                "name": record["level"].name,
+                "no": record["level"].no,
+            },
+            "line": record["line"],
+            "message": record["message"],
+            "module": record["module"],
+            "name": record["name"],
+            "process": {"id": record["process"].id, "name": record["process"].name},
+            "thread": {"id": record["thread"].id, "name": record["thread"].name},
+            "time": {"repr": record["time"], "timestamp": record["time"].timestamp()},
+        },
+    }
+    return json.dumps(serializable, default=str, ensure_ascii=False) + "\n"
+
+
+class LogSampler:
+    """
+    نمونه‌برداری per-logger برای پیام‌های پرتکرار (زیر WARNING)
+
+    rate=0.01 → از هر ۱۰۰ پیام آن logger یکی. تصمیم یک بار برای هر record
+    گرفته می‌شود تا همه‌ی sinkها پیام یکسانی ببینند.
+    """
+
+    def __init__(self, rates: dict[str, float], pipeline: LogPipeline):
+        self.rates = rates
+        self.pipeline = pipeline
+        self._credit: dict[str, float] = {}
+        # sinkهای یک record پشت سر هم در همان thread صدا زده می‌شوند
+        self._last = threading.local()
+
+    def __call__(self, record) -> bool:
+        last = getattr(self._last, "decision", None)
+        if last is not None and last[0] is record:
+            return last[1]
+        keep = self._decide(record)
+        self._last.decision = (record, keep)
+        return keep
+
+    def _decide(self, record) -> bool:
+        rate = self.rates.get(record["name"])
+        if rate is None or record["level"].no >= SAMPLED_BELOW:
+            return True
+
+        credit = self._credit.get(record["name"], 0.0) + rate
+        if credit >= 1.0:
+            self._credit[record["name"]] = credit - 1.0
+            return True
+        self._credit[record["name"]] = credit
+        self.pipeline.sampled_out += 1
+        return False
+
+
+class RotatingFile:
+    """
+    فایل لاگ با rotation بر اساس حجم (فقط از thread نویسنده استفاده می‌شود)
+    app.log → app.log.1 → ... → app.log.{backups}
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def write(self, text: str) -> None:
+        if self._size and self._size + len(text) > self.max_bytes:
+            self._rotate()
+        self._file.write(text)
+        self._size += len(text)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+
+log_pipeline = LogPipeline(maxsize=get_settings().LOG_QUEUE_SIZE)
 
 
 def configure_logger():
+    settings = get_settings()
+
     # Ensure log directory exists
     os.makedirs("logs", exist_ok=True)
 
     # Remove default logger
     logger.remove()
 
-    # JSON serialization is handled internally by loguru when serialize=True, hence no need for a custom format.
+    log_pipeline.start()
+    sampler = LogSampler(settings.LOG_SAMPLE_RATES, log_pipeline)
+    max_bytes = settings.LOG_FILE_MAX_MB * 1024 * 1024
+    backups = settings.LOG_FILE_BACKUPS
+
+    # JSON در thread نویسنده ساخته می‌شود (همان ساختار serialize=True در loguru)
     json_logging_format = {
-        "rotation": "10 MB",
-        "retention": "10 days",
-        "serialize": True,
+        "filter": sampler,
     }
 
-    # Add file logging for JSON logs
-    logger.add("logs/iam_service_info.log", level="INFO", **json_logging_format)
-    logger.add("logs/iam_service_error.log", level="ERROR", **json_logging_format)
+    # Add file logging for JSON logs (rotation در thread نویسنده)
+    logger.add(
+        log_pipeline.sink(RotatingFile(f"logs/{SERVICE_NAME}_info.log", max_bytes, backups), serialize=True),
+        level=settings.LOG_LEVEL,
+        **json_logging_format,
+    )
+    logger.add(
+        log_pipeline.sink(RotatingFile(f"logs/{SERVICE_NAME}_error.log", max_bytes, backups), serialize=True),
+        level="ERROR",
+        **json_logging_format,
+    )
 
     # Custom log format for console and stderr
     log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:" \
                  "<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 
     # Add console logging
-    logger.add(sys.stdout, level="INFO", format=log_format)
+    logger.add(
+        log_pipeline.sink(sys.stdout),
+        level=settings.LOG_LEVEL,
+        format=log_format,
+        colorize=sys.stdout.isatty(),
+        filter=sampler,
+    )
 
     # Add stderr logging
-    logger.add(sys.stderr, level="ERROR", backtrace=True, diagnose=True, format=log_format)
+    logger.add(
+        log_pipeline.sink(sys.stderr),
+        level="ERROR",
+        backtrace=True,
+        diagnose=True,
+        format=log_format,
+        colorize=sys.stderr.isatty(),
+    )
+
+
+def shutdown_logger():
+    """پیام‌های مانده در صف قبل از خروج worker نوشته شوند"""
+    log_pipeline.stop()
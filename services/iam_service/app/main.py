@@ -1,4 +1,6 @@
-from fastapi import FastAPI, Depends,Request
+import asyncio
+
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from loguru import logger
@@ -6,10 +8,23 @@ from contextlib import asynccontextmanager
 
 from app.api.auth_routes import auth_router
 from app.core.config import get_settings
-from app.core.database import create_db_and_tables
-from app.logging.logging_service import configure_logger
+from app.core.database import db_health_check, db_pool_saturation, db_pool_stats, prepare_database
+from app.core.health import readiness_probe
+from app.core.metrics import METRICS_CONTENT_TYPE, metrics_sampler, render_metrics
+from app.core.middleware import RequestMetricsMiddleware, UTF8CharsetMiddleware
+from app.core.redis import (
+    init_redis,
+    close_redis,
+    redis_health_check,
+    redis_pool_saturation,
+    redis_pool_stats,
+)
+from app.core.request_metrics import SlowStatementLog
+from app.services1.auth_services.email_queue import email_worker
+from app.services1.auth_services.hash_service import hash_pool
+from app.services1.last_login import last_login_buffer
+from app.logging.logging_service import configure_logger, log_pipeline, shutdown_logger
 from fastapi.security import HTTPBearer
-from fastapi.responses import JSONResponse
 from app.api.password_routes import router as password_reset_router
 from app.api.profile_routes import profile_router
 
@@ -21,14 +36,31 @@ logger.info("Logger configured.")
 
 settings = get_settings()
 
+# فقط با PERF_SLOW_SQL_TOP > 0 (دیباگ)
+slow_sql = SlowStatementLog(settings.PERF_SLOW_SQL_TOP) if settings.PERF_SLOW_SQL_TOP else None
+
 
 # ============================================
 # 2. Lifespan
 # ============================================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_db_and_tables()
+    await prepare_database()
+    app.state.redis = await init_redis()
+    hash_pool.start()
+    if settings.EMAIL_WORKER_ENABLED:
+        email_worker.start(app.state.redis)
+    last_login_buffer.start()
+    metrics_sampler.start()
     yield
+    await metrics_sampler.stop()
+    await last_login_buffer.stop()
+    await email_worker.stop()
+    hash_pool.shutdown()
+    await close_redis()
+    if slow_sql is not None:
+        logger.info("[Perf] Slowest statements per route: {}", slow_sql.dump())
+    shutdown_logger()
 
 
 # ============================================
@@ -43,12 +75,6 @@ app = FastAPI(
 
 logger.info(f"{settings.PROJECT_NAME} v{settings.PROJECT_VERSION} is starting up...")
 
-@app.middleware("http")
-async def set_utf8_encoding(request: Request, call_next):
-    response = await call_next(request)
-    if isinstance(response, JSONResponse):
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-    return response
 # ============================================
 # 4. Security Scheme (global)
 # ============================================
@@ -96,6 +122,14 @@ app.openapi = custom_openapi
 # ============================================
 origins = ["*"]
 
+# Pure ASGI — فقط header پاسخ را در send تغییر می‌دهد
+app.add_middleware(UTF8CharsetMiddleware)
+app.add_middleware(
+    RequestMetricsMiddleware,
+    warn_ms=settings.DB_HOLD_WARN_MS,
+    slow_sql=slow_sql,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -131,4 +165,60 @@ async def root():
     return {"status": "ok", "message": "Welcome to QForm IAM Service!"}
 
 
+@app.get("/health", tags=["Health Check"])
+async def health():
+    db_ok = await db_health_check()
+    redis_ok = await redis_health_check()
+    return {
+        "status": "ok" if db_ok and redis_ok else "degraded",
+        "database": {
+            "ok": db_ok,
+            "pool": db_pool_stats(),
+        },
+        "redis": {
+            "ok": redis_ok,
+            "pool": redis_pool_stats(),
+        },
+        "email": email_worker.stats(),
+        "last_login": last_login_buffer.stats(),
+        "logging": log_pipeline.stats(),
+    }
+
+
+readiness_probe.add_check("database", db_health_check)
+readiness_probe.add_check("redis", redis_health_check)
+readiness_probe.add_saturation("database", db_pool_saturation)
+readiness_probe.add_saturation("redis", redis_pool_saturation)
+readiness_probe.add_saturation("hash", lambda: hash_pool.queue_depth / hash_pool.max_queue)
+
+
+@app.get("/health/live", tags=["Health Check"])
+async def health_live():
+    # فقط event loop پاسخ می‌دهد؛ بدون وابستگی بیرونی
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["Health Check"])
+async def health_ready(response: Response):
+    result = await readiness_probe.result()
+    if result["status"] != "ok":
+        response.status_code = 503
+    return result
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # worker پاسخ‌دهنده تازه‌ترین وضعیت خودش را قبل از خروجی می‌نویسد
+    metrics_sampler.sample()
+    # multiprocess: خواندن فایل‌های همه‌ی workerها خارج از event loop
+    body = await asyncio.to_thread(render_metrics)
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
+if slow_sql is not None:
+    @app.get("/debug/slow-sql", tags=["Health Check"])
+    async def slow_statements():
+        return slow_sql.dump()
+
+
 logger.success("🚀 IAM Service has started successfully!")
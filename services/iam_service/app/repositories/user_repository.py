@@ -3,7 +3,8 @@ from uuid import UUID
 from datetime import datetime
 
 from loguru import logger
-from sqlalchemy import select, update, delete
+from sqlalchemy import column, select, update, delete, values
+from sqlalchemy.dialects.postgresql import TIMESTAMP, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
@@ -22,7 +23,7 @@ class UserRepository:
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
-        logger.info(f"User {user.user_id} created")
+        logger.info("User {} created", user.user_id)
         return user
 
     # -----------------------------------
@@ -31,7 +32,7 @@ class UserRepository:
     async def get_by_id(self, user_id: UUID) -> User:
         stmt = select(User).where(User.user_id == user_id)
         result = await self.session.execute(stmt)
-        logger.info(f"Fetching user {user_id}")
+        logger.debug("Fetching user {}", user_id)
         return result.scalar_one_or_none()
 
     async def get_by_email(self, email: str) -> User:
@@ -52,14 +53,29 @@ class UserRepository:
     # -----------------------------------
     # UPDATE
     # -----------------------------------
-    async def update_last_login(self, user_id: UUID) -> None:
-        stmt = (
+    async def update_last_login_batch(self, logins: list[tuple[UUID, datetime]]) -> int:
+        """
+        last_login چند کاربر: UPDATE ... FROM (VALUES (id, last_login), ...)
+        مقدار قدیمی‌تر از مقدار فعلی نوشته نمی‌شود (flush هم‌زمان چند worker)
+        """
+        if not logins:
+            return 0
+        data = values(
+            column("user_id", PG_UUID(as_uuid=True)),
+            column("last_login", TIMESTAMP(timezone=True)),
+            name="v",
+        ).data(logins)
+        result = await self.session.execute(
             update(User)
-            .where(User.user_id == user_id)
-            .values(last_login=datetime.utcnow(), updated_at=datetime.utcnow())
+            .where(
+                User.user_id == data.c.user_id,
+                (User.last_login.is_(None)) | (User.last_login < data.c.last_login),
+            )
+            .values(last_login=data.c.last_login, updated_at=data.c.last_login)
+            .execution_options(synchronize_session=False)
         )
-        await self.session.execute(stmt)
         await self.session.commit()
+        return result.rowcount
 
     # -----------------------------------
     # VERIFY ACCOUNT
@@ -85,19 +101,10 @@ class UserRepository:
         await self.session.execute(stmt)
         await self.session.commit()
 
-    async def suspend_user(self, user_id: UUID) -> None:
-        await self.set_status(user_id, "suspended")
-
-    async def deactivate_user(self, user_id: UUID) -> None:
-        await self.set_status(user_id, "inactive")
-
-    async def activate_user(self, user_id: UUID) -> None:
-        await self.set_status(user_id, "active")
-
     async def delete_user(self, user: User) -> None:
         await self.session.delete(user)
         await self.session.commit()
-        logger.info(f"User {user.user_id} deleted")
+        logger.info("User {} deleted", user.user_id)
 
     # -----------------------------------
     # ADMIN
@@ -124,6 +131,6 @@ class UserRepository:
 # DEPENDENCY (برای FastAPI) ✅ اصلاح شده
 # ---------------------------------------
 async def get_user_repository(
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_db, scope="function")
 ) -> UserRepository:
     return UserRepository(session)
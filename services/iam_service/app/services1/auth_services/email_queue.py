@@ -0,0 +1,400 @@
+import asyncio
+import queue
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from uuid import uuid4
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+QUEUE_KEY = "email:queue"          # LIST: id پیام‌های آماده (LPUSH → RPOP)
+INFLIGHT_KEY = "email:inflight"    # ZSET: id → زمانی که دوباره قابل برداشت است
+MESSAGE_KEY = "email:msg:{id}"     # HASH: پیام + وضعیت
+
+# ۱) پیام‌های موعد‌رسیده‌ی inflight (retry با backoff، یا worker‌ی که مُرده) → صف
+# ۲) حداکثر ARGV[3] پیام از صف → inflight با مهلت visibility
+# خروجی: {طول صف، تعداد inflight، id ...}
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('LPUSH', KEYS[1], id)
+end
+local ids = redis.call('RPOP', KEYS[1], ARGV[3]) or {}
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+end
+local result = {redis.call('LLEN', KEYS[1]), redis.call('ZCARD', KEYS[2])}
+for _, id in ipairs(ids) do
+    table.insert(result, id)
+end
+return result
+"""
+
+
+class EmailQueue:
+    """
+    صف پایدار ایمیل در Redis (at-least-once)
+
+    - enqueue: پیام + وضعیت queued + LPUSH در یک رفت‌وبرگشت؛ با stage همین
+      دستورها به pipeline/MULTI فراخوان اضافه می‌شوند (مثلاً همراه SETEX کد OTP)
+    - claim: پیام به inflight می‌رود؛ اگر تا visibility_timeout ack نشود
+      (crash worker) دوباره به صف برمی‌گردد
+    - retry همان inflight با موعد جدید است (backoff)
+    """
+
+    def __init__(self, visibility_timeout: int, status_ttl: int):
+        self.visibility_timeout = visibility_timeout
+        self.status_ttl = status_ttl
+        # enqueue در همین worker → حلقه‌ی ارسال بدون صبر poll بیدار شود
+        self.wakeup = asyncio.Event()
+        # آخرین مقدار دیده‌شده در claim (برای /metrics)
+        self.queued = 0
+        self.inflight = 0
+
+    def prepare(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        ttl: Optional[int] = None,
+    ) -> tuple[str, dict]:
+        """(message_id، فیلدهای HASH پیام) — برای stage یا اسکریپت Lua"""
+        message_id = uuid4().hex
+        now = time.time()
+        fields = {
+            "to": to_email,
+            "subject": subject,
+            "body": body,
+            "status": "queued",
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if ttl:
+            # مثلاً OTP: بعد از انقضای کد، ارسالش بی‌معنی است
+            fields["expires_at"] = now + ttl
+        return message_id, fields
+
+    def stage(self, pipe, message_id: str, fields: dict) -> None:
+        """دستورهای enqueue روی pipeline فراخوان؛ بعد از execute → notify()"""
+        key = MESSAGE_KEY.format(id=message_id)
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, self.status_ttl)
+        pipe.lpush(QUEUE_KEY, message_id)
+
+    def notify(self) -> None:
+        self.wakeup.set()
+
+    async def enqueue(
+        self,
+        redis: Redis,
+        to_email: str,
+        subject: str,
+        body: str,
+        ttl: Optional[int] = None,
+    ) -> str:
+        message_id, fields = self.prepare(to_email, subject, body, ttl)
+        async with redis.pipeline(transaction=True) as pipe:
+            self.stage(pipe, message_id, fields)
+            await pipe.execute()
+
+        self.notify()
+        return message_id
+
+    async def claim(self, redis: Redis, count: int) -> list[str]:
+        now = time.time()
+        result = await redis.eval(
+            CLAIM_SCRIPT,
+            2,
+            QUEUE_KEY,
+            INFLIGHT_KEY,
+            now,
+            now + self.visibility_timeout,
+            count,
+        )
+        self.queued, self.inflight = int(result[0]), int(result[1])
+        return result[2:]
+
+    async def load(self, redis: Redis, message_id: str) -> dict:
+        return await redis.hgetall(MESSAGE_KEY.format(id=message_id))
+
+    async def finish(self, redis: Redis, message_id: str, status: str, **fields) -> None:
+        """sent / failed / expired → وضعیت نهایی و حذف از inflight (متن پیام نگه داشته نمی‌شود)"""
+        key = MESSAGE_KEY.format(id=message_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"status": status, "updated_at": time.time(), **fields})
+            pipe.hdel(key, "body")
+            pipe.zrem(INFLIGHT_KEY, message_id)
+            await pipe.execute()
+
+    async def retry(self, redis: Redis, message_id: str, delay: float, **fields) -> None:
+        now = time.time()
+        key = MESSAGE_KEY.format(id=message_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "status": "retrying",
+                    "updated_at": now,
+                    "next_attempt_at": now + delay,
+                    **fields,
+                },
+            )
+            pipe.zadd(INFLIGHT_KEY, {message_id: now + delay})
+            await pipe.execute()
+
+    async def status(self, redis: Redis, message_id: str) -> Optional[dict]:
+        message = await self.load(redis, message_id)
+        if not message:
+            return None
+        message.pop("body", None)
+        return message
+
+
+class SMTPPool:
+    """
+    اتصال‌های SMTP پایدار: STARTTLS و login فقط موقع ساخت اتصال،
+    نه برای هر ایمیل. ارسال در threadهای همین pool (smtplib sync است).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.connects = 0
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.size,
+                thread_name_prefix="smtp",
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while not self._idle.empty():
+            self._close(self._idle.get_nowait())
+
+    async def send(self, to_email: str, message: str) -> None:
+        self.start()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send, to_email, message)
+
+    def _connect(self):
+        # import محلی: فقط worker ارسال به smtplib نیاز دارد، نه startup
+        import smtplib
+
+        smtp = smtplib.SMTP(
+            settings.EMAIL_HOST,
+            settings.EMAIL_PORT,
+            timeout=settings.EMAIL_SMTP_TIMEOUT,
+        )
+        if settings.EMAIL_SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.EMAIL_USERNAME:
+            smtp.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
+        self.connects += 1
+        return smtp
+
+    @staticmethod
+    def _close(smtp) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _send(self, to_email: str, message: str) -> None:
+        import smtplib
+
+        try:
+            smtp = self._idle.get_nowait()
+        except queue.Empty:
+            smtp = self._connect()
+
+        try:
+            try:
+                smtp.sendmail(settings.EMAIL_FROM, [to_email], message)
+            except smtplib.SMTPServerDisconnected:
+                # سرور اتصال idle را بسته → یک بار با اتصال تازه
+                self._close(smtp)
+                smtp = self._connect()
+                smtp.sendmail(settings.EMAIL_FROM, [to_email], message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # سرور پاسخ خطا داد ولی اتصال سالم است
+            self._idle.put(smtp)
+            raise
+        except BaseException:
+            self._close(smtp)
+            raise
+
+        self._idle.put(smtp)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """خطاهای 5xx / گیرنده‌ی نامعتبر → retry فایده ندارد"""
+    import smtplib
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class EmailWorker:
+    """
+    حلقه‌ی ارسال در هر worker: پیام‌ها را از صف Redis برمی‌دارد و حداکثر
+    به اندازه‌ی SMTP pool هم‌زمان ارسال می‌کند؛ خطا → retry با backoff تا
+    EMAIL_MAX_ATTEMPTS، بعد failed.
+    """
+
+    def __init__(self, email_queue: EmailQueue, smtp_pool: SMTPPool):
+        self.queue = email_queue
+        self.smtp_pool = smtp_pool
+        self._task: Optional[asyncio.Task] = None
+        self._sending: set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, redis: Redis) -> None:
+        if self._task is None:
+            self.smtp_pool.start()
+            self._task = asyncio.create_task(self._run(redis))
+            logger.info("[Email] Worker started ({} SMTP connections)", self.smtp_pool.size)
+
+    async def stop(self) -> None:
+        """پیام‌های در حال ارسال تمام می‌شوند؛ بقیه در Redis می‌مانند"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        self.smtp_pool.shutdown()
+
+    async def _run(self, redis: Redis) -> None:
+        while True:
+            self.queue.wakeup.clear()
+            free = self.smtp_pool.size - len(self._sending)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self.queue.claim(redis, free)
+                except Exception as e:
+                    logger.error("[Email] Claim failed: {}", e)
+
+            for message_id in claimed:
+                task = asyncio.create_task(self._deliver(redis, message_id))
+                self._sending.add(task)
+                task.add_done_callback(self._delivered)
+
+            if len(claimed) < free or free <= 0:
+                try:
+                    await asyncio.wait_for(
+                        self.queue.wakeup.wait(),
+                        settings.EMAIL_POLL_INTERVAL,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    def _delivered(self, task: asyncio.Task) -> None:
+        self._sending.discard(task)
+        # جای خالی در pool → پیام بعدی بدون صبر poll
+        self.queue.wakeup.set()
+
+    async def _deliver(self, redis: Redis, message_id: str) -> None:
+        try:
+            message = await self.queue.load(redis, message_id)
+            if not message or "body" not in message:
+                # وضعیت منقضی شده یا قبلاً نهایی شده
+                await redis.zrem(INFLIGHT_KEY, message_id)
+                return
+
+            if float(message.get("expires_at", "inf")) <= time.time():
+                await self.queue.finish(redis, message_id, "expired")
+                logger.warning("[Email] Message {} expired before delivery", message_id)
+                return
+
+            attempts = int(message["attempts"]) + 1
+            try:
+                await self.smtp_pool.send(message["to"], _build_message(message))
+            except Exception as e:
+                await self._failed(redis, message_id, attempts, e)
+                return
+
+            await self.queue.finish(redis, message_id, "sent", attempts=attempts)
+            self.sent += 1
+            logger.debug("[Email] Message {} sent (attempt {})", message_id, attempts)
+        except Exception as e:
+            # Redis در دسترس نیست → بعد از visibility_timeout دوباره برداشته می‌شود
+            logger.error("[Email] Delivery of {} interrupted: {}", message_id, e)
+
+    async def _failed(self, redis: Redis, message_id: str, attempts: int, error: Exception) -> None:
+        if _is_permanent(error) or attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            await self.queue.finish(
+                redis, message_id, "failed", attempts=attempts, last_error=str(error)
+            )
+            self.failed += 1
+            logger.error(
+                "[Email] Message {} failed after {} attempts: {}", message_id, attempts, error
+            )
+            return
+
+        delay = min(
+            settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+            settings.EMAIL_RETRY_MAX_SECONDS,
+        )
+        delay *= random.uniform(0.8, 1.2)  # jitter: retryهای هم‌زمان پخش شوند
+        await self.queue.retry(
+            redis, message_id, delay, attempts=attempts, last_error=str(error)
+        )
+        logger.warning(
+            "[Email] Message {} attempt {} failed ({}), retry in {:.1f}s",
+            message_id,
+            attempts,
+            error,
+            delay,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "sending": len(self._sending),
+            "queued": self.queue.queued,
+            "inflight": self.queue.inflight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "smtp_connects": self.smtp_pool.connects,
+        }
+
+
+def _build_message(message: dict) -> str:
+    from email.mime.text import MIMEText
+
+    mime = MIMEText(message["body"])
+    mime["Subject"] = message["subject"]
+    mime["From"] = settings.EMAIL_FROM
+    mime["To"] = message["to"]
+    return mime.as_string()
+
+
+email_queue = EmailQueue(
+    visibility_timeout=settings.EMAIL_VISIBILITY_TIMEOUT,
+    status_ttl=settings.EMAIL_STATUS_TTL,
+)
+
+email_worker = EmailWorker(email_queue, SMTPPool(size=settings.EMAIL_SMTP_POOL_SIZE))
@@ -1,6 +1,10 @@
-import smtplib
-from email.mime.text import MIMEText
+from typing import Optional
+
 from fastapi import Depends
+from loguru import logger
+
+from app.core.redis import get_redis
+from app.services1.auth_services.email_queue import email_queue
 from app.services1.base_service import BaseService
 from app.core.config import get_settings
 
@@ -10,23 +14,25 @@ class EmailService(BaseService):
         super().__init__()
         self.settings = get_settings()
 
-    async def send_email(self, to_email: str, subject: str, body: str):
-        msg = MIMEText(body)
-        msg["Subject"] = subject
-        msg["From"] = self.settings.EMAIL_FROM
-        msg["To"] = to_email
-
-        # ارسال ایمیل با SMTP (sync → داخل executor)
-        def _send():
-            with smtplib.SMTP(self.settings.EMAIL_HOST, self.settings.EMAIL_PORT) as smtp:
-                smtp.starttls()
-                smtp.login(self.settings.EMAIL_USERNAME, self.settings.EMAIL_PASSWORD)
-                smtp.sendmail(self.settings.EMAIL_FROM, [to_email], msg.as_string())
-
-        # اجرای کد sync در threadpool
-        import asyncio
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, _send)
+    async def send_email(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        ttl: Optional[int] = None,
+    ) -> str:
+        """
+        ایمیل در صف Redis قرار می‌گیرد و id پیام برمی‌گردد؛ ارسال (SMTP،
+        retry) با EmailWorker است. ttl: بعد از این مدت دیگر ارسال نمی‌شود.
+        """
+        redis = await get_redis()
+        message_id = await email_queue.enqueue(redis, to_email, subject, body, ttl)
+        logger.debug("[Email] Queued message {}", message_id)
+        return message_id
+
+    async def get_status(self, message_id: str) -> Optional[dict]:
+        redis = await get_redis()
+        return await email_queue.status(redis, message_id)
 
 
 # ================================
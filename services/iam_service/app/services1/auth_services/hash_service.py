@@ -1,23 +1,142 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from loguru import logger
 from passlib.context import CryptContext
+
+from app.core.config import get_settings
+from app.core.request_metrics import current_metrics
 from app.services1.base_service import BaseService
 
+settings = get_settings()
+
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
 )
 
+
+# ================================
+# Worker functions (picklable → process pool)
+# ================================
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, password_hash: str) -> bool:
+    return pwd_context.verify(plain_password, password_hash)
+
+
+def _verify_and_update(
+    plain_password: str,
+    password_hash: str,
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, password_hash)
+
+
+class HashPool:
+    """
+    Bounded executor for Argon2 work, so hashing never blocks the event loop.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int) -> None:
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            # argon2-cffi releases the GIL, so threads scale for hashing too
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="argon2",
+            )
+        logger.info(
+            "[Hash] {} pool started with {} workers",
+            self.kind,
+            self.workers,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn, *args):
+        if self._pending >= self.max_queue:
+            logger.warning("[Hash] Queue full ({}), shedding request", self._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.start()
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            metrics = current_metrics()
+            if metrics is not None:
+                # صف executor هم جزو هزینه‌ی hash درخواست است
+                metrics.record_hash(time.perf_counter() - started)
+
+
+hash_pool = HashPool(
+    kind=settings.HASH_POOL_KIND,
+    workers=settings.HASH_POOL_WORKERS,
+    max_queue=settings.HASH_POOL_MAX_QUEUE,
+)
+
+
 class HashService(BaseService):
     def __init__(self) -> None:
         super().__init__()
 
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+        return _hash(password)
 
     @staticmethod
     def verify_password(plain_password: str, password_hash: str) -> bool:
-        return pwd_context.verify(plain_password, password_hash)
+        return _verify(plain_password, password_hash)
+
+    # ------------------ Async API (event-loop safe) ------------------
+    async def hash(self, password: str) -> str:
+        return await hash_pool.run(_hash, password)
+
+    async def verify(self, plain_password: str, password_hash: str) -> bool:
+        return await hash_pool.run(_verify, plain_password, password_hash)
+
+    async def verify_and_update(
+        self,
+        plain_password: str,
+        password_hash: str,
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify, and return a new hash when the stored one uses outdated Argon2 parameters.
+        """
+        return await hash_pool.run(_verify_and_update, plain_password, password_hash)
+
 
-    
 def get_hash_service() :
-    return HashService()
\ No newline at end of file
+    return HashService()
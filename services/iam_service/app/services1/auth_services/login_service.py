@@ -28,7 +28,7 @@ class LoginService(BaseService):
     async def authenticate_user(self, user: UserLoginSchema) -> TokenSchema:
         # 1) پیدا کردن کاربر بر اساس ایمیل
         existing_user = await self.user_service.get_user_by_email(user.email)
-        logger.info(f"Authenticating user with email {user.email}")
+        logger.info("Authenticating user with email {}", user.email)
 
         # 2) اگر کاربر وجود نداشت → خطا
         if not existing_user:
@@ -46,11 +46,12 @@ class LoginService(BaseService):
                 detail="User is not verified"
             )
 
-        # 4) چک کردن پسورد
-        if not self.hash_service.verify_password(
+        # 4) چک کردن پسورد (+ rehash اگر پارامترهای Argon2 عوض شده باشد)
+        valid, new_hash = await self.hash_service.verify_and_update(
             user.password,
             existing_user.password_hash
-        ):
+        )
+        if not valid:
             logger.error(f"Invalid password for user email {user.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,6 +59,11 @@ class LoginService(BaseService):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        if new_hash:
+            await self.user_service.update_password_hash(
+                existing_user.user_id, new_hash
+            )
+
         # آپدیت آخرین ورود
         await self.user_service.update_last_login(existing_user.user_id)
 
@@ -76,7 +82,7 @@ class LoginService(BaseService):
 
 
 
-        logger.info(f"User with email {user.email} authenticated successfully")
+        logger.info("User with email {} authenticated successfully", user.email)
 
         # 6) برگرداندن اسکیمای نهایی
         return {
@@ -1,65 +1,186 @@
 import random
 import string
-from typing import Annotated
+from typing import Any, Optional
+
 from fastapi import Depends
-from app.services1.auth_services.email_service import get_email_service
-# اگر ردیس رو از جای دیگه ایمپورت می‌کنی اینجا تنظیم کن
-from app.core.redis import get_redis_client 
-from typing import Annotated, Any
+
+from app.core.redis import get_redis_client
+from app.services1.auth_services.email_queue import (
+    MESSAGE_KEY,
+    QUEUE_KEY,
+    email_queue,
+)
+
+OTP_TTL = 120  # 2 minutes
+OTP_KEY = "otp:{email}"
+
+OTP_SUBJECT = "Your OTP Code"
+OTP_BODY = "Your verification code is: {otp}"
+
+# صدور مشروط OTP در یک رفت‌وبرگشت (کد + پیام ایمیل در صف)
+#   KEYS[1]=otp  KEYS[2]=کلیدی که باید وجود داشته باشد (مثلاً pending_user) یا ''
+#   KEYS[3]=پیام ایمیل  KEYS[4]=صف ایمیل
+#   ARGV[1]=کد  ARGV[2]=TTL کد  ARGV[3]=cooldown: OTP قبلی با TTL بیشتر از این → رد
+#   ARGV[4]=TTL وضعیت پیام  ARGV[5]=id پیام  ARGV[6..]=فیلدهای پیام
+# خروجی: 1 ارسال شد | 0 کلید شرط وجود ندارد | -TTL باقی‌مانده‌ی OTP قبلی
+ISSUE_SCRIPT = """
+if KEYS[2] ~= '' and redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+local ttl = redis.call('TTL', KEYS[1])
+if ttl > tonumber(ARGV[3]) then
+    return -ttl
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('HSET', KEYS[3], unpack(ARGV, 6))
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+redis.call('LPUSH', KEYS[4], ARGV[5])
+return 1
+"""
+
+# بررسی + مصرف OTP (اتمیک: از دو verify هم‌زمان فقط یکی موفق می‌شود)
+#   KEYS[1]=otp  KEYS[2]=کلید همراه
+#   ARGV[1]=کد  ARGV[2]=take (خواندن و حذف KEYS[2]) | set (ساختن KEYS[2]) | ''
+#   ARGV[3]=TTL برای set
+# خروجی: {0} کد نیست/منقضی | {-1} کد اشتباه | {2} کد درست ولی KEYS[2] نیست
+#         {1} | {1, value, ttl} برای take
+VERIFY_SCRIPT = """
+local stored = redis.call('GET', KEYS[1])
+if not stored then
+    return {0}
+end
+if stored ~= ARGV[1] then
+    return {-1}
+end
+redis.call('DEL', KEYS[1])
+if ARGV[2] == 'take' then
+    local value = redis.call('GET', KEYS[2])
+    if not value then
+        return {2}
+    end
+    local ttl = redis.call('TTL', KEYS[2])
+    redis.call('DEL', KEYS[2])
+    return {1, value, ttl}
+end
+if ARGV[2] == 'set' then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+end
+return {1}
+"""
+
+OTP_MISSING = 0
+OTP_INVALID = -1
+OTP_VERIFIED = 1
+OTP_KEY_MISSING = 2
 
 
 class OTPService:
     def __init__(
         self,
         redis_client: Any = Depends(get_redis_client),
-        email_service: Any = Depends(get_email_service),
     ):
         self.redis = redis_client
-        self.email_service = email_service
-
 
     def _generate_otp(self) -> str:
         """Generate a 6-digit random numeric OTP."""
         return "".join(random.choices(string.digits, k=4)) # یا 6 رقم
 
-    async def send_otp(self, email: str) -> str:
+    async def send_otp(
+        self,
+        email: str,
+        store: Optional[tuple[str, str, int]] = None,
+    ) -> str:
+        """
+        کد OTP + ایمیل آن در صف، در یک MULTI (ارسال SMTP در EmailWorker).
+        store: (key, value, ttl) که در همان MULTI ذخیره می‌شود (مثلاً pending_user)
+        """
         otp = self._generate_otp()
-        
-        # 1. ذخیره در ردیس (Async)
-        # توجه: اگر ردیس سینک است await نگذار، ولی چون گفتی خطای قبلی await بود، پس ردیس درسته.
-        OTP_TTL = 120  # 2 minutes
-
-        await self.redis.setex(f"otp:{email}", OTP_TTL, otp)
-        
-        # 2. ارسال ایمیل
-        # نکته مهم: اینجا رو تغییر دادم که به جای to=email از آرگومان پوزیشنال استفاده کنه
-        # یا اگر مطمئنی اسمش recipient هست، اون رو بنویس.
-        # امن‌ترین روش: بدون نام پارامتر بفرستیم (Positional)
-        
-        await self.email_service.send_email(
-            email,                 # آرگومان اول: گیرنده
-            "Your OTP Code",       # آرگومان دوم: موضوع
-            f"Your verification code is: {otp}"       # آرگومان سوم: متن
+        message_id, fields = email_queue.prepare(
+            email, OTP_SUBJECT, OTP_BODY.format(otp=otp), ttl=OTP_TTL
         )
-        
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if store is not None:
+                key, value, ttl = store
+                pipe.setex(key, ttl, value)
+            pipe.setex(OTP_KEY.format(email=email), OTP_TTL, otp)
+            email_queue.stage(pipe, message_id, fields)
+            await pipe.execute()
+
+        email_queue.notify()
         return otp
 
+    async def resend_otp(
+        self,
+        email: str,
+        require_key: Optional[str] = None,
+        cooldown: int = 0,
+    ) -> int:
+        """
+        OTP تازه فقط اگر require_key وجود داشته باشد و OTP قبلی بیشتر از
+        cooldown ثانیه اعتبار نداشته باشد — بررسی + صدور در یک اسکریپت.
+        خروجی: 1 ارسال شد | 0 require_key نیست | -TTL اگر OTP قبلی هنوز معتبر است
+        """
+        otp = self._generate_otp()
+        message_id, fields = email_queue.prepare(
+            email, OTP_SUBJECT, OTP_BODY.format(otp=otp), ttl=OTP_TTL
+        )
+        flat_fields = [item for pair in fields.items() for item in pair]
+
+        result = int(
+            await self.redis.eval(
+                ISSUE_SCRIPT,
+                4,
+                OTP_KEY.format(email=email),
+                require_key or "",
+                MESSAGE_KEY.format(id=message_id),
+                QUEUE_KEY,
+                otp,
+                OTP_TTL,
+                cooldown,
+                email_queue.status_ttl,
+                message_id,
+                *flat_fields,
+            )
+        )
+        if result == 1:
+            email_queue.notify()
+        return result
+
+    async def _verify(self, email: str, otp: str, mode: str = "", key: str = "", ttl: int = 0) -> list:
+        return await self.redis.eval(
+            VERIFY_SCRIPT,
+            2,
+            OTP_KEY.format(email=email),
+            key or OTP_KEY.format(email=email),
+            otp,
+            mode,
+            ttl,
+        )
+
     async def verify_otp(self, email: str, otp: str) -> bool:
-        stored_otp = await self.redis.get(f"otp:{email}")
-        if not stored_otp:
-            return False
-        
-        # ردیس بایت برمی‌گردونه، باید دیکد بشه
-        if isinstance(stored_otp, bytes):
-            stored_otp = stored_otp.decode('utf-8')
-            
-        if stored_otp == otp:
-            # بعد از مصرف موفق، پاکش کن (یکبار مصرف)
-            await self.redis.delete(f"otp:{email}")
-            return True
-            
-        return False
-
-    async def check_exist(self, email: str) -> bool:
-        exists = await self.redis.exists(f"otp:{email}")
-        return exists > 0
+        result = await self._verify(email, otp)
+        return int(result[0]) == OTP_VERIFIED
+
+    async def verify_and_take(
+        self,
+        email: str,
+        otp: str,
+        key: str,
+    ) -> tuple[int, Optional[str], int]:
+        """
+        یک رفت‌وبرگشت: بررسی و مصرف OTP + خواندن و حذف key (مثلاً pending_user)
+        خروجی: (وضعیت OTP_*، مقدار key، TTL باقی‌مانده‌ی key)
+        """
+        result = await self._verify(email, otp, "take", key)
+        if int(result[0]) != OTP_VERIFIED:
+            return int(result[0]), None, 0
+        value = result[1]
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return OTP_VERIFIED, value, int(result[2])
+
+    async def verify_and_mark(self, email: str, otp: str, key: str, ttl: int) -> bool:
+        """یک رفت‌وبرگشت: بررسی و مصرف OTP + ساختن key (مثلاً reset_session)"""
+        result = await self._verify(email, otp, "set", key, ttl)
+        return int(result[0]) == OTP_VERIFIED
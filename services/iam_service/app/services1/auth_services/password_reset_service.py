@@ -32,16 +32,13 @@ class PasswordResetService:
         }
 
     async def verify(self, email: str, otp: str):
-        valid = await self.otp_service.verify_otp(email, otp)
+        # verify + consume otp + reset session در یک اسکریپت
+        valid = await self.otp_service.verify_and_mark(
+            email, otp, f"reset_session:{email}", 600
+        )
         if not valid:
             raise HTTPException(status_code=400, detail="Invalid OTP")
 
-        await self.redis.setex(
-            f"reset_session:{email}",
-            600,
-            "1"
-        )
-
         return {
             "success": True,
             "message": "OTP verified"
@@ -78,19 +75,19 @@ class PasswordResetService:
      user = await self.user_service.get_user_by_email(email)
     
      if user:
-        # چک کن OTP قبلی هنوز معتبره؟
-        ttl = await self.redis.ttl(f"otp:{email}")
-        
-        if ttl > 60:  # اگر بیشتر از 60 ثانیه مونده
+        # چک TTL OTP قبلی + ارسال در یک اسکریپت:
+        # اگر بیشتر از 60 ثانیه مونده → رد، وگرنه OTP تازه
+        result = await self.otp_service.resend_otp(email, cooldown=60)
+
+        if result < 0:
+            ttl = -result
             logger.warning(f"⚠️ OTP still valid for {email}, {ttl}s remaining")
             raise HTTPException(
                 status_code=429,  # Too Many Requests
                 detail=f"Please wait {ttl} seconds before requesting new OTP"
             )
-        
-        # OTP منقضی شده یا کمتر از 60 ثانیه مونده - بفرست
-        await self.otp_service.send_otp(email)
-        logger.info(f"✅ OTP resent to: {email}")
+
+        logger.info("✅ OTP resent to: {}", email)
      else:
         logger.warning(f"⚠️ Resend attempted for non-existent: {email}")
     
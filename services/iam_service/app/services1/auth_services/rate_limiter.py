@@ -0,0 +1,212 @@
+import math
+from ipaddress import ip_address, ip_network
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+TRUSTED_PROXIES = [ip_network(proxy, strict=False) for proxy in settings.AUTH_TRUSTED_PROXIES]
+
+# GCRA روی چند کلید (IP، ایمیل، سراسری) + قفل brute-force، در یک فراخوانی
+#   KEYS[1..n-1]=کلیدهای limiter  KEYS[n]=شمارنده‌ی تلاش ناموفق (ایمیل + IP)
+#   ARGV[1]=آستانه‌ی قفل، برای هر limiter: ARGV[2i]=فاصله (ms)، ARGV[2i+1]=burst
+# خروجی: {1, 0} مجاز | {0, انتظار به ms} — اگر یکی رد شود هیچ کلیدی مصرف نمی‌شود
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local lock_key = KEYS[#KEYS]
+
+local failures = tonumber(redis.call('GET', lock_key) or '0')
+if failures >= tonumber(ARGV[1]) then
+    return {0, redis.call('PTTL', lock_key)}
+end
+
+local wait = 0
+local tats = {}
+for i = 1, #KEYS - 1 do
+    local interval = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - burst * interval
+    if allow_at > now and allow_at - now > wait then
+        wait = allow_at - now
+    end
+    tats[i] = new_tat
+end
+if wait > 0 then
+    return {0, wait}
+end
+
+for i = 1, #KEYS - 1 do
+    redis.call('SET', KEYS[i], tats[i], 'PX', tats[i] - now)
+end
+return {1, 0}
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """'10/minute' → (interval_ms, burst): burst درخواست پشت سر هم، بعد یکی هر interval"""
+    count, _, unit = rate.partition("/")
+    count = int(count)
+    return max(PERIODS[unit.strip()] * 1000 // count, 1), count
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP کاربر برای limiter: اتصال از proxy مورد اعتماد → اولین hop غیرقابل
+    اعتماد از سمت راست X-Forwarded-For (hopهای سمت چپ را کلاینت می‌تواند جعل کند)
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = request.headers.get(settings.AUTH_FORWARDED_HEADER, "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+class RateLimiter:
+    """
+    محدودیت درخواست endpointهای auth (per IP، per email، سراسری) + قفل
+    بعد از AUTH_LOCKOUT_THRESHOLD تلاش ناموفق؛ قبل از هر کار DB/hash.
+    شمارنده‌ی قفل per (email, IP) است: تلاش‌های ناموفق یک مهاجم کاربر واقعی
+    را از IP خودش قفل نمی‌کند؛ حدس از IPهای زیاد را limiter per email می‌گیرد.
+    Redis در دسترس نیست → درخواست رد نمی‌شود (fail open).
+    """
+
+    def __init__(self, ip_rate: str, email_rate: str, global_rate: str,
+                 lockout_threshold: int, lockout_seconds: int):
+        self.limits = {
+            "ip": parse_rate(ip_rate),
+            "email": parse_rate(email_rate),
+            "global": parse_rate(global_rate),
+        }
+        self.lockout_threshold = lockout_threshold
+        self.lockout_seconds = lockout_seconds
+
+    @staticmethod
+    def _failure_key(policy: str, email: str, ip: str) -> str:
+        return f"rl:{policy}:fail:{email.lower()}:{ip}"
+
+    async def check(self, redis: Any, policy: str, ip: str, email: str) -> None:
+        scopes = {
+            "ip": f"rl:{policy}:ip:{ip}",
+            "email": f"rl:{policy}:email:{email.lower()}",
+            "global": f"rl:{policy}:global",
+        }
+        args = [self.lockout_threshold]
+        for scope in scopes:
+            args.extend(self.limits[scope])
+
+        try:
+            allowed, wait_ms = await redis.eval(
+                GCRA_SCRIPT,
+                len(scopes) + 1,
+                *scopes.values(),
+                self._failure_key(policy, email, ip),
+                *args,
+            )
+        except Exception as e:
+            logger.warning("[RateLimit] Check skipped, Redis error: {}", e)
+            return
+
+        if not int(allowed):
+            retry_after = max(math.ceil(int(wait_ms) / 1000), 1)
+            logger.warning(
+                "[RateLimit] {} rejected for ip={} email={} (retry in {}s)",
+                policy,
+                ip,
+                email,
+                retry_after,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    async def record_failure(self, redis: Any, policy: str, ip: str, email: str) -> None:
+        key = self._failure_key(policy, email, ip)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, self.lockout_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("[RateLimit] Failure not recorded, Redis error: {}", e)
+
+    async def reset(self, redis: Any, policy: str, ip: str, email: str) -> None:
+        try:
+            await redis.delete(self._failure_key(policy, email, ip))
+        except Exception as e:
+            logger.warning("[RateLimit] Reset failed, Redis error: {}", e)
+
+
+rate_limiter = RateLimiter(
+    ip_rate=settings.AUTH_RATE_LIMIT_IP,
+    email_rate=settings.AUTH_RATE_LIMIT_EMAIL,
+    global_rate=settings.AUTH_RATE_LIMIT_GLOBAL,
+    lockout_threshold=settings.AUTH_LOCKOUT_THRESHOLD,
+    lockout_seconds=settings.AUTH_LOCKOUT_SECONDS,
+)
+
+
+class RateLimitGuard:
+    """
+    async with guard.limit("login", email, track_failures=True):
+        ...
+    ورود: check (429 + Retry-After). خروج: HTTPException 400/401/403 → تلاش
+    ناموفق؛ موفق → شمارنده‌ی قفل صفر می‌شود.
+    """
+
+    FAILURE_STATUSES = (400, 401, 403)
+
+    def __init__(self, request: Request, redis: Any):
+        self.redis = redis
+        self.ip = client_ip(request)
+
+    def limit(self, policy: str, email: str, track_failures: bool = False) -> "_Limited":
+        return _Limited(self, policy, email, track_failures)
+
+
+class _Limited:
+    def __init__(self, guard: RateLimitGuard, policy: str, email: str, track_failures: bool):
+        self.guard = guard
+        self.policy = policy
+        self.email = email
+        self.track_failures = track_failures
+
+    async def __aenter__(self) -> None:
+        if settings.AUTH_RATE_LIMIT_ENABLED:
+            await rate_limiter.check(self.guard.redis, self.policy, self.guard.ip, self.email)
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if not (settings.AUTH_RATE_LIMIT_ENABLED and self.track_failures):
+            return False
+        if exc is None:
+            await rate_limiter.reset(self.guard.redis, self.policy, self.guard.ip, self.email)
+        elif isinstance(exc, HTTPException) and exc.status_code in RateLimitGuard.FAILURE_STATUSES:
+            await rate_limiter.record_failure(self.guard.redis, self.policy, self.guard.ip, self.email)
+        return False
+
@@ -12,7 +12,11 @@ from app.domain.user_schemas import (
     UserResponseSchema,
 )
 
-from app.services1.auth_services.otp_service import OTPService
+from app.services1.auth_services.otp_service import (
+    OTP_KEY_MISSING,
+    OTP_VERIFIED,
+    OTPService,
+)
 from app.services1.base_service import BaseService
 from app.services1.user_service import UserService
 from app.core.redis import get_redis_client
@@ -46,16 +50,13 @@ class RegisterService(BaseService):
                 detail="User already exists",
             )
 
-        # store pending user in redis (10 minutes)
-        await self.redis.setex(
-            f"pending_user:{user.email}",
-            time=600,
-            value=user.model_dump_json(),
+        # pending user (10 minutes) + OTP + email در یک MULTI
+        await self.otp_service.send_otp(
+            user.email,
+            store=(f"pending_user:{user.email}", user.model_dump_json(), 600),
         )
 
-        await self.otp_service.send_otp(user.email)
-
-        logger.info(f"Registration started for {user.email}")
+        logger.info("Registration started for {}", user.email)
 
         return RegisterStartResponse(
             success=True,
@@ -73,33 +74,33 @@ class RegisterService(BaseService):
         email = verify_schema.email
         otp = verify_schema.otp
 
-        # verify otp
-        verified = await self.otp_service.verify_otp(email, otp)
-        if not verified:
-            logger.warning(f"Invalid OTP attempt for {email}")
+        # verify + consume otp + load pending user (یک اسکریپت اتمیک)
+        pending_key = f"pending_user:{email}"
+        result, raw, ttl = await self.otp_service.verify_and_take(email, otp, pending_key)
+        if result == OTP_KEY_MISSING:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid or expired OTP",
+                detail="Registration expired. Please register again.",
             )
-
-        # load pending user
-        raw = await self.redis.get(f"pending_user:{email}")
-        if not raw:
+        if result != OTP_VERIFIED:
+            logger.warning("Invalid OTP attempt for {}", email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Registration expired. Please register again.",
+                detail="Invalid or expired OTP",
             )
 
         # parse json -> schema
         data = UserCreateSchema.model_validate_json(raw)
 
         # create user
-        new_user = await self.user_service.create_user(data)
-
-        # cleanup
-        await self.redis.delete(f"pending_user:{email}")
+        try:
+            new_user = await self.user_service.create_user(data)
+        except Exception:
+            # pending user برگردد تا resend-otp ممکن باشد (OTP مصرف شده)
+            await self.redis.setex(pending_key, max(ttl, 1), raw)
+            raise
 
-        logger.success(f"User registered successfully: {email}")
+        logger.success("User registered successfully: {}", email)
 
         return RegisterCompleteResponse(
             success=True,
@@ -118,24 +119,22 @@ class RegisterService(BaseService):
 
         email = resend_schema.email
 
-        # check pending registration
-        pending = await self.redis.get(f"pending_user:{email}")
-        if not pending:
+        # pending registration + cooldown (OTP exists) + send در یک اسکریپت
+        result = await self.otp_service.resend_otp(
+            email, require_key=f"pending_user:{email}"
+        )
+        if result == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No pending registration for this email",
             )
-
-        # cooldown check (OTP exists)
-        if await self.otp_service.check_exist(email):
+        if result < 0:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="OTP already sent. Please wait before requesting again.",
             )
 
-        await self.otp_service.send_otp(email)
-
-        logger.info(f"OTP resent for {email}")
+        logger.info("OTP resent for {}", email)
 
         return ResendOTPResponseSchema(
             success=True,
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class LastLoginBuffer:
+    """
+    Write-behind برای users.last_login
+
+    - login فقط زمان را در حافظه‌ی همین worker می‌نویسد (بدون UPDATE و commit)
+    - هر max_staleness ثانیه (یا وقتی batch_size کاربر جمع شد) همه با
+      UPDATE ... FROM (VALUES ...) نوشته می‌شوند؛ هر statement حداکثر
+      batch_size ردیف و به ترتیب user_id (قفل ردیف‌ها بین workerها بن‌بست نسازد)
+    - flush ناموفق → ردیف‌ها به بافر برمی‌گردند؛ بافر بیشتر از max_pending کاربر
+      نگه نمی‌دارد (DB مدت طولانی down → کاربر جدید ثبت نمی‌شود)
+    - shutdown: یک flush نهایی
+    """
+
+    def __init__(self, max_staleness: float, batch_size: int, max_pending: int):
+        self.max_staleness = max_staleness
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: dict[UUID, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: UUID, at: Optional[datetime] = None) -> None:
+        if user_id not in self._pending and len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending[user_id] = at or datetime.now(timezone.utc)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self, user_id: UUID) -> Optional[datetime]:
+        """زمان login که هنوز در DB نوشته نشده (فقط همین worker)"""
+        return self._pending.get(user_id)
+
+    async def flush(self) -> int:
+        # import محلی: جلوگیری از import حلقه‌ای با repositoryها
+        from app.core.database import async_session
+        from app.repositories.user_repository import UserRepository
+        from app.services1.user_cache import user_cache
+
+        if not self._pending:
+            return 0
+        logins = sorted(self._pending.items())
+        self._pending.clear()
+
+        written = 0
+        for start in range(0, len(logins), self.batch_size):
+            batch = logins[start:start + self.batch_size]
+            try:
+                async with async_session() as session:
+                    written += await UserRepository(session).update_last_login_batch(batch)
+                # نسخه‌ی cache شده‌ی این کاربران last_login قدیمی دارد
+                await user_cache.invalidate(*(user_id for user_id, _ in batch))
+            except Exception as e:
+                logger.error("[LastLogin] Flush failed, {} kept for retry: {}", len(logins) - start, e)
+                # login جدیدتر در این فاصله → همان بماند
+                for user_id, at in logins[start:]:
+                    if user_id not in self._pending:
+                        self._pending[user_id] = at
+                break
+
+        self.written += written
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.max_staleness)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logger.warning("[LastLogin] {} last_login updates lost on shutdown", len(self._pending))
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+last_login_buffer = LastLoginBuffer(
+    max_staleness=settings.LAST_LOGIN_MAX_STALENESS,
+    batch_size=settings.LAST_LOGIN_FLUSH_BATCH,
+    max_pending=settings.LAST_LOGIN_MAX_PENDING,
+)
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.repositories.profile_repository import ProfileRepository
 from app.services1.auth_services.hash_service import HashService
+from app.services1.last_login import last_login_buffer
 from app.services1.user_service import UserService
 from app.domain.profile_schemas import UserProfileResponse
 
@@ -12,7 +13,7 @@ from app.domain.profile_schemas import UserProfileResponse
 class ProfileService:
     def __init__(
         self,
-        db: Annotated[AsyncSession, Depends(get_db)],
+        db: Annotated[AsyncSession, Depends(get_db, scope="function")],
         user_service: Annotated[UserService, Depends()],
         hash_service: Annotated[HashService, Depends()],
     ):
@@ -20,9 +21,14 @@ class ProfileService:
         self.user_service = user_service
         self.hash_service = hash_service
 
-    async def get_profile(self, user_id: str):
-       user = await self.repo.get_by_id(user_id)
-       return UserProfileResponse.model_validate(user)
+    async def get_profile(self, user):
+       # user: همان کاربری که get_current_user بارگذاری کرده (بدون query دوباره)
+       profile = UserProfileResponse.model_validate(user)
+       # login این worker که هنوز flush نشده؛ بقیه حداکثر LAST_LOGIN_MAX_STALENESS عقب‌اند
+       pending = last_login_buffer.pending(user.user_id)
+       if pending is not None and (profile.last_login is None or pending > profile.last_login):
+           profile.last_login = pending
+       return profile
 
     async def change_password(
         self,
@@ -32,7 +38,7 @@ class ProfileService:
     ):
         user = await self.repo.get_by_id(user_id)
 
-        if not self.hash_service.verify_password (
+        if not await self.hash_service.verify(
             current_password,
             user.password_hash
         ):
@@ -0,0 +1,211 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.redis import get_redis
+
+settings = get_settings()
+
+USER_KEY = "user:{user_id}"
+# هر invalidate یک واحد زیاد می‌کند؛ set فقط با همان generation که قبل از
+# خواندن DB دیده شده نوشته می‌شود
+GENERATION_KEY = "user_gen:{user_id}"
+
+# KEYS[1]=user  KEYS[2]=generation  ARGV[1]=generation دیده‌شده  ARGV[2]=TTL  ARGV[3]=مقدار
+# خروجی: 1 نوشته شد | 0 در این فاصله invalidate شده (کاربر کهنه است)
+SET_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    فیلدهای عمومی کاربر برای get_current_user، /auth/me و /profile/me
+    (password_hash در cache نگه داشته نمی‌شود)
+    """
+    user_id: UUID
+    email: str
+    full_name: str
+    role: str
+    status: str
+    is_verified: bool
+    last_login: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        return cls(
+            user_id=user.user_id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            status=user.status,
+            is_verified=user.is_verified,
+            last_login=user.last_login,
+            created_at=user.created_at,
+        )
+
+    def to_redis(self) -> str:
+        data = asdict(self)
+        data["user_id"] = str(self.user_id)
+        data["last_login"] = self.last_login.isoformat() if self.last_login else None
+        data["created_at"] = self.created_at.isoformat() if self.created_at else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_redis(cls, raw: str) -> "CachedUser":
+        data = json.loads(raw)
+        data["user_id"] = UUID(data["user_id"])
+        for field in ("last_login", "created_at"):
+            if data.get(field):
+                data[field] = datetime.fromisoformat(data[field])
+        return cls(**data)
+
+
+class UserCache:
+    """
+    Current user keyed by user_id.
+
+    In-process LRU (short TTL) in front of Redis. Password, status and
+    profile changes (and last_login flushes) call invalidate(user_id), which
+    clears both layers; other workers' local copies expire within
+    USER_CACHE_LOCAL_TTL seconds.
+
+    A reader that misses takes generation(user_id) before loading from the
+    database and passes it to set(); invalidate() bumps the generation, so a
+    user loaded before a concurrent change is never written back over it.
+    """
+
+    def __init__(self, local_size: int, local_ttl: int, redis_ttl: int):
+        self.local_size = local_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._local: "OrderedDict[UUID, tuple[float, CachedUser]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------------
+    # READ
+    # -----------------------------------
+    async def get(self, user_id: UUID) -> Optional[CachedUser]:
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                self.hits += 1
+                return user
+            self._local.pop(user_id, None)
+
+        user = await self._get_redis(user_id)
+        if user is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._put_local(user)
+        return user
+
+    async def generation(self, user_id: UUID) -> Optional[int]:
+        """قبل از خواندن DB صدا زده شود؛ None → Redis در دسترس نیست"""
+        try:
+            redis = await get_redis()
+            return int(await redis.get(GENERATION_KEY.format(user_id=user_id)) or 0)
+        except Exception as e:
+            logger.warning("[UserCache] Redis read failed: {}", e)
+            return None
+
+    # -----------------------------------
+    # WRITE
+    # -----------------------------------
+    async def set(self, user: CachedUser, generation: Optional[int]) -> None:
+        """compare-and-set: اگر بعد از generation(user_id) invalidate شده باشد نوشته نمی‌شود"""
+        if generation is None:
+            return
+        try:
+            redis = await get_redis()
+            written = await redis.eval(
+                SET_SCRIPT,
+                2,
+                USER_KEY.format(user_id=user.user_id),
+                GENERATION_KEY.format(user_id=user.user_id),
+                generation,
+                self.redis_ttl,
+                user.to_redis(),
+            )
+        except Exception as e:
+            logger.warning("[UserCache] Redis write failed: {}", e)
+            return
+
+        if int(written):
+            self._put_local(user)
+        else:
+            logger.debug("[UserCache] Stale user {} not cached", user.user_id)
+
+    # -----------------------------------
+    # INVALIDATE
+    # -----------------------------------
+    async def invalidate(self, *user_ids: UUID) -> None:
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*(USER_KEY.format(user_id=user_id) for user_id in user_ids))
+                for user_id in user_ids:
+                    # readerی که قبل از این تغییر از DB خوانده، set نمی‌کند
+                    pipe.incr(GENERATION_KEY.format(user_id=user_id))
+                    pipe.expire(GENERATION_KEY.format(user_id=user_id), self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("[UserCache] Redis invalidation failed: {}", e)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "local_size": len(self._local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    # -----------------------------------
+    # Helpers
+    # -----------------------------------
+    async def _get_redis(self, user_id: UUID) -> Optional[CachedUser]:
+        try:
+            redis = await get_redis()
+            raw = await redis.get(USER_KEY.format(user_id=user_id))
+        except Exception as e:
+            logger.warning("[UserCache] Redis read failed: {}", e)
+            return None
+        return CachedUser.from_redis(raw) if raw else None
+
+    def _put_local(self, user: CachedUser) -> None:
+        if self.local_size <= 0:
+            return
+        self._local[user.user_id] = (time.monotonic() + self.local_ttl, user)
+        self._local.move_to_end(user.user_id)
+        while len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+
+
+user_cache = UserCache(
+    local_size=settings.USER_CACHE_LOCAL_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+)
@@ -11,6 +11,8 @@ from app.repositories.user_repository import UserRepository
 
 from app.services1.auth_services.hash_service import HashService
 from app.services1.base_service import BaseService
+from app.services1.last_login import last_login_buffer
+from app.services1.user_cache import user_cache
 from app.repositories.RefreshTokenRepository import RefreshTokenRepository
 
 class UserService(BaseService):
@@ -25,8 +27,8 @@ class UserService(BaseService):
         self.refresh_token_repository = refresh_token_repository  # ✅
 
     async def create_user(self, user_body: UserCreateSchema) -> User:
-        logger.info(f"Creating user with email {user_body.email}")
-        password_hash = self.hash_service.hash_password(user_body.password)
+        logger.info("Creating user with email {}", user_body.email)
+        password_hash = await self.hash_service.hash(user_body.password)
 
         user_model = User(
             full_name=user_body.full_name,
@@ -40,19 +42,21 @@ class UserService(BaseService):
 
 
     async def delete_user(self, user: User) -> None:
-        logger.info(f"Deleting user with id {user.user_id}")
-        return await self.user_repository.delete_user(user)
+        logger.info("Deleting user with id {}", user.user_id)
+        await self.user_repository.delete_user(user)
+        await user_cache.invalidate(user.user_id)
 
     async def get_user(self, user_id: UUID) -> User:
-        logger.info(f"Fetching user with id {user_id}")
+        logger.info("Fetching user with id {}", user_id)
         return await self.user_repository.get_by_id(user_id)
 
     async def get_user_by_email(self, email: str) -> User:
-        logger.info(f"Fetching user with email {email}")
+        logger.info("Fetching user with email {}", email)
         return await self.user_repository.get_by_email(email)
 
     async def update_last_login(self, user_id: UUID):
-        return await self.user_repository.update_last_login(user_id)
+        # write-behind: در flush بعدی LastLoginBuffer نوشته می‌شود
+        last_login_buffer.record(user_id)
     
 
     async def invalidate_all_tokens(self, user_id: UUID):
@@ -67,10 +71,33 @@ class UserService(BaseService):
 
     async def update_password(self, user_id: UUID, new_password: str) -> None:
         """آپدیت رمز عبور کاربر"""
-        logger.info(f"Updating password for user {user_id}")
+        logger.info("Updating password for user {}", user_id)
         
-        hashed = self.hash_service.hash_password(new_password)
+        hashed = await self.hash_service.hash(new_password)
         await self.user_repository.update_password(user_id, hashed)
+        await user_cache.invalidate(user_id)
+
+    async def update_password_hash(self, user_id: UUID, new_hash: str) -> None:
+        """ذخیره هش جدید (rehash بعد از تغییر پارامترهای Argon2)"""
+        logger.info("Rehashing password for user {}", user_id)
+        await self.user_repository.update_password(user_id, new_hash)
+        await user_cache.invalidate(user_id)
+
+    async def set_status(self, user_id: UUID, status: str) -> None:
+        """active / inactive / suspended"""
+        logger.info("Setting status of user {} to {}", user_id, status)
+        await self.user_repository.set_status(user_id, status)
+        await user_cache.invalidate(user_id)
+
+    # تغییر status فقط از این مسیرها (cache کاربر باید پاک شود)
+    async def suspend_user(self, user_id: UUID) -> None:
+        await self.set_status(user_id, "suspended")
+
+    async def deactivate_user(self, user_id: UUID) -> None:
+        await self.set_status(user_id, "inactive")
+
+    async def activate_user(self, user_id: UUID) -> None:
+        await self.set_status(user_id, "active")
 
 
 
@@ -81,7 +108,7 @@ class UserService(BaseService):
         if existing_admin:
             raise ValueError("An admin user already exists")
 
-        hashed = self.hash_service.hash_password(user_body.password)
+        hashed = await self.hash_service.hash(user_body.password)
 
         admin_user = User(
             full_name=user_body.full_name,
@@ -0,0 +1,163 @@
+"""
+Benchmark: OTP email delivery, inline SMTP vs Redis queue + pooled SMTP.
+
+A local aiosmtpd server stands in for the mail relay; every DATA command
+waits `smtp_delay` seconds (relay latency). For N OTP emails sent by
+`concurrency` callers it reports:
+
+  inline   the previous EmailService.send_email: new SMTP connection (+ EHLO)
+           per email in the default executor, awaited by the request
+  queued   EmailService.send_email now: enqueue in Redis, the request returns;
+           EmailWorker delivers over EMAIL_SMTP_POOL_SIZE persistent connections
+
+"caller" is what the API request waits for, "drain" the time until the last
+email reached the server. STARTTLS/login are skipped against the stand-in,
+so the inline numbers are a lower bound.
+
+Needs Redis at REDIS_URL (the benchmark uses its email:* keys) and aiosmtpd.
+
+Run from services/iam_service:
+    python benchmarks/otp_email.py [emails] [concurrency] [smtp_delay]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SMTP_PORT = 8025
+
+for key, value in {
+    "DATABASE_DIALECT": "postgresql",
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_NAME": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USERNAME": "bench",
+    "JWT_SECRET_KEY": "bench-secret-key-bench-secret-key",
+    "JWT_ALGORITHM": "HS256",
+    "DEBUG_MODE": "false",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+    "OTP_EXPIRE_TIME": "120",
+    "REDIS_URL": "redis://localhost:6379/0",
+}.items():
+    os.environ.setdefault(key, value)
+os.environ.update(
+    EMAIL_HOST="127.0.0.1",
+    EMAIL_PORT=str(SMTP_PORT),
+    EMAIL_SMTP_STARTTLS="false",
+    EMAIL_USERNAME="",
+)
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from loguru import logger  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.services1.auth_services.email_queue import (  # noqa: E402
+    INFLIGHT_KEY,
+    QUEUE_KEY,
+    email_queue,
+    email_worker,
+)
+
+settings = get_settings()
+
+
+class Relay:
+    """aiosmtpd handler: slow relay that counts delivered messages"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+        return "250 OK"
+
+
+def send_inline(to_email: str, body: str) -> None:
+    """EmailService.send_email before the queue (minus STARTTLS / login)"""
+    import smtplib
+    from email.mime.text import MIMEText
+
+    msg = MIMEText(body)
+    msg["Subject"] = "Your OTP Code"
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = to_email
+    with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT) as smtp:
+        smtp.sendmail(settings.EMAIL_FROM, [to_email], msg.as_string())
+
+
+async def run(relay: Relay, total: int, concurrency: int, send) -> tuple[float, float]:
+    """(mean caller latency, seconds until the relay got every email)"""
+    relay.received = 0
+    relay.expected = total
+    relay.done.clear()
+    remaining = total
+    latencies = []
+
+    async def caller():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            await send(f"user{remaining}@gmail.com", "Your verification code is: 1234")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    await relay.done.wait()
+    return sum(latencies) / len(latencies), time.perf_counter() - started
+
+
+async def main(total: int, concurrency: int, smtp_delay: float) -> None:
+    logger.remove()
+    relay = Relay(smtp_delay)
+    controller = Controller(relay, hostname="127.0.0.1", port=SMTP_PORT)
+    controller.start()
+
+    redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    await redis.delete(QUEUE_KEY, INFLIGHT_KEY)
+
+    async def inline(to_email: str, body: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, send_inline, to_email, body)
+
+    async def queued(to_email: str, body: str) -> None:
+        await email_queue.enqueue(redis, to_email, "Your OTP Code", body, ttl=120)
+
+    try:
+        results = {"inline": await run(relay, total, concurrency, inline)}
+        email_worker.start(redis)
+        results["queued"] = await run(relay, total, concurrency, queued)
+        await email_worker.stop()
+    finally:
+        controller.stop()
+        keys = [key async for key in redis.scan_iter("email:msg:*")]
+        if keys:
+            await redis.delete(*keys)
+        await redis.aclose()
+
+    print(
+        f"emails={total} concurrency={concurrency} smtp_delay={smtp_delay * 1000:.0f}ms "
+        f"smtp_pool={settings.EMAIL_SMTP_POOL_SIZE}"
+    )
+    for name, (caller, drain) in results.items():
+        print(f"{name:<7} caller {caller * 1000:8.2f} ms   drain {drain:6.2f} s")
+    print(f"queued: {email_worker.smtp_pool.connects} SMTP connections for {total} emails")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    smtp_delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    asyncio.run(main(total, concurrency, smtp_delay))
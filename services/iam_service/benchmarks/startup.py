@@ -0,0 +1,106 @@
+"""
+Startup benchmark: what a fresh uvicorn worker pays before serving traffic.
+
+Each run starts a new interpreter (cold imports, like a new worker) and
+measures:
+  - import   : `import app.main` (modules, models, routers, schemas)
+  - startup  : the lifespan startup (schema step, Redis, background state)
+  - first    : the first GET /health (first pooled DB connection included)
+  - second   : the same request again, for comparison
+
+Every DB_SCHEMA_MODE given on the command line is measured; `check` needs a
+migrated database (alembic_version table). Uses the service's .env.
+
+Run from the service directory:
+    python benchmarks/startup.py [runs] [mode ...]
+    python benchmarks/startup.py 5 create check
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+PHASES = ("import", "startup", "first", "second")
+
+
+async def _child() -> dict:
+    started = time.perf_counter()
+    from app.main import app
+
+    timings = {"import": time.perf_counter() - started}
+
+    import httpx
+    from loguru import logger
+
+    logger.remove()
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = time.perf_counter() - started
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for phase in ("first", "second"):
+                started = time.perf_counter()
+                response = await client.get("/health")
+                timings[phase] = time.perf_counter() - started
+                timings[f"{phase}_status"] = response.status_code
+
+    return timings
+
+
+def _run_once(mode: str) -> dict:
+    env = dict(os.environ, DB_SCHEMA_MODE=mode)
+    result = subprocess.run(
+        [sys.executable, __file__, "--child"],
+        cwd=SERVICE_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        error = result.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"exit code {result.returncode}")
+    return json.loads(lines[-1])
+
+
+def main(runs: int, modes: list[str]) -> int:
+    print(f"runs={runs} (median, ms)")
+    print(f"{'mode':<8}" + "".join(f"{phase:>10}" for phase in PHASES))
+
+    failures = 0
+    for mode in modes:
+        try:
+            samples = [_run_once(mode) for _ in range(runs)]
+        except RuntimeError as e:
+            failures += 1
+            print(f"{mode:<8} FAIL {e}")
+            continue
+
+        row = "".join(
+            f"{statistics.median(s[phase] for s in samples) * 1000:10.1f}"
+            for phase in PHASES
+        )
+        statuses = {s["first_status"] for s in samples}
+        print(f"{mode:<8}{row}   /health -> {sorted(statuses)}")
+
+    return failures
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        sys.path.insert(0, str(SERVICE_ROOT))
+        timings = asyncio.run(_child())
+        print(json.dumps(timings))
+        sys.exit(0)
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    modes = sys.argv[2:] or ["create", "check"]
+    sys.exit(1 if main(runs, modes) else 0)